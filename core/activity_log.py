@@ -1,53 +1,276 @@
+import atexit
 import json
 import datetime
+import os
+import threading
+from collections import deque
 from pathlib import Path
 
+LOG_FILE_NAME = "activity.jsonl"
+LEGACY_LOG_FILE_NAME = "activity.json"
+INDEX_SUFFIX = ".idx"
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024  # Rotate the live file at ~5 MB
+DEFAULT_BACKUP_COUNT = 10
+FLUSH_INTERVAL = 0.5                 # Seconds between background flushes
+INDEX_EVERY_BYTES = 64 * 1024        # One sidecar index point per ~64 KB of log
+TAIL_BLOCK_SIZE = 64 * 1024
+
 class ActivityLogger:
-    def __init__(self, config_manager):
+    """
+    Append-only JSON Lines activity log (newest entries at the end).
+
+    log() only queues the entry; a background thread appends queued
+    entries in batches, rotates the file by size (activity.1.jsonl is
+    the most recent backup) and maintains a sidecar index of
+    "timestamp offset" lines used by query() to seek into a time range.
+    """
+    def __init__(self, config_manager, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT,
+                 flush_interval=FLUSH_INTERVAL):
         self.config = config_manager
-        # Log file in Documents/4BrosManager/logs/activity.json
+        # Log file in Documents/4BrosManager/logs/activity.jsonl
         # Handle case where output_folder might be string
         out = self.config.get('output_folder')
         if isinstance(out, str):
             out = Path(out)
-            
+
         self.log_dir = out / "logs"
         self.log_dir.mkdir(parents=True, exist_ok=True)
-        self.log_file = self.log_dir / "activity.json"
-        
+        self.log_file = self.log_dir / LOG_FILE_NAME
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+
+        self._pending = deque()
+        self._io_lock = threading.Lock()      # File writes/reads/rotation
+        self._wake = threading.Event()
+        self._flushed = threading.Condition()
+        self._written_seq = 0
+        self._queued_seq = 0
+        self._running = True
+        self._bytes_since_index = None
+
+        self._migrate_legacy()
+        self._thread = threading.Thread(target=self._writer, daemon=True, name="ActivityLogWriter")
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- Writing ---
+
     def log(self, action, details=""):
         entry = {
-            "timestamp": datetime.datetime.now().isoformat(),
+            "timestamp": datetime.datetime.now().isoformat(timespec='microseconds'),
             "action": action,
             "details": str(details)
         }
-        
-        logs = self._read_logs()
-        logs.insert(0, entry) # Prepend
-        # Limit to 1000
-        logs = logs[:1000]
-        
+        with self._flushed:
+            self._pending.append(entry)
+            self._queued_seq += 1
+        # The writer wakes on its interval; no per-call I/O or signalling
+
+    def flush(self, timeout=5.0):
+        """Blocks until everything logged so far is on disk."""
+        with self._flushed:
+            target = self._queued_seq
+        self._wake.set()
+        with self._flushed:
+            return self._flushed.wait_for(lambda: self._written_seq >= target or not self._running, timeout)
+
+    def close(self):
+        if not self._running:
+            return
+        self.flush()
+        self._running = False
+        self._wake.set()
+        self._thread.join(timeout=2.0)
+
+    def _writer(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._write_pending()
+
+    def _write_pending(self):
+        # io_lock first: readers never see a batch that is neither pending nor on disk
+        with self._io_lock:
+            with self._flushed:
+                batch = list(self._pending)
+                self._pending.clear()
+                seq = self._queued_seq
+            if batch:
+                try:
+                    self._append(batch)
+                except Exception as e:
+                    print(f"Log error: {e}")
+        with self._flushed:
+            self._written_seq = max(self._written_seq, seq)
+            self._flushed.notify_all()
+
+    def _append(self, entries):
+        index_path = self._index_path(self.log_file)
+        with open(self.log_file, 'ab') as f:
+            offset = f.tell()
+            if self._bytes_since_index is None:
+                # First write this session: only index if the file is new
+                self._bytes_since_index = INDEX_EVERY_BYTES if offset == 0 else 0
+            data = b"".join((json.dumps(e) + "\n").encode('utf-8') for e in entries)
+            if self._bytes_since_index >= INDEX_EVERY_BYTES:
+                with open(index_path, 'a') as idx:
+                    idx.write(f"{entries[0]['timestamp']} {offset}\n")
+                self._bytes_since_index = 0
+            f.write(data)
+            self._bytes_since_index += len(data)
+            size = offset + len(data)
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        # activity.jsonl -> activity.1.jsonl -> ... ; the oldest backup is overwritten
+        for i in range(self.backup_count - 1, -1, -1):
+            src = self._rotated_path(i)
+            if not src.exists():
+                continue
+            dst = self._rotated_path(i + 1)
+            src.replace(dst)
+            src_idx, dst_idx = self._index_path(src), self._index_path(dst)
+            if src_idx.exists():
+                src_idx.replace(dst_idx)
+            elif dst_idx.exists():
+                dst_idx.unlink()
+        self._bytes_since_index = INDEX_EVERY_BYTES  # New file starts with an index point
+
+    def _rotated_path(self, n):
+        return self.log_file if n == 0 else self.log_dir / f"activity.{n}.jsonl"
+
+    @staticmethod
+    def _index_path(path):
+        return path.with_name(path.name + INDEX_SUFFIX)
+
+    def _migrate_legacy(self):
+        """One-time conversion of the old newest-first activity.json array."""
+        legacy = self.log_dir / LEGACY_LOG_FILE_NAME
+        if not legacy.exists():
+            return
         try:
-            with open(self.log_file, 'w') as f:
-                json.dump(logs, f, indent=2)
+            with open(legacy, 'r') as f:
+                old = json.load(f)
+            with self._io_lock:
+                if old:
+                    self._append(list(reversed(old)))
+            legacy.replace(legacy.with_name(legacy.name + ".migrated"))
         except Exception as e:
-            print(f"Log error: {e}")
-            
-    def get_logs(self, limit=100):
-        return self._read_logs()[:limit]
-        
-    def _read_logs(self):
-        if not self.log_file.exists():
-            return []
+            print(f"Log migration error: {e}")
+
+    # --- Reading ---
+
+    def _log_files(self):
+        """Live file first, then backups from newest to oldest."""
+        return [p for p in (self._rotated_path(n) for n in range(self.backup_count + 1)) if p.exists()]
+
+    @staticmethod
+    def _parse(line):
         try:
-            with open(self.log_file, 'r') as f:
-                return json.load(f)
-        except:
-            return []
-            
+            return json.loads(line)
+        except ValueError:
+            return None  # Torn write at the tail
+
+    def _tail_lines(self, path, limit):
+        """Last `limit` lines of path, newest first, reading backwards in blocks."""
+        lines = []
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            remainder = b""
+            while pos > 0 and len(lines) < limit:
+                step = min(TAIL_BLOCK_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                chunk = f.read(step) + remainder
+                parts = chunk.split(b"\n")
+                remainder = parts[0]
+                for part in reversed(parts[1:]):
+                    if part:
+                        lines.append(part)
+            if remainder and len(lines) < limit:
+                lines.append(remainder)
+        return lines[:limit]
+
+    def get_logs(self, limit=100):
+        """Most recent entries, newest first (including ones not yet flushed)."""
+        with self._io_lock:
+            with self._flushed:
+                logs = list(reversed(self._pending))[:limit]
+            for path in self._log_files():
+                if len(logs) >= limit:
+                    break
+                for line in self._tail_lines(path, limit - len(logs)):
+                    entry = self._parse(line)
+                    if entry:
+                        logs.append(entry)
+        return logs[:limit]
+
+    def query(self, start=None, end=None, action=None, limit=None):
+        """
+        Entries with start <= timestamp <= end (datetimes or ISO strings),
+        newest first. Uses the sidecar index to skip to the range start.
+        """
+        start = start.isoformat() if isinstance(start, datetime.datetime) else start
+        end = end.isoformat() if isinstance(end, datetime.datetime) else end
+        self.flush()
+        results = []
+        with self._io_lock:
+            for path in self._log_files():  # Newest file first
+                file_hits = []
+                with open(path, 'rb') as f:
+                    f.seek(self._seek_offset(path, start))
+                    for line in f:
+                        entry = self._parse(line)
+                        if not entry:
+                            continue
+                        ts = entry.get('timestamp', '')
+                        if start and ts < start:
+                            continue
+                        if end and ts > end:
+                            break
+                        if action and entry.get('action') != action:
+                            continue
+                        file_hits.append(entry)
+                results.extend(reversed(file_hits))
+                if limit and len(results) >= limit:
+                    break
+                # Older files can't contain anything newer than start
+                first = self._first_timestamp(path)
+                if start and first and first <= start:
+                    break
+        return results[:limit] if limit else results
+
+    def _seek_offset(self, path, start):
+        """Largest indexed offset whose timestamp is before start."""
+        if not start:
+            return 0
+        offset = 0
+        index_path = self._index_path(path)
+        if index_path.exists():
+            with open(index_path, 'r') as idx:
+                for line in idx:
+                    ts, _, pos = line.strip().rpartition(' ')
+                    if ts and ts < start:
+                        offset = int(pos)
+                    else:
+                        break
+        return offset
+
+    def _first_timestamp(self, path):
+        with open(path, 'rb') as f:
+            entry = self._parse(f.readline())
+        return entry.get('timestamp') if entry else None
+
     def clear(self):
-        try:
-            with open(self.log_file, 'w') as f:
-                json.dump([], f)
-        except:
-            pass
+        with self._flushed:
+            self._pending.clear()
+        with self._io_lock:
+            for path in self._log_files():
+                path.unlink()
+                if self._index_path(path).exists():
+                    self._index_path(path).unlink()
+            self._bytes_since_index = None
@@ -1,145 +1,460 @@
+import datetime
+import math
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 
-class AnalyticsManager:
-    def __init__(self, inventory_manager):
+# Dimensions kept by InventoryAggregates
+DIM_STATUS = "status"
+DIM_MODEL = "model"
+DIM_SUPPLIER = "supplier"
+DIM_BRAND = "brand"
+DIM_STATUS_MODEL = "status_model"
+DIMENSIONS = (DIM_STATUS, DIM_MODEL, DIM_SUPPLIER, DIM_BRAND, DIM_STATUS_MODEL)
+REBUILD_ATTEMPTS = 5  # Snapshots retaken when row events race a full rebuild
+
+# Group stats layout: [count, price_sum, price_n, cost_sum, cost_n]
+_COUNT, _PRICE, _PRICE_N, _COST, _COST_N = range(5)
+
+def _num(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+def _label(value):
+    """Group key for a model/supplier cell; None for missing (value_counts skips NaN)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value
+
+def brand_of(model):
+    """Brand as shown on the dashboard: first word of the model name, upper-cased."""
+    parts = str(model).split()
+    return parts[0].upper() if parts else ""
+
+def _sim_sum(stats, which, sim_params):
+    """Sum of price or cost for a group under the (linear) price simulation."""
+    price, cost = stats[_PRICE], stats[_COST]
+    if not sim_params or not sim_params.get('enabled', False):
+        return price if which == 'price' else cost
+    tgt = 'price' if sim_params.get('target', 'cost') != 'cost' else 'cost'
+    if which != tgt:
+        return price if which == 'price' else cost
+    pct = float(sim_params.get('percent', 0.0))
+    flat = float(sim_params.get('flat', 0.0))
+    if sim_params.get('base', 'price') == 'price':
+        base_sum, base_n = price, stats[_PRICE_N]
+    else:
+        base_sum, base_n = cost, stats[_COST_N]
+    return base_sum * (1 + pct / 100.0) + flat * base_n
+
+# Columns of the scenario grid returned by simulate_scenarios
+SIM_METRICS = ("total_value", "total_cost", "est_profit", "realized_sales", "realized_profit")
+
+def simulate_scenarios(stock, sold, percents, flats=(0.0,), target='cost', base='price'):
+    """
+    Price simulation for every (percent, flat) pair at once. stock and sold
+    are group stats rows; since the simulation is linear, each scenario
+    only needs the sums and non-null counts, broadcast as
+    (subset, percent, flat). Returns a DataFrame indexed by
+    (percent, flat) with the SIM_METRICS columns, matching
+    InventoryAggregates.summary for the same sim_params.
+    """
+    stats = np.array([stock, sold], dtype=float)                      # (2, stats)
+    pct = np.asarray(percents, dtype=float).reshape(1, -1, 1)
+    flat = np.asarray(flats, dtype=float).reshape(1, 1, -1)
+    shape = (2, pct.shape[1], flat.shape[2])
+
+    tgt = 'price' if target != 'cost' else 'cost'
+    sum_col, n_col = (_PRICE, _PRICE_N) if base == 'price' else (_COST, _COST_N)
+    simulated = stats[:, sum_col, None, None] * (1 + pct / 100.0) + flat * stats[:, n_col, None, None]
+    price = simulated if tgt == 'price' else np.broadcast_to(stats[:, _PRICE, None, None], shape)
+    cost = simulated if tgt == 'cost' else np.broadcast_to(stats[:, _COST, None, None], shape)
+
+    metrics = np.stack([price[0], cost[0], price[0] - cost[0], price[1], price[1] - cost[1]], axis=-1)
+    index = pd.MultiIndex.from_product([np.ravel(percents), np.ravel(flats)], names=['percent', 'flat'])
+    return pd.DataFrame(metrics.reshape(-1, len(SIM_METRICS)), index=index, columns=list(SIM_METRICS))
+
+class InventoryAggregates:
+    """
+    Item counts plus price/cost sums grouped by status, model, supplier,
+    brand and (status, model). InventoryManager row events update it in O(1)
+    per changed item by swapping that item's previous contribution for its
+    new one; only full reloads rebuild it from the DataFrame.
+    """
+    def __init__(self, inventory_manager=None):
         self.inv_manager = inventory_manager
+        self._lock = threading.Lock()
+        self._items = {}   # uid -> [contribution, ...] (duplicated uids keep one per row)
+        self._groups = {dim: {} for dim in DIMENSIONS}
+        self._built = False
+        if inventory_manager is not None:
+            inventory_manager.add_row_listener(self.on_rows)
 
-    def get_summary(self, sim_params=None):
-        df = self.inv_manager.get_inventory()
-        if df.empty:
-            return {
-                "total_items": 0,
-                "total_value": 0.0,
-                "total_cost": 0.0,
-                "est_profit": 0.0,
-                "status_counts": {"IN": 0, "OUT": 0, "RTN": 0},
-                "top_models": {},
-                "supplier_dist": {}
-            }
-            
-        # Normalize status for consistent counting
-        df['status'] = df['status'].astype(str).str.upper().str.strip()
-        
-        # Ensure Cost Column
-        if 'price_original' not in df.columns:
-            df['price_original'] = df['price']
-
-        # HELPER: Vectorized Simulation
-        def get_sim_values(sub_df):
-            if not sim_params or not sim_params.get('enabled', False):
-                return sub_df['price'], sub_df['price_original']
-            
-            tgt = sim_params.get('target', 'cost')
-            base = sim_params.get('base', 'price')
-            pct = float(sim_params.get('percent', 0.0))
-            flat = float(sim_params.get('flat', 0.0))
-            
-            base_series = sub_df['price'] if base == 'price' else sub_df['price_original']
-            new_val = base_series * (1 + pct/100.0) + flat
-            
-            if tgt == 'cost':
-                return sub_df['price'], new_val
-            else:
-                return new_val, sub_df['price_original']
-
-        # --- Metrics for CURRENT STOCK (Status = IN only) ---
-        stock_df = df[df['status'] == 'IN'].copy()
-        
-        # Calculate Simulated Values
-        s_price, s_cost = get_sim_values(stock_df)
-        
-        total_items = len(stock_df)
-        total_value = s_price.sum()
-        total_cost = s_cost.sum()
-        est_profit = total_value - total_cost
-        
-        # --- Realized Profit (Sold Items Only) ---
-        sold_df = df[df['status'] == 'OUT'].copy()
-        
-        r_price, r_cost = get_sim_values(sold_df)
-        
-        realized_sales = r_price.sum()
-        realized_profit = realized_sales - r_cost.sum()
-        
-        # Status Counts
-        s_counts = df['status'].value_counts().to_dict()
-        
-        # Top 5 Models
-        top_models = df['model'].value_counts().head(5).to_dict()
-        
-        # Supplier Distribution
-        supplier_dist = df['supplier'].value_counts().to_dict()
-        
+    # --- Maintenance ---
+
+    @staticmethod
+    def _contribution(row):
+        model = _label(row.get('model'))
+        price = _num(row.get('price'))
+        cost = _num(row['price_original']) if 'price_original' in row else price
+        return (str(row.get('status')).upper().strip(), model, _label(row.get('supplier')),
+                brand_of(model) if model is not None else None, price, cost)
+
+    def _add_unlocked(self, contribution, sign):
+        status, model, supplier, brand, price, cost = contribution
+        keys = ((DIM_STATUS, status), (DIM_MODEL, model), (DIM_SUPPLIER, supplier),
+                (DIM_BRAND, brand), (DIM_STATUS_MODEL, (status, model) if model is not None else None))
+        for dim, key in keys:
+            if key is None:
+                continue
+            groups = self._groups[dim]
+            stats = groups.get(key)
+            if stats is None:
+                stats = groups[key] = [0, 0.0, 0, 0.0, 0]
+            stats[_COUNT] += sign
+            if price is not None:
+                stats[_PRICE] += sign * price
+                stats[_PRICE_N] += sign
+            if cost is not None:
+                stats[_COST] += sign * cost
+                stats[_COST_N] += sign
+            if stats[_COUNT] <= 0:
+                del groups[key]
+
+    def on_rows(self, action, rows):
+        """InventoryManager row listener."""
+        if rows is None:
+            self.rebuild()
+            return
+        by_uid = {}
+        for row in rows:
+            by_uid.setdefault(str(row.get('unique_id')), []).append(self._contribution(row))
+        with self._lock:
+            if not self._built:
+                return  # First read builds from the full frame, which includes these rows
+            for uid, contributions in by_uid.items():
+                for old in self._items.get(uid, ()):
+                    self._add_unlocked(old, -1)
+                for new in contributions:
+                    self._add_unlocked(new, 1)
+                self._items[uid] = contributions
+
+    def rebuild(self, df=None):
+        """
+        Recomputes everything from the inventory DataFrame. When reading the
+        inventory itself, the snapshot is retaken if a row event landed while
+        it was being aggregated (its generation moved), so the edit is not
+        lost to the swap; events after the swap apply incrementally.
+        """
+        if df is not None or self.inv_manager is None:
+            items, groups = self._aggregate(df if df is not None else pd.DataFrame())
+            with self._lock:
+                self._items, self._groups, self._built = items, groups, True
+            return
+        for attempt in range(REBUILD_ATTEMPTS):
+            generation = self.inv_manager.generation
+            items, groups = self._aggregate(self.inv_manager.get_inventory())
+            with self._lock:
+                if self.inv_manager.generation == generation or attempt == REBUILD_ATTEMPTS - 1:
+                    self._items, self._groups, self._built = items, groups, True
+                    return
+
+    def _aggregate(self, df):
+        """(items, groups) for a full inventory frame."""
+        items, groups = {}, {dim: {} for dim in DIMENSIONS}
+        if not df.empty:
+            status = df['status'].astype(str).str.upper().str.strip() if 'status' in df.columns \
+                else pd.Series('NONE', index=df.index)
+            model = df['model'] if 'model' in df.columns else pd.Series(None, index=df.index, dtype=object)
+            price = pd.to_numeric(df['price'], errors='coerce') if 'price' in df.columns \
+                else pd.Series(float('nan'), index=df.index)
+            cost = pd.to_numeric(df['price_original'], errors='coerce') if 'price_original' in df.columns else price
+            frame = pd.DataFrame({
+                DIM_STATUS: status,
+                DIM_MODEL: model,
+                DIM_SUPPLIER: df['supplier'] if 'supplier' in df.columns else None,
+                DIM_BRAND: model.map(lambda m: brand_of(m) if _label(m) is not None else None),
+                'price': price, 'cost': cost,
+            })
+            for dim, keys in ((DIM_STATUS, [DIM_STATUS]), (DIM_MODEL, [DIM_MODEL]),
+                              (DIM_SUPPLIER, [DIM_SUPPLIER]), (DIM_BRAND, [DIM_BRAND]),
+                              (DIM_STATUS_MODEL, [DIM_STATUS, DIM_MODEL])):
+                agg = frame.groupby(keys, dropna=True, sort=False).agg(
+                    count=('price', 'size'), price_sum=('price', 'sum'), price_n=('price', 'count'),
+                    cost_sum=('cost', 'sum'), cost_n=('cost', 'count'))
+                groups[dim] = {key: [int(r[0]), float(r[1]), int(r[2]), float(r[3]), int(r[4])]
+                               for key, r in zip(agg.index, agg.itertuples(index=False))}
+
+            uids = df['unique_id'].astype(str) if 'unique_id' in df.columns else df.index.astype(str)
+            prices = [_num(v) for v in price]
+            costs = prices if cost is price else [_num(v) for v in cost]
+            models = [_label(m) for m in model]
+            suppliers = [_label(v) for v in frame[DIM_SUPPLIER]]
+            for uid, st, m, sup, p, c in zip(uids, status, models, suppliers, prices, costs):
+                items.setdefault(uid, []).append((st, m, sup, brand_of(m) if m is not None else None, p, c))
+        return items, groups
+
+    def _ensure_built(self):
+        if not self._built:
+            self.rebuild()
+
+    # --- Queries (constant time in inventory size) ---
+
+    def group(self, dim, key):
+        """{'count', 'price_sum', 'cost_sum', 'avg_price'} for one group (zeros if absent)."""
+        self._ensure_built()
+        with self._lock:
+            stats = list(self._groups[dim].get(key, (0, 0.0, 0, 0.0, 0)))
+        return {"count": stats[_COUNT], "price_sum": stats[_PRICE], "cost_sum": stats[_COST],
+                "avg_price": stats[_PRICE] / stats[_PRICE_N] if stats[_PRICE_N] else 0.0}
+
+    def counts(self, dim, limit=None):
+        """{key: count}, largest first."""
+        self._ensure_built()
+        with self._lock:
+            pairs = [(k, v[_COUNT]) for k, v in self._groups[dim].items()]
+        pairs.sort(key=lambda kv: kv[1], reverse=True)
+        return dict(pairs[:limit] if limit else pairs)
+
+    def model_summary(self, limit=20):
+        """[(model, in_stock, sold, avg_price)] sorted by in-stock count."""
+        self._ensure_built()
+        with self._lock:
+            by_status = self._groups[DIM_STATUS_MODEL]
+            rows = []
+            for model, stats in self._groups[DIM_MODEL].items():
+                in_stock = by_status.get(('IN', model), (0,))[_COUNT]
+                sold = by_status.get(('OUT', model), (0,))[_COUNT]
+                avg = stats[_PRICE] / stats[_PRICE_N] if stats[_PRICE_N] else float('nan')
+                rows.append((model, in_stock, sold, avg))
+        rows.sort(key=lambda r: r[1], reverse=True)
+        return rows[:limit]
+
+    def simulate(self, percents, flats=(0.0,), target='cost', base='price'):
+        """Scenario x metric grid for the stock/sold totals (see simulate_scenarios)."""
+        self._ensure_built()
+        with self._lock:
+            stock = list(self._groups[DIM_STATUS].get('IN', (0, 0.0, 0, 0.0, 0)))
+            sold = list(self._groups[DIM_STATUS].get('OUT', (0, 0.0, 0, 0.0, 0)))
+        return simulate_scenarios(stock, sold, percents, flats, target, base)
+
+    def summary(self, sim_params=None):
+        """Same result as the old DataFrame-based AnalyticsManager.get_summary."""
+        self._ensure_built()
+        with self._lock:
+            stock = list(self._groups[DIM_STATUS].get('IN', (0, 0.0, 0, 0.0, 0)))
+            sold = list(self._groups[DIM_STATUS].get('OUT', (0, 0.0, 0, 0.0, 0)))
+        total_value = _sim_sum(stock, 'price', sim_params)
+        total_cost = _sim_sum(stock, 'cost', sim_params)
+        realized_sales = _sim_sum(sold, 'price', sim_params)
         return {
-            "total_items": total_items,
+            "total_items": stock[_COUNT],
             "total_value": total_value,
             "total_cost": total_cost,
-            "est_profit": est_profit,
+            "est_profit": total_value - total_cost,
             "realized_sales": realized_sales,
-            "realized_profit": realized_profit,
-            "status_counts": s_counts,
-            "top_models": top_models,
-            "supplier_dist": supplier_dist
+            "realized_profit": realized_sales - _sim_sum(sold, 'cost', sim_params),
+            "status_counts": self.counts(DIM_STATUS) or {"IN": 0, "OUT": 0, "RTN": 0},
+            "top_models": self.counts(DIM_MODEL, limit=5),
+            "supplier_dist": self.counts(DIM_SUPPLIER),
         }
 
-    def get_demand_forecast(self):
+AGING_DAYS = 60          # Stock older than this is flagged on the dashboard
+RECENT_SALES_DAYS = 30
+LOW_STOCK_THRESHOLD = 2  # Model families with fewer units than this are "low"
+SOLD_STATUSES = ('OUT', 'SOLD')
+
+def to_datetime64(series):
+    """Any mix of ISO strings / datetimes -> naive datetime64 (unparseable -> NaT)."""
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series, errors='coerce', format='ISO8601')
+    if getattr(series.dt, 'tz', None) is not None:
+        series = series.dt.tz_localize(None)
+    return series
+
+def model_families(models):
+    """'Redmi Note 13 Pro' -> 'Redmi Note' (first two words), vectorized."""
+    return models.astype(str).str.split(n=2).str[:2].str.join(" ")
+
+class DashboardMetrics:
+    """Ready-to-render numbers and rows for DashboardScreen."""
+    def __init__(self, stock_count=0, stock_value=0.0, sold_this_month=0, aging_count=0,
+                 aging_rows=None, low_stock=None, top_sellers=None):
+        self.stock_count = stock_count
+        self.stock_value = stock_value
+        self.sold_this_month = sold_this_month
+        self.aging_count = aging_count
+        self.aging_rows = aging_rows or []      # [(model, age_days, price)], oldest first
+        self.low_stock = low_stock or []        # [(family, count)]
+        self.top_sellers = top_sellers or []    # [(family, count)], best first
+
+def compute_dashboard_metrics(df, now=None, aging_rows=20, low_rows=20, top_rows=10):
+    """Dashboard KPIs, aging list, low-stock families and recent top sellers."""
+    if df is None or df.empty:
+        return DashboardMetrics()
+    now = pd.Timestamp(now or datetime.datetime.now())
+    now64 = now.to_datetime64()
+    status = df['status']
+    updated = to_datetime64(df['last_updated']) if 'last_updated' in df.columns \
+        else pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    # Whole days elapsed (floor, like timedelta.days); NaN where the date is missing
+    days = (now64 - updated.to_numpy(dtype='datetime64[ns]')) / np.timedelta64(1, 'D')
+    days = np.floor(days)
+
+    available = (status == 'IN').to_numpy()
+    sold = status.isin(SOLD_STATUSES).to_numpy()
+    prices = pd.to_numeric(df['price'], errors='coerce')
+
+    this_month = (updated.dt.to_period('M') == now.to_period('M')).to_numpy()
+    sold_month = int((sold & this_month).sum())
+
+    age = np.nan_to_num(days, nan=0.0).astype(np.int64)
+    aging_mask = available & (age > AGING_DAYS)
+    order = np.argsort(-age[aging_mask], kind='stable')[:aging_rows]
+    models = df['model'].to_numpy()[aging_mask][order]
+    aging = list(zip(models, age[aging_mask][order].tolist(), prices.to_numpy()[aging_mask][order].tolist()))
+
+    families = model_families(df['model'])
+    fam_counts = families[available].value_counts()
+    low = fam_counts[fam_counts < LOW_STOCK_THRESHOLD].head(low_rows)
+
+    recent = sold & (days <= RECENT_SALES_DAYS)  # NaN compares False
+    top = families[recent].value_counts().head(top_rows)
+
+    return DashboardMetrics(
+        stock_count=int(available.sum()),
+        stock_value=float(prices[available].sum()),
+        sold_this_month=sold_month,
+        aging_count=int(aging_mask.sum()),
+        aging_rows=aging,
+        low_stock=[(k, int(v)) for k, v in low.items()],
+        top_sellers=[(k, int(v)) for k, v in top.items()],
+    )
+
+DEFAULT_CACHE_SIZE = 32
+
+def _freeze(value):
+    """Parameters (dicts/lists) -> hashable cache key part."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+class AnalyticsCache:
+    """
+    LRU cache of analytics results keyed by (inventory generation, function,
+    parameters). Entries from older generations are never returned, and the
+    cache is emptied on inventory change events to free them early.
+    """
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, generation, name, params, compute):
+        """Cached result of compute() for this key, computing it on a miss."""
+        key = (generation, name, _freeze(params))
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        result = compute()
+        with self._lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return result
+
+    def invalidate(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+class AnalyticsManager:
+    """
+    Analytics over the live inventory. Results are memoized per inventory
+    generation, so repeated refreshes are free until the data changes.
+    Returned objects are shared between callers and must not be modified.
+    """
+    def __init__(self, inventory_manager, cache_size=DEFAULT_CACHE_SIZE, sales_archive=None):
+        self.inv_manager = inventory_manager
+        self.sales_archive = sales_archive  # core.sales_cube.SalesArchive, or None for live rows only
+        self.aggregates = InventoryAggregates(inventory_manager)
+        self.cache = AnalyticsCache(cache_size)
+        inventory_manager.add_row_listener(self._on_rows)
+
+    def _on_rows(self, action, rows):
+        self.cache.invalidate()
+
+    def _cached(self, name, params, compute):
+        generation = getattr(self.inv_manager, 'generation', None)
+        return self.cache.get(generation, name, params, compute)
+
+    def get_summary(self, sim_params=None):
+        """KPI summary from the incrementally maintained aggregates."""
+        return self._cached("summary", sim_params, lambda: self.aggregates.summary(sim_params))
+
+    def get_simulation_grid(self, percents, flats=(0.0,), target='cost', base='price'):
+        """
+        Sensitivity table over (percent, flat) scenarios; see simulate_scenarios.
+        Not memoized: a grid costs a couple of ms, and caching one per dialog
+        keystroke would evict the expensive entries from the shared cache.
+        """
+        return self.aggregates.simulate(percents, flats, target, base)
+
+    def get_dashboard_metrics(self):
+        # Keyed by day too: aging days and "this month" move on with the date
+        return self._cached("dashboard", datetime.date.today().isoformat(),
+                            lambda: compute_dashboard_metrics(self.inv_manager.get_inventory()))
+
+    def get_sold_items(self):
+        """Rows with status OUT (DataFrame)."""
+        def compute():
+            df = self.inv_manager.get_inventory()
+            if df.empty or 'status' not in df.columns:
+                return pd.DataFrame(columns=df.columns)
+            return df[df['status'] == 'OUT']
+        return self._cached("sold_items", None, compute)
+
+    def get_cube(self):
+        """SalesCube over the inventory (and archived sales), built once per generation."""
+        from .sales_cube import SalesCube
+        return self._cached("cube", None, lambda: SalesCube.build(self.inv_manager.get_inventory(),
+                                                                  self.sales_archive))
+
+    def get_buyer_stats(self, limit=15):
+        """[(buyer, items, total_price)] for sold items, highest spend first."""
+        def compute():
+            stats = self.get_cube().rollup('buyer', where={'status': 'OUT'}, limit=limit)
+            return [(b, int(r.count), float(r.revenue)) for b, r in zip(stats.index, stats.itertuples())]
+        return self._cached("buyer_stats", limit, compute)
+
+    def get_forecast(self, by="model"):
+        """Full demand forecast table (see core.forecasting.forecast_demand)."""
+        from .forecasting import forecast_demand
+        # Keyed by day too: velocities decay as days pass without new sales
+        key = (by, datetime.date.today().isoformat())
+        return self._cached("forecast", key, lambda: forecast_demand(self.inv_manager.get_inventory(), by=by))
+
+    def get_demand_forecast(self, by="model"):
         """
-        AI/Statistical Forecast for Stock Demand.
-        Returns: List of dicts {model, sales_velocity, current_stock, days_remaining, status}
+        Models (or families/brands) running low or out of stock, most urgent
+        first: list of dicts {model, velocity (per week), stock, days_left,
+        reorder_qty, status}. Velocity is an EWMA of daily sales by sold date.
         """
-        df = self.inv_manager.get_inventory()
-        if df.empty or 'status' not in df.columns or 'last_updated' not in df.columns:
-            return []
-            
-        # 1. Calculate Sales Velocity (Items sold per day over last 30 days)
-        sold_df = df[df['status'] == 'OUT'].copy()
-        
-        # Ensure dates
-        sold_df['last_updated'] = pd.to_datetime(sold_df['last_updated'], errors='coerce')
-        
-        # Filter for recent history (e.g., last 60 days to get a trend)
-        cutoff_date = pd.Timestamp.now() - pd.Timedelta(days=60)
-        recent_sales = sold_df[sold_df['last_updated'] >= cutoff_date]
-        
-        if recent_sales.empty:
-            return []
-            
-        # Group by Model -> Count
-        sales_counts = recent_sales['model'].value_counts()
-        
-        # Velocity = Count / 60 days
-        # Improvement: If first sale was 10 days ago, divide by 10, not 60?
-        # For simplicity/robustness, we use a fixed window of 30 days active selling.
-        # Let's use 30 days average.
-        sales_velocity = sales_counts / 60.0 # items per day
-        
-        # 2. Get Current Stock
-        stock_df = df[df['status'] == 'IN']
-        stock_counts = stock_df['model'].value_counts()
-        
-        # 3. Forecast
-        alerts = []
-        for model, velocity in sales_velocity.items():
-            if velocity < 0.1: continue # Ignore very slow movers (< 1 per 10 days)
-            
-            current_stock = stock_counts.get(model, 0)
-            
-            if current_stock == 0:
-                days_left = 0
-                status = "OUT_OF_STOCK"
-            else:
-                days_left = int(current_stock / velocity)
-                status = "LOW_STOCK" if days_left < 14 else "OK"
-            
-            if status != "OK":
-                alerts.append({
-                    "model": model,
-                    "velocity": round(velocity * 7, 1), # Weekly Sales
-                    "stock": current_stock,
-                    "days_left": days_left,
-                    "status": status
-                })
-        
-        # Sort by urgency (Out of stock first, then low days)
-        alerts.sort(key=lambda x: x['days_left'])
-        return alerts
+        from .forecasting import demand_alerts
+        key = (by, datetime.date.today().isoformat())
+        return self._cached("demand_forecast", key, lambda: demand_alerts(self.get_forecast(by), key_name=by))
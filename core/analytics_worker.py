@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class AnalyticsResult:
+    """One finished section of an analytics request, posted back to the screen."""
+    def __init__(self, channel, request_id, section, data=None, error=None):
+        self.channel = channel          # Which view asked ('dashboard', 'analytics', ...)
+        self.request_id = request_id
+        self.section = section          # Section name given to submit()
+        self.data = data
+        self.error = error              # Exception raised by the section, or None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+class AnalyticsWorker:
+    """
+    Runs analytics sections off the Tk thread, one request at a time.
+
+    A request is an ordered list of (section, fn) pairs; callback receives an
+    AnalyticsResult as each section finishes so views fill in progressively.
+    The callback runs on the worker thread; GUI callers marshal with after().
+    Each channel has at most one live request: submitting again or calling
+    cancel(channel) makes the old one stale, and its remaining sections are
+    skipped and its late results dropped.
+    """
+    def __init__(self, max_workers=1):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analytics")
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._current = {}  # channel -> live request id
+
+    def submit(self, channel, sections, callback):
+        """Queues sections for channel, superseding its previous request. Returns the request id."""
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._current[channel] = request_id
+        try:
+            self._executor.submit(self._run, channel, request_id, list(sections), callback)
+        except RuntimeError:  # Shut down
+            return None
+        return request_id
+
+    def cancel(self, channel):
+        with self._lock:
+            self._current.pop(channel, None)
+
+    def is_current(self, channel, request_id):
+        with self._lock:
+            return self._current.get(channel) == request_id
+
+    def _run(self, channel, request_id, sections, callback):
+        for section, fn in sections:
+            if not self.is_current(channel, request_id):
+                return
+            try:
+                result = AnalyticsResult(channel, request_id, section, data=fn())
+            except Exception as e:
+                print(f"Analytics Error ({channel}/{section}): {e}")
+                result = AnalyticsResult(channel, request_id, section, error=e)
+            if not self.is_current(channel, request_id):
+                return
+            try:
+                callback(result)
+            except Exception as e:
+                print(f"Analytics callback error: {e}")
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            self._current.clear()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,167 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from .utils import SafeJsonWriter
+from .config import APP_DIR
+
+BACKUP_DIR = APP_DIR / "backups"
+BACKUP_INDEX_NAME = "index.json"
+OBJECTS_DIR_NAME = "objects"
+
+DEFAULT_BACKUP_WINDOW = 300.0   # Seconds: at most one backup per file per window
+DEFAULT_MAX_BACKUPS = 5         # Distinct versions kept per file
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class BackupManager:
+    """
+    Compressed, content-addressed backups of source workbooks.
+
+    Each distinct file version is stored once as objects/ab/abcd....gz
+    (sha256 of the uncompressed bytes). index.json maps a source path to its
+    versions, newest last, so rotation and restore never scan the directory.
+    A file is backed up at most once per `window` seconds, and not at all if
+    its content matches the newest backup.
+    """
+    def __init__(self, backup_dir=None, window=DEFAULT_BACKUP_WINDOW, max_backups=DEFAULT_MAX_BACKUPS):
+        self.backup_dir = Path(backup_dir) if backup_dir else BACKUP_DIR
+        self.objects_dir = self.backup_dir / OBJECTS_DIR_NAME
+        self.index_path = self.backup_dir / BACKUP_INDEX_NAME
+        self.window = window
+        self.max_backups = max_backups
+        self._lock = threading.Lock()
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return {"files": {}}
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+            data.setdefault("files", {})
+            return data
+        except Exception as e:
+            print(f"Backup index load error: {e}")
+            return {"files": {}}
+
+    def _save_index_unlocked(self):
+        return SafeJsonWriter.write(self.index_path, self.index, indent=None)
+
+    def _object_path(self, digest):
+        return self.objects_dir / digest[:2] / f"{digest}.gz"
+
+    @staticmethod
+    def _key(file_path):
+        return os.path.normcase(os.path.abspath(str(file_path)))
+
+    # --- Backup ---
+
+    def backup(self, file_path, force=False):
+        """
+        Ensures a backup of file_path's current content exists.
+        Returns the backup object path (possibly an existing one), or None on failure.
+        """
+        path = Path(file_path)
+        if not path.exists():
+            return None
+        key = self._key(path)
+        try:
+            with self._lock:
+                st = path.stat()
+                versions = self.index["files"].setdefault(key, [])
+                last = versions[-1] if versions else None
+                now = time.time()
+
+                if last and not force:
+                    unchanged = last.get("mtime") == st.st_mtime and last.get("size") == st.st_size
+                    if unchanged or now - last.get("ts", 0) < self.window:
+                        return str(self._object_path(last["hash"]))
+
+                digest = _file_sha256(path)
+                obj = self._object_path(digest)
+                if last and last["hash"] == digest:
+                    # Same content (e.g. touched): refresh the entry, store nothing
+                    last.update({"ts": now, "mtime": st.st_mtime, "size": st.st_size})
+                else:
+                    if not obj.exists():
+                        self._write_object(path, obj)
+                    versions.append({"hash": digest, "ts": now, "mtime": st.st_mtime, "size": st.st_size,
+                                     "name": path.name})
+                    self._rotate_unlocked(key)
+                self._save_index_unlocked()
+                return str(obj)
+        except Exception as e:
+            print(f"Backup Error: {e}")
+            return None
+
+    def _write_object(self, src, obj):
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        tmp = obj.with_suffix('.tmp')
+        with open(src, 'rb') as f_in, open(tmp, 'wb') as raw:
+            # Workbooks are already zip-compressed; level 1 keeps this cheap
+            with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=1, mtime=0) as f_out:
+                shutil.copyfileobj(f_in, f_out, HASH_CHUNK_SIZE)
+            raw.flush()
+            os.fsync(raw.fileno())
+        tmp.replace(obj)
+
+    def _rotate_unlocked(self, key):
+        versions = self.index["files"][key]
+        dropped = versions[:-self.max_backups] if len(versions) > self.max_backups else []
+        del versions[:len(dropped)]
+        if not dropped:
+            return
+        live = {v["hash"] for vs in self.index["files"].values() for v in vs}
+        for entry in dropped:
+            if entry["hash"] not in live:
+                try:
+                    self._object_path(entry["hash"]).unlink()
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    print(f"Cleanup Error: {e}")
+
+    # --- Listing / restore ---
+
+    def list_backups(self, file_path):
+        """Backups of file_path, newest first: dicts with hash, ts, size, name, created."""
+        with self._lock:
+            versions = list(self.index["files"].get(self._key(file_path), []))
+        result = []
+        for v in reversed(versions):
+            entry = dict(v)
+            entry["created"] = datetime.datetime.fromtimestamp(v["ts"]).strftime("%Y-%m-%d %H:%M:%S")
+            result.append(entry)
+        return result
+
+    def restore(self, file_path, digest=None, dest=None):
+        """
+        Writes a backed-up version (newest if digest is None) to dest, which
+        defaults to file_path itself. The current file is backed up first.
+        Returns the restored path, or None if there is no such backup.
+        """
+        versions = self.list_backups(file_path)
+        entry = next((v for v in versions if digest is None or v["hash"] == digest), None)
+        if not entry:
+            return None
+        target = Path(dest) if dest else Path(file_path)
+        if target.exists() and dest is None:
+            self.backup(target, force=True)
+        tmp = target.with_name(target.name + ".restore")
+        with gzip.open(self._object_path(entry["hash"]), 'rb') as f_in, open(tmp, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out, HASH_CHUNK_SIZE)
+        tmp.replace(target)
+        return str(target)
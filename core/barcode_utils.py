@@ -1,14 +1,20 @@
-import barcode
-from barcode.writer import ImageWriter
 from PIL import Image, ImageDraw, ImageFont
-import io
+from functools import lru_cache
 import os
 import platform
+from .code128 import code128_modules, module_runs
 
+FONT_CACHE_SIZE = 32
+BARCODE_CACHE_SIZE = 256
+BARCODE_QUIET_MODULES = 5  # 1mm at python-barcode's default 0.2mm module
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
 def load_font(font_name="arial", size=12):
     """
     Cross-platform font loader that tries multiple paths.
     Falls back to default if not found.
+    Cached per (font_name, size) for the whole process, so repeated labels
+    don't probe the filesystem or re-parse the TrueType file.
     """
     font_paths = []
     system = platform.system()
@@ -43,26 +49,41 @@ def load_font(font_name="arial", size=12):
     
     return ImageFont.load_default()
 
+@lru_cache(maxsize=BARCODE_CACHE_SIZE)
+def render_code128(data, width, height):
+    """
+    Draws a Code128 barcode straight from its module pattern at exactly
+    width x height pixels (quiet zones included). Cached per (data, size);
+    the returned image is shared, so callers must not draw on it.
+    """
+    # Subset B covers printable ASCII; anything else would not scan anyway
+    data = "".join(ch if 32 <= ord(ch) <= 126 else '?' for ch in str(data))
+    modules = code128_modules(data)
+    total = len(modules) + 2 * BARCODE_QUIET_MODULES
+    scale = width / total
+
+    img = Image.new('L', (width, height), 255)
+    draw = ImageDraw.Draw(img)
+    for is_bar, start, length in module_runs(modules):
+        if is_bar:
+            x0 = int(round((start + BARCODE_QUIET_MODULES) * scale))
+            x1 = int(round((start + length + BARCODE_QUIET_MODULES) * scale))
+            draw.rectangle([x0, 0, max(x0, x1 - 1), height - 1], fill=0)
+    return img
+
 class BarcodeGenerator:
     def __init__(self, config_manager):
         self.config_manager = config_manager
         
-    def generate_barcode_image(self, data):
-        """Generates a Code128 barcode image in memory."""
-        # Code128 is versatile
-        CODE128 = barcode.get_barcode_class('code128')
-        # Use ImageWriter to render as image, keeping it minimal (no text usually, we render text manually)
-        writer = ImageWriter()
-        
-        # Ensure data is string
+    def generate_barcode_image(self, data, size=None):
+        """
+        Generates a Code128 barcode image in memory.
+        size: (width, height) in pixels; defaults to 2px modules, 64px tall.
+        """
         data = str(data)
-        
-        rv = io.BytesIO()
-        code = CODE128(data, writer=writer)
-        code.write(rv, options={"write_text": False, "quiet_zone": 1.0, "module_height": 8.0})
-        rv.seek(0)
-        
-        return Image.open(rv)
+        if size is None:
+            size = ((len(code128_modules(data)) + 2 * BARCODE_QUIET_MODULES) * 2, 64)
+        return render_code128(data, int(size[0]), int(size[1]))
 
     def generate_label_preview(self, item_data, width_mm=50, height_mm=22, dpi=203):
         """
@@ -95,14 +116,13 @@ class BarcodeGenerator:
         
         # 2. Barcode
         barcode_val = item_data.get('unique_id', '00000')
-        bc_img = self.generate_barcode_image(barcode_val)
         
-        # Resize barcode to fit middle section
+        # Draw barcode at its final size in the middle section
         # target width: 80% of label
         # target height: 40% of label
         bc_w_target = int(width_px * 0.8)
         bc_h_target = int(height_px * 0.4)
-        bc_img = bc_img.resize((bc_w_target, bc_h_target))
+        bc_img = self.generate_barcode_image(barcode_val, (bc_w_target, bc_h_target))
         
         # Paste centered
         bc_x = int((width_px - bc_w_target) / 2)
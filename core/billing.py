@@ -7,6 +7,103 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 import datetime
 import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, as_completed
+from functools import lru_cache
+
+# --- Modern Palette ---
+ACCENT_COLOR = colors.HexColor("#2c3e50")
+LIGHT_BG = colors.HexColor("#f8f9fa")
+
+# Config keys the invoice layout reads (snapshot sent to batch workers)
+INVOICE_CONFIG_KEYS = ('store_name', 'store_address', 'store_gstin', 'store_contact',
+                       'gst_default_percent', 'invoice_terms')
+INVOICE_BATCH_MAX_WORKERS = 4
+
+@lru_cache(maxsize=1)
+def _invoice_styles():
+    """
+    Paragraph and table styles shared by every invoice. Built once per
+    process; ReportLab copies TableStyle commands into each Table, so
+    sharing them is safe.
+    """
+    styles = getSampleStyleSheet()
+    return {
+        'heading4': styles['Heading4'],
+        # Store Name (Big, Center)
+        'store_header': ParagraphStyle(
+            'StoreHeader',
+            parent=styles['Normal'],
+            fontName='Helvetica-Bold',
+            fontSize=24,
+            textColor=ACCENT_COLOR,
+            alignment=TA_CENTER,
+            spaceAfter=10
+        ),
+        # Standard Body (Left)
+        'body': ParagraphStyle(
+            'BodyLeft',
+            parent=styles['Normal'],
+            fontName='Helvetica',
+            fontSize=9,
+            leading=12,
+            alignment=TA_LEFT
+        ),
+        # Right Aligned Body (For Invoice Details)
+        'right': ParagraphStyle(
+            'BodyRight',
+            parent=styles['Normal'],
+            fontName='Helvetica',
+            fontSize=9,
+            leading=12,
+            alignment=TA_RIGHT
+        ),
+        'header_table': TableStyle([
+            ('VALIGN', (0,0), (-1,-1), 'TOP'),
+            ('LINEBELOW', (0,0), (-1,-1), 1, colors.lightgrey),
+            ('BOTTOMPADDING', (0,0), (-1,-1), 10),
+        ]),
+        'customer_table': TableStyle([
+            ('BACKGROUND', (0,0), (-1,-1), LIGHT_BG),
+            ('BOX', (0,0), (-1,-1), 0.5, colors.lightgrey),
+            ('topPadding', (0,0), (-1,-1), 8),
+            ('bottomPadding', (0,0), (-1,-1), 8),
+            ('leftPadding', (0,0), (-1,-1), 10),
+        ]),
+        'items_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), ACCENT_COLOR),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            ('TOPPADDING', (0, 0), (-1, 0), 10),
+            ('VALIGN', (0, 1), (-1, -1), 'TOP'),
+            ('ALIGN', (0, 1), (0, -1), 'CENTER'),
+            ('ALIGN', (1, 1), (1, -1), 'LEFT'),
+            ('ALIGN', (2, 1), (-1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.lightgrey),
+        ]),
+        'summary_table': TableStyle([
+            ('ALIGN', (0,0), (-1,-1), 'RIGHT'),
+            ('FONTNAME', (0,-1), (-1,-1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0,-1), (-1,-1), 12),
+            ('TEXTCOLOR', (0,-1), (-1,-1), ACCENT_COLOR),
+            ('LINEABOVE', (0,-1), (-1,-1), 1, colors.black),
+            ('TOPPADDING', (0,0), (-1,-1), 6),
+        ]),
+        'footer_table': TableStyle([
+            ('VALIGN', (0,0), (-1,-1), 'TOP'),
+            ('ALIGN', (1,0), (1,0), 'CENTER'),
+        ]),
+    }
+
+def _render_invoice_job(config_snapshot, job):
+    """Process-pool worker: renders one invoice job dict, returns (success, hash, total)."""
+    return BillingManager(config_snapshot).generate_invoice(**job)
 
 class BillingManager:
     def __init__(self, config_manager, activity_logger=None):
@@ -60,44 +157,10 @@ class BillingManager:
     def generate_invoice(self, items, buyer_details, invoice_number, filename, discount=None):
         doc = SimpleDocTemplate(filename, pagesize=A4, rightMargin=20, leftMargin=20, topMargin=20, bottomMargin=20)
         elements = []
-        styles = getSampleStyleSheet()
-        
-        # --- Modern Palette ---
-        ACCENT_COLOR = colors.HexColor("#2c3e50")
-        LIGHT_BG = colors.HexColor("#f8f9fa")
-        
-        # --- Fixed Styles (Creating new objects to avoid contamination) ---
-        
-        # Store Name (Big, Center)
-        style_store_header = ParagraphStyle(
-            'StoreHeader',
-            parent=styles['Normal'],
-            fontName='Helvetica-Bold',
-            fontSize=24,
-            textColor=ACCENT_COLOR,
-            alignment=TA_CENTER,
-            spaceAfter=10
-        )
-        
-        # Standard Body (Left)
-        style_body = ParagraphStyle(
-            'BodyLeft',
-            parent=styles['Normal'],
-            fontName='Helvetica',
-            fontSize=9,
-            leading=12,
-            alignment=TA_LEFT
-        )
-        
-        # Right Aligned Body (For Invoice Details)
-        style_right = ParagraphStyle(
-            'BodyRight',
-            parent=styles['Normal'],
-            fontName='Helvetica',
-            fontSize=9,
-            leading=12,
-            alignment=TA_RIGHT
-        )
+        styles = _invoice_styles()
+        style_store_header = styles['store_header']
+        style_body = styles['body']
+        style_right = styles['right']
         
         # --- 1. Header Section ---
         store_name = self.config.get('store_name', 'My Store')
@@ -119,11 +182,7 @@ class BillingManager:
         p_inv_details = Paragraph(inv_text, style_right)
         
         t_header = Table([[p_store_info, p_inv_details]], colWidths=[95*mm, 95*mm])
-        t_header.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('LINEBELOW', (0,0), (-1,-1), 1, colors.lightgrey),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 10),
-        ]))
+        t_header.setStyle(styles['header_table'])
         elements.append(t_header)
         elements.append(Spacer(1, 15))
 
@@ -133,13 +192,7 @@ class BillingManager:
         
         cust_data = [[Paragraph(f"<b>BILL TO:</b><br/>{buyer_name}<br/>Phone: {buyer_contact}", style_body)]]
         t_cust = Table(cust_data, colWidths=[190*mm])
-        t_cust.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,-1), LIGHT_BG),
-            ('BOX', (0,0), (-1,-1), 0.5, colors.lightgrey),
-            ('topPadding', (0,0), (-1,-1), 8),
-            ('bottomPadding', (0,0), (-1,-1), 8),
-            ('leftPadding', (0,0), (-1,-1), 10),
-        ]))
+        t_cust.setStyle(styles['customer_table'])
         elements.append(t_cust)
         elements.append(Spacer(1, 15))
 
@@ -173,24 +226,7 @@ class BillingManager:
             
         col_widths = [10*mm, 65*mm, 25*mm, 20*mm, 20*mm, 20*mm, 30*mm]
         t_items = Table(data, colWidths=col_widths, repeatRows=1)
-        
-        style_table = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), ACCENT_COLOR),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('TOPPADDING', (0, 0), (-1, 0), 10),
-            ('VALIGN', (0, 1), (-1, -1), 'TOP'),
-            ('ALIGN', (0, 1), (0, -1), 'CENTER'),
-            ('ALIGN', (1, 1), (1, -1), 'LEFT'),
-            ('ALIGN', (2, 1), (-1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ])
-        t_items.setStyle(style_table)
+        t_items.setStyle(styles['items_table'])
         elements.append(t_items)
         
         # --- 4. Summary & Totals ---
@@ -204,14 +240,7 @@ class BillingManager:
             
         summary_data = [['Sub Total:', f"Rs. {grand_total:.2f}"]] + discount_rows + [['Grand Total:', f"Rs. {final_total:.2f}"]]
         t_summary = Table(summary_data, colWidths=[40*mm, 35*mm])
-        t_summary.setStyle(TableStyle([
-            ('ALIGN', (0,0), (-1,-1), 'RIGHT'),
-            ('FONTNAME', (0,-1), (-1,-1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0,-1), (-1,-1), 12),
-            ('TEXTCOLOR', (0,-1), (-1,-1), ACCENT_COLOR),
-            ('LINEABOVE', (0,-1), (-1,-1), 1, colors.black),
-            ('TOPPADDING', (0,0), (-1,-1), 6),
-        ]))
+        t_summary.setStyle(styles['summary_table'])
         
         elements.append(Table([[ '', t_summary]], colWidths=[115*mm, 75*mm]))
         elements.append(Spacer(1, 30))
@@ -234,17 +263,118 @@ class BillingManager:
         footer_right = Paragraph(sign_text, style_right)
         
         t_footer = Table([[footer_left, footer_right]], colWidths=[120*mm, 70*mm])
-        t_footer.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('ALIGN', (1,0), (1,0), 'CENTER'),
-        ]))
+        t_footer.setStyle(styles['footer_table'])
         elements.append(t_footer)
         
         elements.append(Spacer(1, 20))
-        elements.append(Paragraph("Thank you for your business!", styles['Heading4']))
+        elements.append(Paragraph("Thank you for your business!", styles['heading4']))
         
         doc.build(elements)
         if self.activity_logger:
             self.activity_logger.log("INVOICE_GEN", f"Invoice {invoice_number} generated for Rs. {final_total:.2f}")
             
         return True, verify_hash, final_total
+
+class InvoiceService:
+    """
+    Renders invoice PDFs off the Tk thread. submit() returns a Future of
+    (success, verify_hash, total); submit_batch() fans a list of jobs out
+    over worker processes and reports progress per invoice. Successful
+    invoices are recorded in the InvoiceStore when one is given.
+    """
+    def __init__(self, billing_manager, invoice_store=None):
+        self.billing = billing_manager
+        self.store = invoice_store
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="InvoiceRender")
+        self._batch_lock = threading.Lock()  # One batch pool at a time
+
+    def submit(self, items, buyer_details, invoice_number, filename, discount=None):
+        job = {
+            "items": [dict(i) for i in items],
+            "buyer_details": dict(buyer_details),
+            "invoice_number": invoice_number,
+            "filename": str(filename),
+            "discount": discount,
+        }
+        return self._executor.submit(self._render_one, job)
+
+    def _render_one(self, job):
+        result = self.billing.generate_invoice(**job)
+        self._record(job, result)
+        return result
+
+    def _record(self, job, result):
+        success, verify_hash, total = result
+        if success and self.store:
+            try:
+                buyer = job["buyer_details"]
+                self.store.record(verify_hash, job["invoice_number"], buyer.get('name', ''),
+                                  buyer.get('date'), total, job["filename"])
+            except Exception as e:
+                print(f"Registry Save Error: {e}")
+
+    def submit_batch(self, jobs, progress=None, workers=None):
+        """
+        jobs: list of dicts with items, buyer_details, invoice_number, filename[, discount].
+        progress(done, total, job, result) is called from a background thread
+        as each invoice finishes; result is the (success, hash, total) tuple
+        or the exception raised for that invoice.
+        Returns a Future of the results list in job order.
+        """
+        jobs = [dict(job, filename=str(job["filename"])) for job in jobs]
+        future = Future()
+
+        def run():
+            with self._batch_lock:
+                try:
+                    future.set_result(self._run_batch(jobs, progress, workers))
+                except Exception as e:
+                    future.set_exception(e)
+
+        threading.Thread(target=run, daemon=True, name="InvoiceBatch").start()
+        return future
+
+    def _run_batch(self, jobs, progress, workers):
+        if workers is None:
+            workers = min(INVOICE_BATCH_MAX_WORKERS, os.cpu_count() or 1, len(jobs))
+        snapshot = {key: self.billing.config.get(key) for key in INVOICE_CONFIG_KEYS
+                    if self.billing.config.get(key) is not None}
+        results = [None] * len(jobs)
+        done = 0
+
+        def finish(index, result):
+            nonlocal done
+            results[index] = result
+            done += 1
+            if not isinstance(result, Exception):
+                self._record(jobs[index], result)
+                if self.billing.activity_logger and result[0]:
+                    self.billing.activity_logger.log(
+                        "INVOICE_GEN", f"Invoice {jobs[index]['invoice_number']} generated for Rs. {result[2]:.2f}")
+            if progress:
+                try:
+                    progress(done, len(jobs), jobs[index], result)
+                except Exception as e:
+                    print(f"Invoice progress callback error: {e}")
+
+        if workers <= 1:
+            for i, job in enumerate(jobs):
+                try:
+                    result = _render_invoice_job(snapshot, job)
+                except Exception as e:
+                    result = e
+                finish(i, result)
+            return results
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {pool.submit(_render_invoice_job, snapshot, job): i for i, job in enumerate(jobs)}
+            for fut in as_completed(pending):
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    result = e
+                finish(pending[fut], result)
+        return results
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,70 @@
+"""
+Code 128 (subset B) encoder shared by the label renderers.
+Produces the bar/space module pattern directly so callers can draw
+bars with PIL instead of round-tripping through python-barcode.
+"""
+
+# Module patterns for symbol values 0-105, followed by STOP (13 modules).
+# '1' is a bar module, '0' a space module.
+CODE128_PATTERNS = (
+    '11011001100', '11001101100', '11001100110', '10010011000', '10010001100', '10001001100',
+    '10011001000', '10011000100', '10001100100', '11001001000', '11001000100', '11000100100',
+    '10110011100', '10011011100', '10011001110', '10111001100', '10011101100', '10011100110',
+    '11001110010', '11001011100', '11001001110', '11011100100', '11001110100', '11101101110',
+    '11101001100', '11100101100', '11100100110', '11101100100', '11100110100', '11100110010',
+    '11011011000', '11011000110', '11000110110', '10100011000', '10001011000', '10001000110',
+    '10110001000', '10001101000', '10001100010', '11010001000', '11000101000', '11000100010',
+    '10110111000', '10110001110', '10001101110', '10111011000', '10111000110', '10001110110',
+    '11101110110', '11010001110', '11000101110', '11011101000', '11011100010', '11011101110',
+    '11101011000', '11101000110', '11100010110', '11101101000', '11101100010', '11100011010',
+    '11101111010', '11001000010', '11110001010', '10100110000', '10100001100', '10010110000',
+    '10010000110', '10000101100', '10000100110', '10110010000', '10110000100', '10011010000',
+    '10011000010', '10000110100', '10000110010', '11000010010', '11001010000', '11110111010',
+    '11000010100', '10001111010', '10100111100', '10010111100', '10010011110', '10111100100',
+    '10011110100', '10011110010', '11110100100', '11110010100', '11110010010', '11011011110',
+    '11011110110', '11110110110', '10101111000', '10100011110', '10001011110', '10111101000',
+    '10111100010', '11110101000', '11110100010', '10111011110', '10111101110', '11101011110',
+    '11110101110', '11010000100', '11010010000', '11010011100', '1100011101011',
+)
+
+START_B = 104
+STOP = 106
+QUIET_ZONE_MODULES = 10
+
+def encode_code128(data):
+    """
+    Returns the list of symbol values (start, data, checksum, stop) for data
+    in subset B. This matches ZPL ^BC in its default (no invocation) mode.
+    Raises ValueError for characters outside printable ASCII.
+    """
+    data = str(data)
+    values = [START_B]
+    for ch in data:
+        code = ord(ch)
+        if not 32 <= code <= 126:
+            raise ValueError(f"Character {ch!r} not encodable in Code 128 subset B")
+        values.append(code - 32)
+
+    checksum = values[0]
+    for pos, val in enumerate(values[1:], start=1):
+        checksum += pos * val
+    values.append(checksum % 103)
+    values.append(STOP)
+    return values
+
+def code128_modules(data):
+    """Returns the full module string ('1' bar / '0' space) without quiet zones."""
+    return "".join(CODE128_PATTERNS[v] for v in encode_code128(data))
+
+def module_runs(modules):
+    """
+    Converts a module string into (is_bar, start, length) runs,
+    so renderers draw one rectangle per bar instead of per module.
+    """
+    runs = []
+    start = 0
+    for i in range(1, len(modules) + 1):
+        if i == len(modules) or modules[i] != modules[start]:
+            runs.append((modules[start] == '1', start, i - start))
+            start = i
+    return runs
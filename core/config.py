@@ -1,7 +1,7 @@
 import json
 import os
 from pathlib import Path
-from .utils import SafeJsonWriter
+from .utils import DurableJsonStore
 
 # Determine App Data Directory
 # We use a clean version of the default app name: MobileShopManager
@@ -31,6 +31,7 @@ DEFAULT_CONFIG = {
     "label_width_mm": 50,
     "label_height_mm": 22,
     "printer_type": "windows",  # or 'escpos'
+    "label_printer_target": "",  # Raw ZPL target: printer name, tcp://host:9100 or file://path
     "gst_default_percent": 18.0,
     "price_markup_percent": 0.0,
     "enable_buyer_tracking": True,
@@ -42,6 +43,7 @@ DEFAULT_CONFIG = {
     "invoice_terms": "Goods once sold will not be taken back.",
     "output_folder": str(APP_DIR),
     "auto_unique_id_prefix": "MSM",
+    "backup_window_seconds": 300,  # At most one Excel backup per file per window
     "theme_name": "cosmo",    # Default Theme
     "theme_color": "#007acc", # Added customization
     "font_size_ui": 10        # Added customization
@@ -49,11 +51,37 @@ DEFAULT_CONFIG = {
 
 class ConfigManager:
     def __init__(self):
-        self.config_path = CONFIG_FILE
-        self.mappings_path = MAPPINGS_FILE
+        self.config = {}
+        self.mappings = {}
+        self._config_store = DurableJsonStore(CONFIG_FILE, lambda: self.config)
+        self._mappings_store = DurableJsonStore(MAPPINGS_FILE, lambda: self.mappings)
         self.config = self.load_config()
         self.mappings = self.load_mappings()
 
+    @property
+    def config_path(self):
+        return self._config_store.path
+
+    @config_path.setter
+    def config_path(self, value):
+        self._config_store.path = Path(value)
+
+    @property
+    def mappings_path(self):
+        return self._mappings_store.path
+
+    @mappings_path.setter
+    def mappings_path(self, value):
+        self._mappings_store.path = Path(value)
+
+    def flush(self):
+        self._config_store.flush()
+        self._mappings_store.flush()
+
+    def close(self):
+        self._config_store.close()
+        self._mappings_store.close()
+
     def get_invoices_dir(self):
         d = APP_DIR / "Invoices"
         d.mkdir(parents=True, exist_ok=True)
@@ -63,6 +91,7 @@ class ConfigManager:
         return CONFIG_DIR
 
     def load_config(self):
+        DurableJsonStore.flush_path(self.config_path)
         if not self.config_path.exists():
             self.save_config(DEFAULT_CONFIG)
             return DEFAULT_CONFIG
@@ -73,11 +102,14 @@ class ConfigManager:
             return DEFAULT_CONFIG
 
     def save_config(self, config=None):
+        """Writes the config now (set() only schedules a commit)."""
         if config:
             self.config = config
-        SafeJsonWriter.write(self.config_path, self.config)
+        self._config_store.mark_dirty()
+        self._config_store.flush()
 
     def load_mappings(self):
+        DurableJsonStore.flush_path(self.mappings_path)
         if not self.mappings_path.exists():
             return {}
         try:
@@ -89,23 +121,24 @@ class ConfigManager:
     def save_mappings(self, mappings=None):
         if mappings:
             self.mappings = mappings
-        SafeJsonWriter.write(self.mappings_path, self.mappings)
+        self._mappings_store.mark_dirty()
+        self._mappings_store.flush()
 
     def get(self, key, default=None):
         return self.config.get(key, default)
 
     def set(self, key, value):
         self.config[key] = value
-        self.save_config()
+        self._config_store.mark_dirty()
 
     def get_file_mapping(self, file_path):
         return self.mappings.get(str(file_path))
 
     def set_file_mapping(self, file_path, mapping_data):
         self.mappings[str(file_path)] = mapping_data
-        self.save_mappings()
+        self._mappings_store.mark_dirty()
 
     def remove_file_mapping(self, file_path):
         if str(file_path) in self.mappings:
             del self.mappings[str(file_path)]
-            self.save_mappings()
+            self._mappings_store.mark_dirty()
@@ -11,6 +11,7 @@ ACTION_MERGE = "MERGE"
 ACTION_RELOAD = "RELOAD"
 ACTION_REDIRECT = "REDIRECT"
 ACTION_ITEM_UPDATE = "ITEM_UPDATE"
+ACTION_ADD = "ADD"
 
 # Internal Field Names (Canonical)
 FIELD_IMEI = "imei"
@@ -1,7 +1,7 @@
 import json
 import os
 from pathlib import Path
-from .utils import SafeJsonWriter
+from .utils import DurableJsonStore
 from .config import CONFIG_DIR
 
 DATA_FILE = CONFIG_DIR / "app_data.json"
@@ -14,6 +14,7 @@ DEFAULT_CONDITIONS = ["Mobile Only", "Full Kit", "With Box", "Charger Only"]
 class DataRegistry:
     def __init__(self):
         self.data = self._load()
+        self._store = DurableJsonStore(DATA_FILE, lambda: self.data)
         # Ensure structure
         if "colors" not in self.data: self.data["colors"] = sorted(DEFAULT_COLORS)
         if "buyers" not in self.data: self.data["buyers"] = sorted(DEFAULT_BUYERS)
@@ -21,6 +22,7 @@ class DataRegistry:
         if "conditions" not in self.data: self.data["conditions"] = list(DEFAULT_CONDITIONS)
 
     def _load(self):
+        DurableJsonStore.flush_path(DATA_FILE)  # Pick up edits other instances haven't committed
         # Migration: Check if old colors.json exists
         old_color_file = CONFIG_DIR / "colors.json"
         
@@ -53,7 +55,10 @@ class DataRegistry:
             }
 
     def save(self):
-        SafeJsonWriter.write(DATA_FILE, self.data)
+        self._store.mark_dirty()
+
+    def flush(self):
+        self._store.flush()
 
     # --- Colors ---
     def add_color(self, color):
@@ -0,0 +1,276 @@
+import os
+import re
+from datetime import datetime
+from xml.sax.saxutils import escape
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+try:
+    from docx import Document
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+except ImportError:
+    Document = None
+
+EXPORT_CHUNK_ROWS = 5000
+PRICE_FORMAT = '#,##0.00'
+DATE_FORMAT = 'yyyy-mm-dd hh:mm'
+PRICE_COLUMN_HINTS = ('price', 'cost', 'amount', 'total')
+MAX_COLUMN_WIDTH = 50
+PDF_ROW_HEIGHT = 14         # 8pt text plus default cell padding
+PDF_HEADER_HEIGHT = 24      # Header row has extra bottom padding
+PDF_TITLE_HEIGHT = 70       # Title paragraph and spacer on the first page
+PDF_FRAME_PADDING = 12      # ReportLab frames pad 6pt top and bottom
+WORD_CHUNK_ROWS = 2000
+
+# One style shared by every PDF table chunk
+PDF_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),  # Small font to fit many cols
+])
+
+_XML_ILLEGAL = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+class ExportCancelled(Exception):
+    """Raised when an export's cancel callback returns True."""
+
+def _is_price_column(name, series):
+    return pd.api.types.is_numeric_dtype(series) and any(h in str(name).lower() for h in PRICE_COLUMN_HINTS)
+
+def _python_values(series):
+    """Column chunk as a list of plain Python values, missing -> None."""
+    if pd.api.types.is_datetime64_any_dtype(series) and getattr(series.dt, 'tz', None) is not None:
+        series = series.dt.tz_localize(None)  # Excel has no time zones
+    if pd.api.types.is_numeric_dtype(series) and not series.hasnans:
+        return series.tolist()
+    return series.astype(object).where(series.notna(), None).tolist()
+
+def _chunks(df, chunk_rows, progress, cancel):
+    """Yields row chunks of df, reporting progress(done, total) and honouring cancel()."""
+    total = len(df)
+    for start in range(0, total, chunk_rows):
+        if cancel and cancel():
+            raise ExportCancelled()
+        chunk = df.iloc[start:start + chunk_rows]
+        yield chunk
+        if progress:
+            progress(min(start + chunk_rows, total), total)
+    if progress and not total:
+        progress(0, 0)
+
+def _atomic_export(filepath, write):
+    """Runs write(tmp_path) and moves the result over filepath; nothing is left behind on failure."""
+    tmp = f"{filepath}.part"
+    try:
+        write(tmp)
+        os.replace(tmp, filepath)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def export_excel(df, filepath, progress=None, cancel=None, chunk_rows=EXPORT_CHUNK_ROWS, sheet_name="Report"):
+    """
+    Streams df to an .xlsx with openpyxl's write-only workbook, so rows go
+    straight to disk instead of building the whole sheet in memory. Price
+    columns get a number format and datetime columns a date format.
+    """
+    def write(tmp):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(sheet_name)
+        formats = {}
+        for i, col in enumerate(df.columns):
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                formats[i] = DATE_FORMAT
+                width = 18
+            elif _is_price_column(col, df[col]):
+                formats[i] = PRICE_FORMAT
+                width = 14
+            else:
+                sample = df[col].head(200).astype(str).str.len()
+                width = max(len(str(col)), int(sample.max()) if len(sample) else 0) + 2
+            ws.column_dimensions[get_column_letter(i + 1)].width = min(width, MAX_COLUMN_WIDTH)
+
+        header = []
+        for col in df.columns:
+            cell = WriteOnlyCell(ws, value=str(col))
+            cell.font = Font(bold=True)
+            header.append(cell)
+        ws.append(header)
+
+        try:
+            for chunk in _chunks(df, chunk_rows, progress, cancel):
+                columns = [_python_values(chunk[c]) for c in chunk.columns]
+                for i, fmt in formats.items():
+                    cells = []
+                    for v in columns[i]:
+                        cell = WriteOnlyCell(ws, value=v)
+                        cell.number_format = fmt
+                        cells.append(cell)
+                    columns[i] = cells
+                for row in zip(*columns):
+                    ws.append(row)
+        except BaseException:
+            ws.close()  # End openpyxl's sheet stream; its temp file is removed at exit
+            raise
+        wb.save(tmp)
+    _atomic_export(filepath, write)
+
+def export_csv(df, filepath, progress=None, cancel=None, chunk_rows=EXPORT_CHUNK_ROWS * 4):
+    """CSV in row chunks; utf-8 with BOM so Excel opens the ₹ sign correctly."""
+    def write(tmp):
+        with open(tmp, 'w', encoding='utf-8-sig', newline='') as f:
+            df.iloc[:0].to_csv(f, index=False)
+            for chunk in _chunks(df, chunk_rows, progress, cancel):
+                chunk.to_csv(f, header=False, index=False, date_format='%Y-%m-%d %H:%M:%S')
+    _atomic_export(filepath, write)
+
+def export_parquet(df, filepath, progress=None, cancel=None, chunk_rows=EXPORT_CHUNK_ROWS * 4):
+    """Parquet with one row group per chunk. Needs pyarrow."""
+    if pa is None:
+        raise ImportError("pyarrow library not installed.")
+    # Mixed object columns (e.g. IMEIs read as int and str) are written as text
+    prepared = df.copy(deep=False)
+    for col in prepared.columns:
+        if prepared[col].dtype == object:
+            prepared[col] = prepared[col].where(prepared[col].isna(), prepared[col].astype(str)).astype("string")
+    prepared.columns = [str(c) for c in prepared.columns]
+    schema = pa.Schema.from_pandas(prepared.iloc[:0], preserve_index=False)
+
+    def write(tmp):
+        with pq.ParquetWriter(tmp, schema) as writer:
+            for chunk in _chunks(prepared, chunk_rows, progress, cancel):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    _atomic_export(filepath, write)
+
+def report_title():
+    return f"Stock Report - {datetime.now().strftime('%Y-%m-%d')}"
+
+def _text_columns(chunk):
+    """Each column of chunk as a list of display strings; missing values are blank."""
+    out = []
+    for col in chunk.columns:
+        series = chunk[col]
+        out.append(series.astype(str).where(series.notna(), "").tolist())
+    return out
+
+def _pdf_column_widths(df, total_width, sample_rows=500):
+    """Fixed widths from header and sample text lengths, so tables line up and are not re-measured."""
+    lengths = []
+    for col in df.columns:
+        sample = df[col].head(sample_rows).astype(str).str.len()
+        lengths.append(max(len(str(col)), int(sample.quantile(0.9)) if len(sample) else 0, 3))
+    lengths = np.minimum(np.asarray(lengths, dtype=float), MAX_COLUMN_WIDTH)
+    return (lengths / lengths.sum() * total_width).tolist()
+
+class _ProgressDocTemplate(SimpleDocTemplate):
+    """Reports rows laid out so far and checks for cancellation after each table chunk."""
+    def __init__(self, filename, progress=None, cancel=None, total_rows=0, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.progress = progress
+        self.cancel = cancel
+        self.total_rows = total_rows
+        self.rows_done = 0
+
+    def afterFlowable(self, flowable):
+        if not isinstance(flowable, Table):
+            return
+        # Tables that overflow a page arrive as split pieces, each with the header row
+        rows = flowable._nrows - 1
+        self.rows_done += rows
+        if self.progress:
+            self.progress(self.rows_done, self.total_rows)
+        if self.cancel and self.cancel():
+            raise ExportCancelled()
+
+def export_pdf(df, filepath, progress=None, cancel=None, chunk_rows=None, title=None):
+    """
+    Landscape A4 PDF made of one table per page, sharing one style, fixed
+    column widths and fixed row heights, so ReportLab neither measures
+    every cell nor splits one huge table. Cell text is converted
+    column-wise once. chunk_rows defaults to the rows that fit a page;
+    progress counts laid-out rows.
+    """
+    def write(tmp):
+        doc = _ProgressDocTemplate(tmp, progress=progress, cancel=cancel, total_rows=len(df),
+                                   pagesize=landscape(A4))
+        styles = getSampleStyleSheet()
+        elements = [Paragraph(title or report_title(), styles['Title']), Spacer(1, 20)]
+        header = [str(c) for c in df.columns]
+        widths = _pdf_column_widths(df, doc.width)
+        usable = doc.height - PDF_FRAME_PADDING - PDF_HEADER_HEIGHT
+        page_rows = chunk_rows or max(int(usable // PDF_ROW_HEIGHT), 1)
+        first_rows = chunk_rows or max(int((usable - PDF_TITLE_HEIGHT) // PDF_ROW_HEIGHT), 1)
+
+        rows = list(zip(*_text_columns(df)))
+        start, size = 0, first_rows
+        while start < len(rows):
+            if cancel and cancel():
+                raise ExportCancelled()
+            body = rows[start:start + size]
+            if start:
+                elements.append(PageBreak())  # Each chunk starts on a fresh page instead of being split
+            elements.append(Table([header] + body, colWidths=widths, repeatRows=1, style=PDF_TABLE_STYLE,
+                                  rowHeights=[PDF_HEADER_HEIGHT] + [PDF_ROW_HEIGHT] * len(body)))
+            start, size = start + size, page_rows
+        doc.build(elements)
+    _atomic_export(filepath, write)
+
+def _word_rows_xml(columns):
+    cell = '<w:tc><w:p><w:r><w:t xml:space="preserve">{}</w:t></w:r></w:p></w:tc>'
+    return "".join(
+        "<w:tr>" + "".join(cell.format(escape(_XML_ILLEGAL.sub("", v))) for v in row) + "</w:tr>"
+        for row in zip(*columns))
+
+def export_word(df, filepath, progress=None, cancel=None, chunk_rows=WORD_CHUNK_ROWS, title=None):
+    """
+    .docx report with a 'Table Grid' table. Body rows are generated as
+    WordprocessingML in bulk and parsed once per chunk, instead of
+    python-docx's per-row add_row(), which slows down as the table grows.
+    """
+    if Document is None:
+        raise ImportError("python-docx library not installed.")
+
+    def write(tmp):
+        doc = Document()
+        doc.add_heading(title or report_title(), 0)
+        table = doc.add_table(rows=1, cols=len(df.columns))
+        table.style = 'Table Grid'
+        for cell, col in zip(table.rows[0].cells, df.columns):
+            cell.text = str(col)
+        tbl = table._tbl
+        for chunk in _chunks(df, chunk_rows, progress, cancel):
+            fragment = parse_xml(f'<w:tbl {nsdecls("w")}>{_word_rows_xml(_text_columns(chunk))}</w:tbl>')
+            for tr in list(fragment):
+                tbl.append(tr)
+        doc.save(tmp)
+    _atomic_export(filepath, write)
+
+EXPORTERS = {
+    'excel': export_excel,
+    'csv': export_csv,
+    'parquet': export_parquet,
+    'pdf': export_pdf,
+    'word': export_word,
+}
+
+def default_extension(format_type):
+    return {'excel': '.xlsx', 'word': '.docx'}.get(format_type, f".{format_type}")
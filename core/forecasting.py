@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from .analytics import to_datetime64, model_families, SOLD_STATUSES
+
+# Grouping levels for forecasts
+BY_MODEL = "model"
+BY_FAMILY = "family"    # First two words of the model ('Redmi Note')
+BY_BRAND = "brand"      # First word, upper-cased
+
+DEFAULT_HISTORY_DAYS = 90
+DEFAULT_HALFLIFE_DAYS = 14.0   # EWMA: a sale 14 days ago counts half as much as today's
+DEFAULT_LEAD_TIME_DAYS = 7     # Days from ordering to stock on the shelf
+DEFAULT_SAFETY_DAYS = 7        # Extra cover on top of lead time
+LOW_COVER_DAYS = 14
+MIN_VELOCITY = 0.1 / 7         # Units/day; slower movers are never flagged
+
+# Forecast states
+FORECAST_OK = "OK"
+FORECAST_LOW = "LOW_STOCK"
+FORECAST_OUT = "OUT_OF_STOCK"
+
+def group_keys(df, by=BY_MODEL):
+    """Series of forecast group keys for each row."""
+    models = df['model'].astype(str).str.strip()
+    if by == BY_FAMILY:
+        return model_families(models)
+    if by == BY_BRAND:
+        return models.str.split(n=1).str[0].str.upper().fillna("")
+    return models
+
+def daily_sales_matrix(df, by=BY_MODEL, days=DEFAULT_HISTORY_DAYS, now=None):
+    """
+    Units sold per day (rows, oldest first, one per calendar day in the
+    window ending today) x group (columns), from each item's date_sold.
+    """
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now()
+    end = now.normalize()
+    index = pd.date_range(end=end, periods=days, freq='D')
+    if df.empty or 'date_sold' not in df.columns:
+        return pd.DataFrame(index=index)
+
+    sold_at = to_datetime64(df['date_sold']).dt.floor('D')
+    mask = df['status'].isin(SOLD_STATUSES) & sold_at.notna() & (sold_at >= index[0]) & (sold_at <= end)
+    if not mask.any():
+        return pd.DataFrame(index=index)
+    counts = pd.Series(1, index=df.index[mask]).groupby(
+        [sold_at[mask], group_keys(df[mask], by)]).sum()
+    return counts.unstack(fill_value=0).reindex(index, fill_value=0)
+
+def forecast_demand(df, by=BY_MODEL, now=None, history_days=DEFAULT_HISTORY_DAYS,
+                    halflife=DEFAULT_HALFLIFE_DAYS, lead_time=DEFAULT_LEAD_TIME_DAYS,
+                    safety_days=DEFAULT_SAFETY_DAYS):
+    """
+    Per-group demand forecast as a DataFrame indexed by group with columns:
+    velocity (EWMA units/day), weekly, stock, days_of_cover, reorder_point,
+    reorder_qty and status. Every group with stock or recent sales is included.
+    """
+    columns = ['velocity', 'weekly', 'stock', 'days_of_cover', 'reorder_point', 'reorder_qty', 'status']
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    matrix = daily_sales_matrix(df, by, history_days, now)
+    velocity = matrix.ewm(halflife=halflife).mean().iloc[-1] if not matrix.columns.empty \
+        else pd.Series(dtype=float)
+
+    in_stock = df['status'] == 'IN'
+    stock = group_keys(df[in_stock], by).value_counts()
+
+    result = pd.DataFrame({'velocity': velocity, 'stock': stock}).fillna(0.0)
+    result.index.name = by
+    result['stock'] = result['stock'].astype(int)
+    vel = result['velocity'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cover = np.where(vel > 0, result['stock'].to_numpy() / vel, np.inf)
+    result['weekly'] = vel * 7
+    result['days_of_cover'] = cover
+    result['reorder_point'] = np.ceil(vel * (lead_time + safety_days)).astype(int)
+    result['reorder_qty'] = np.maximum(result['reorder_point'] - result['stock'], 0)
+
+    moving = vel >= MIN_VELOCITY
+    low = moving & ((cover < LOW_COVER_DAYS) | (result['stock'].to_numpy() <= result['reorder_point'].to_numpy()))
+    result['status'] = np.select([moving & (result['stock'].to_numpy() == 0), low],
+                                 [FORECAST_OUT, FORECAST_LOW], FORECAST_OK)
+    return result[columns].sort_values(['days_of_cover', 'velocity'], ascending=[True, False])
+
+def demand_alerts(forecast, key_name=BY_MODEL):
+    """Non-OK rows as the list of dicts the dashboard renders, most urgent first."""
+    alerts = forecast[forecast['status'] != FORECAST_OK]
+    return [{
+        key_name: key,
+        "velocity": round(float(row.weekly), 1),  # Weekly sales
+        "stock": int(row.stock),
+        "days_left": int(row.days_of_cover),
+        "reorder_qty": int(row.reorder_qty),
+        "status": row.status,
+    } for key, row in zip(alerts.index, alerts.itertuples())]
@@ -3,8 +3,9 @@ import os
 import hashlib
 import threading
 from pathlib import Path
-from .utils import SafeJsonWriter
+from .utils import DurableJsonStore
 from .config import CONFIG_DIR
+from .item_history import ItemHistoryStore, ITEM_HISTORY_DB_NAME
 
 ID_REGISTRY_FILE = CONFIG_DIR / "id_registry.json"
 
@@ -17,14 +18,19 @@ PLACEHOLDER_IMEIS = {
 }
 
 class IDRegistry:
-    def __init__(self):
+    def __init__(self, history_store=None):
         self.file_path = ID_REGISTRY_FILE
         self._lock = threading.Lock()
         self.registry = self._load_registry()
         self.auto_save = True
+        self._store = DurableJsonStore(self.file_path, lambda: self.registry, lock=self._lock)
+        # History lives next to the registry file, outside the registry JSON
+        self.history = history_store or ItemHistoryStore(self.file_path.with_name(ITEM_HISTORY_DB_NAME))
         self._migrate_duplicate_keys()  # Auto-fix old duplicates on startup
+        self._migrate_history()
 
     def _load_registry(self):
+        DurableJsonStore.flush_path(self.file_path)
         if not self.file_path.exists():
             return {"next_id": 1, "items": {}, "metadata": {}}
         try:
@@ -38,19 +44,18 @@ class IDRegistry:
             return {"next_id": 1, "items": {}, "metadata": {}}
 
     def commit(self):
-        """Manually save the registry to disk."""
-        with self._lock:
-            SafeJsonWriter.write(self.file_path, self.registry)
+        """Writes the registry to disk now (caller must NOT hold _lock)."""
+        self._store.mark_dirty()
+        self._store.flush()
 
     def _save_registry(self):
         if self.auto_save:
-            # NOTE: caller must NOT hold _lock here, or use _save_registry_unlocked
-            self.commit()
+            self._store.mark_dirty()
 
     def _save_registry_unlocked(self):
-        """Save without acquiring the lock (caller must hold it)."""
+        """Schedules a save; safe while holding the lock."""
         if self.auto_save:
-            SafeJsonWriter.write(self.file_path, self.registry)
+            self._store.mark_dirty()
 
     def get_ids_batch(self, keys):
         """
@@ -199,6 +204,30 @@ class IDRegistry:
             self._save_registry_unlocked()
             print(f"[IDRegistry] Auto-migrated {len(keys_to_fix)} placeholder IMEI key(s).")
 
+    def _migrate_history(self):
+        """
+        Moves per-item 'history' lists out of registry metadata into the
+        history store. Items already present in the store were imported by an
+        interrupted earlier run and are only stripped.
+        """
+        with self._lock:
+            stripped, moved = False, 0
+            for iid, meta in self.registry['metadata'].items():
+                entries = meta.pop('history', None)
+                if entries is None:
+                    continue
+                stripped = True
+                if entries and not self.history.has_history(iid):
+                    moved += self.history.import_entries(iid, entries)
+            if not stripped:
+                return  # Nothing to migrate
+            self._store.mark_dirty()
+            print(f"[IDRegistry] Moved {moved} history entries to {self.history.db_path.name}.")
+
+    def close(self):
+        self._store.close()
+        self.history.close()
+
     def set_date_added_if_empty(self, item_id, date_str):
         """Sets 'added_date' in metadata only if not already present."""
         with self._lock:
@@ -220,23 +249,12 @@ class IDRegistry:
             self._save_registry_unlocked()
 
     def add_history_log(self, item_id, action, details):
-        """Adds a timestamped history entry for an item."""
-        import datetime
-        with self._lock:
-            iid_str = str(item_id)
-            if iid_str not in self.registry['metadata']:
-                self.registry['metadata'][iid_str] = {}
-            
-            if 'history' not in self.registry['metadata'][iid_str]:
-                self.registry['metadata'][iid_str]['history'] = []
-            
-            entry = {
-                "ts": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "action": action,
-                "details": details
-            }
-            self.registry['metadata'][iid_str]['history'].append(entry)
-            self._save_registry_unlocked()
+        """Adds a timestamped history entry for an item (append-only, no registry save)."""
+        self.history.append(item_id, action, details)
+
+    def get_history(self, item_id, limit=None):
+        """History entries for an item, oldest first."""
+        return self.history.get(item_id, limit=limit)
 
     def get_metadata(self, item_id):
         with self._lock:
@@ -8,14 +8,14 @@ import queue
 import threading
 from .config import ConfigManager
 from .id_registry import IDRegistry
-from .utils import backup_excel_file
+from .backup_manager import BackupManager, DEFAULT_BACKUP_WINDOW
 from .constants import (
     STATUS_IN, STATUS_OUT, STATUS_RETURN, STATUS_SOLD,
     ACTION_STATUS_CHANGE, ACTION_DATA_UPDATE, ACTION_MERGE, ACTION_REDIRECT,
     ACTION_ITEM_UPDATE,
     FIELD_IMEI, FIELD_MODEL, FIELD_PRICE, FIELD_STATUS, FIELD_BUYER, FIELD_BUYER_CONTACT,
     FIELD_UNIQUE_ID, FIELD_SOURCE_FILE, FIELD_NOTES, FIELD_COLOR, FIELD_RAM_ROM,
-    FIELD_PRICE_ORIGINAL, ACTION_RELOAD
+    FIELD_PRICE_ORIGINAL, ACTION_RELOAD, ACTION_ADD
 )
 
 class InventoryManager:
@@ -23,10 +23,14 @@ class InventoryManager:
         self.config_manager = config_manager
         self.activity_logger = activity_logger
         self.id_registry = IDRegistry()
+        self.backups = BackupManager(window=config_manager.get('backup_window_seconds', DEFAULT_BACKUP_WINDOW))
         self.inventory_df = pd.DataFrame()
         self._df_lock = threading.RLock()  # Protects inventory_df access
         self.file_status = {}  # Keep track of file read status
         self.conflicts = []
+        self._listeners = []  # callback(action, item_ids) on in-memory changes
+        self._row_listeners = []  # callback(action, rows) with post-change row dicts
+        self.generation = 0  # Bumped on every in-memory mutation (cache key for derived data)
         
         # Background Write Queue
         self.write_queue = queue.Queue()
@@ -53,6 +57,7 @@ class InventoryManager:
         """Drain the write queue and stop the background worker gracefully."""
         try:
             self.write_queue.join()  # Wait for pending writes to finish
+            self.id_registry.close()
         except Exception as e:
             print(f"Shutdown warning: {e}")
 
@@ -343,25 +348,7 @@ class InventoryManager:
                 full_df = full_df[~uids.isin(hidden_ids)]
                 
                 # Detect Duplicates (Optimized)
-                # Only check items that have IMEIs
-                imei_df = full_df[full_df[FIELD_IMEI].str.len() > 5].copy()
-                if not imei_df.empty:
-                    # Explode dual IMEIs for easier detection
-                    # "IMEI1 / IMEI2" -> ["IMEI1", "IMEI2"]
-                    imei_df['imei_list'] = imei_df[FIELD_IMEI].str.split('/')
-                    exploded = imei_df.explode('imei_list')
-                    exploded['imei_list'] = exploded['imei_list'].str.strip()
-                    exploded = exploded[exploded['imei_list'].str.len() > 5]
-                    
-                    dupes = exploded[exploded.duplicated('imei_list', keep=False)]
-                    for imei, group in dupes.groupby('imei_list'):
-                        self.conflicts.append({
-                            "imei": imei,
-                            "unique_ids": group[FIELD_UNIQUE_ID].unique().tolist(),
-                            "model": group.iloc[0][FIELD_MODEL],
-                            "sources": group[FIELD_SOURCE_FILE].unique().tolist(),
-                            "rows": group.drop_duplicates(FIELD_UNIQUE_ID).to_dict('records')
-                        })
+                self.conflicts = self._detect_conflicts(full_df)
                 
                 with self._df_lock:
                     self.inventory_df = full_df
@@ -379,9 +366,146 @@ class InventoryManager:
             
         if self.activity_logger:
             self.activity_logger.log(ACTION_RELOAD, f"Loaded {len(self.inventory_df)} items from {len(mappings)} sources.")
-            
+        
+        self._emit_rows(ACTION_RELOAD, None)
         return self.inventory_df
     
+    def _detect_conflicts(self, df, only_imeis=None):
+        """
+        Finds IMEIs shared by more than one item.
+        only_imeis: optional set of IMEIs; when given, only groups touching
+        these IMEIs are reported (used for incremental adds).
+        """
+        conflicts = []
+        # Only check items that have IMEIs
+        imei_df = df[df[FIELD_IMEI].astype(str).str.len() > 5].copy()
+        if imei_df.empty:
+            return conflicts
+            
+        # Explode dual IMEIs for easier detection
+        # "IMEI1 / IMEI2" -> ["IMEI1", "IMEI2"]
+        imei_df['imei_list'] = imei_df[FIELD_IMEI].astype(str).str.split('/')
+        exploded = imei_df.explode('imei_list')
+        exploded['imei_list'] = exploded['imei_list'].str.strip()
+        exploded = exploded[exploded['imei_list'].str.len() > 5]
+        if only_imeis is not None:
+            exploded = exploded[exploded['imei_list'].isin(only_imeis)]
+        
+        dupes = exploded[exploded.duplicated('imei_list', keep=False)]
+        for imei, group in dupes.groupby('imei_list'):
+            conflicts.append({
+                "imei": imei,
+                "unique_ids": group[FIELD_UNIQUE_ID].unique().tolist(),
+                "model": group.iloc[0][FIELD_MODEL],
+                "sources": group[FIELD_SOURCE_FILE].unique().tolist(),
+                "rows": group.drop_duplicates(FIELD_UNIQUE_ID).to_dict('records')
+            })
+        return conflicts
+
+    def add_change_listener(self, callback):
+        """
+        Registers callback(action, item_ids) to be called after in-memory
+        inventory changes. Called from the mutating thread.
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_change_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _emit_change(self, action, item_ids):
+        for callback in list(self._listeners):
+            try:
+                callback(action, item_ids)
+            except Exception as e:
+                print(f"Change listener error: {e}")
+
+    def add_row_listener(self, callback):
+        """
+        Registers callback(action, rows) for every in-memory mutation, used to
+        maintain derived data incrementally. rows are the changed items' row
+        dicts after the change, or None after a full reload (rebuild needed).
+        Called from the mutating thread, possibly while holding the data lock.
+        """
+        if callback not in self._row_listeners:
+            self._row_listeners.append(callback)
+
+    def remove_row_listener(self, callback):
+        if callback in self._row_listeners:
+            self._row_listeners.remove(callback)
+
+    def _emit_rows(self, action, rows):
+        self.generation += 1
+        for callback in list(self._row_listeners):
+            try:
+                callback(action, rows)
+            except Exception as e:
+                print(f"Row listener error: {e}")
+
+    def add_items(self, rows, source_key):
+        """
+        Upserts new items into memory without a full reload_all().
+        rows: list of dicts keyed by canonical field names (as built by Quick Entry).
+        source_key: mapping key of the file the rows were written to.
+        Returns the list of assigned unique IDs.
+        """
+        if not rows:
+            return []
+            
+        raw_df = pd.DataFrame(rows)
+        raw_df = raw_df.drop(columns=[FIELD_UNIQUE_ID, FIELD_SOURCE_FILE], errors='ignore')
+        
+        # Identity mapping so rows pass through the same pipeline as Excel data
+        mapping = {}
+        for col in raw_df.columns:
+            if col == FIELD_PRICE_ORIGINAL:
+                if FIELD_PRICE not in raw_df.columns:
+                    mapping[col] = FIELD_PRICE
+            else:
+                mapping[col] = col
+                
+        file_mapping = self.config_manager.get_file_mapping(source_key) or {}
+        mapping_data = {'mapping': mapping, 'supplier': file_mapping.get('supplier', '')}
+        
+        self.id_registry.auto_save = False
+        try:
+            new_df = self._normalize_data(raw_df, mapping_data, source_key)
+        finally:
+            self.id_registry.commit()
+            self.id_registry.auto_save = True
+        new_df[FIELD_SOURCE_FILE] = source_key
+        new_ids = new_df[FIELD_UNIQUE_ID].tolist()
+        
+        with self._df_lock:
+            existing_ids = set(self.inventory_df[FIELD_UNIQUE_ID].astype(str)) if not self.inventory_df.empty else set()
+            new_df = new_df[~new_df[FIELD_UNIQUE_ID].astype(str).isin(existing_ids)]
+            if new_df.empty:
+                return new_ids
+                
+            if self.inventory_df.empty:
+                self.inventory_df = new_df.reset_index(drop=True)
+            else:
+                self.inventory_df = pd.concat([self.inventory_df, new_df], ignore_index=True)
+            
+            # Conflict detection scoped to the new IMEIs only
+            new_imeis = set()
+            for val in new_df[FIELD_IMEI].astype(str):
+                new_imeis.update(p.strip() for p in val.split('/') if len(p.strip()) > 5)
+            if new_imeis:
+                known = {c['imei'] for c in self.conflicts}
+                for conflict in self._detect_conflicts(self.inventory_df, only_imeis=new_imeis):
+                    if conflict['imei'] in known:
+                        self.conflicts = [c for c in self.conflicts if c['imei'] != conflict['imei']]
+                    self.conflicts.append(conflict)
+            self._emit_rows(ACTION_ADD, new_df.to_dict('records'))
+        
+        if self.activity_logger:
+            self.activity_logger.log(ACTION_ADD, f"Added {len(new_df)} item(s) to {os.path.basename(str(source_key))}")
+        
+        self._emit_change(ACTION_ADD, new_df[FIELD_UNIQUE_ID].tolist())
+        return new_ids
+    
     def resolve_conflict(self, conflict_data, action, keep_source=None):
         """
         Resolves an IMEI conflict.
@@ -512,6 +636,10 @@ class InventoryManager:
             # 3. Update Memory
             if mask.any():
                 self.inventory_df.loc[mask, FIELD_STATUS] = new_status
+                if 'sold_date' in updates and 'date_sold' in self.inventory_df.columns:
+                    sold_at = updates['sold_date']
+                    self.inventory_df.loc[mask, 'date_sold'] = datetime.datetime.fromisoformat(sold_at) if sold_at else None
+                self._emit_rows(ACTION_STATUS_CHANGE, self.inventory_df[mask].to_dict('records'))
                 
                 # 4. Write to Excel (ASYNC via Queue)
                 if write_to_excel:
@@ -555,6 +683,7 @@ class InventoryManager:
             for k, v in updates.items():
                 if k in self.inventory_df.columns:
                     self.inventory_df.loc[mask, k] = v
+            self._emit_rows(ACTION_DATA_UPDATE, self.inventory_df[mask].to_dict('records'))
             
             # 3. Write to Excel (ASYNC via Queue) — snapshot while holding lock
             try:
@@ -582,7 +711,7 @@ class InventoryManager:
             return False, f"Source file not found: {file_path}"
 
         # SAFETY 1: Backup
-        backup_path = backup_excel_file(file_path)
+        backup_path = self.backups.backup(file_path)
         if not backup_path:
             print("Write Error: Backup failed")
             return False, "Failed to create backup, aborting write for safety."
@@ -0,0 +1,277 @@
+import datetime
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from .config import CONFIG_DIR
+
+INVOICE_DB_FILE = CONFIG_DIR / "invoices.db"
+
+# Older builds wrote the signature registry to two different places
+LEGACY_REGISTRY_FILES = (
+    CONFIG_DIR / "invoice_registry.json",
+    Path.home() / "Documents" / "4BrosManager" / "config" / "invoice_registry.json",
+)
+
+DEFAULT_PAGE_SIZE = 200
+
+# 'YYYY', 'YYYY-MM' or 'YYYY-MM-DD': a prefix of created_date, answerable from its index
+_DATE_PREFIX = re.compile(r"\d{4}(-\d{2}(-\d{2})?)?")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS invoices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    verify_hash TEXT UNIQUE,
+    inv_no TEXT,
+    buyer TEXT,
+    buyer_lc TEXT,
+    inv_date TEXT,
+    amount REAL,
+    file_path TEXT,
+    file_size INTEGER,
+    created_ts REAL,
+    created_date TEXT,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_invoices_inv_no ON invoices(inv_no);
+CREATE INDEX IF NOT EXISTS idx_invoices_buyer ON invoices(buyer_lc);
+CREATE INDEX IF NOT EXISTS idx_invoices_date ON invoices(created_date);
+CREATE INDEX IF NOT EXISTS idx_invoices_amount ON invoices(amount);
+CREATE INDEX IF NOT EXISTS idx_invoices_created ON invoices(created_ts);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_invoices_file ON invoices(file_path);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_COLUMNS = ("id", "verify_hash", "inv_no", "buyer", "inv_date", "amount",
+            "file_path", "file_size", "created_ts", "created_date", "deleted")
+
+def _clean_hash(code):
+    return str(code or "").replace(" ", "").strip().upper() or None
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _ts_from_stem(stem):
+    """'Name_1718000000' -> 1718000000 (invoice files are {buyer}_{unix_ts}.pdf)."""
+    tail = stem.rsplit('_', 1)[-1] if '_' in stem else ""
+    return int(tail) if tail.isdigit() else None
+
+class InvoiceStore:
+    """
+    SQLite index of generated invoices: signature hash, number, buyer, date,
+    amount and PDF path. Invoices are only ever inserted; deleting a PDF
+    hides it from the history list but keeps its signature verifiable.
+    sync_dir() keeps the list in step with PDFs added to or removed from
+    the invoices folder outside the app.
+    """
+    def __init__(self, db_path=None, invoices_dir=None):
+        self.db_path = Path(db_path) if db_path else INVOICE_DB_FILE
+        self.invoices_dir = Path(invoices_dir) if invoices_dir else None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Writes ---
+
+    def record(self, verify_hash, inv_no, buyer, inv_date, amount, file_path=None):
+        """Adds a newly generated invoice. Returns the row id (None if the hash already exists)."""
+        size, created = None, datetime.datetime.now()
+        if file_path and Path(file_path).exists():
+            size = Path(file_path).stat().st_size
+        row = {
+            "verify_hash": _clean_hash(verify_hash),
+            "inv_no": inv_no,
+            "buyer": buyer or "",
+            "inv_date": str(inv_date or created.date()),
+            "amount": _to_float(amount),
+            "file_path": str(file_path) if file_path else None,
+            "file_size": size,
+            "created_ts": created.timestamp(),
+        }
+        row_id = self._insert(row)
+        if row_id is None and file_path:
+            # sync_dir() may have indexed the fresh PDF first; give that row its signature
+            with self._lock, self._conn:
+                cur = self._conn.execute(
+                    "UPDATE invoices SET verify_hash = ?, inv_no = ?, buyer = ?, buyer_lc = ?, inv_date = ?, "
+                    "amount = ?, file_size = ?, deleted = 0 WHERE file_path = ? AND verify_hash IS NULL",
+                    (row["verify_hash"], inv_no, row["buyer"], row["buyer"].lower(), row["inv_date"],
+                     row["amount"], size, row["file_path"]))
+                if cur.rowcount:
+                    row_id = self._conn.execute("SELECT id FROM invoices WHERE file_path = ?",
+                                                (row["file_path"],)).fetchone()[0]
+        return row_id
+
+    def _insert(self, row):
+        row["buyer_lc"] = (row.get("buyer") or "").lower()
+        row["created_date"] = datetime.datetime.fromtimestamp(row["created_ts"]).strftime("%Y-%m-%d")
+        keys = list(row.keys())
+        sql = f"INSERT OR IGNORE INTO invoices ({', '.join(keys)}) VALUES ({', '.join('?' for _ in keys)})"
+        with self._lock, self._conn:
+            cur = self._conn.execute(sql, [row[k] for k in keys])
+            return cur.lastrowid if cur.rowcount else None
+
+    def mark_deleted(self, file_path):
+        """Hides an invoice whose PDF was deleted. Its signature stays verifiable."""
+        with self._lock, self._conn:
+            cur = self._conn.execute("UPDATE invoices SET deleted = 1 WHERE file_path = ?", (str(file_path),))
+            return cur.rowcount > 0
+
+    # --- Lookups ---
+
+    def _one(self, sql, params):
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return dict(row) if row else None
+
+    def get_by_hash(self, code):
+        """Signature lookup; accepts the spaced code printed on the invoice."""
+        return self._one(f"SELECT {', '.join(_COLUMNS)} FROM invoices WHERE verify_hash = ?", (_clean_hash(code),))
+
+    def get_by_number(self, inv_no):
+        return self._one(f"SELECT {', '.join(_COLUMNS)} FROM invoices WHERE inv_no = ?", (inv_no,))
+
+    def _where(self, buyer=None, date=None, min_amount=None, max_amount=None):
+        clauses = ["deleted = 0", "file_path IS NOT NULL"]
+        params = []
+        if buyer:
+            clauses.append("buyer_lc LIKE ? ESCAPE '\\'")
+            escaped = buyer.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        if date and _DATE_PREFIX.fullmatch(date):
+            clauses.append("created_date >= ? AND created_date < ?")
+            params.extend([date, date + "\uffff"])
+        elif date:
+            # Any other substring of YYYY-MM-DD ('-12', '05-1'), as the folder-scanning list matched
+            clauses.append("instr(created_date, ?) > 0")
+            params.append(date)
+        if min_amount is not None:
+            clauses.append("amount >= ?")
+            params.append(min_amount)
+        if max_amount is not None:
+            clauses.append("amount <= ?")
+            params.append(max_amount)
+        return " AND ".join(clauses), params
+
+    def query(self, buyer=None, date=None, min_amount=None, max_amount=None,
+              limit=DEFAULT_PAGE_SIZE, offset=0):
+        """Newest-first page of invoices matching the filters."""
+        where, params = self._where(buyer, date, min_amount, max_amount)
+        sql = (f"SELECT {', '.join(_COLUMNS)} FROM invoices WHERE {where} "
+               f"ORDER BY created_ts DESC, id DESC LIMIT ? OFFSET ?")
+        with self._lock:
+            rows = self._conn.execute(sql, params + [int(limit), int(offset)]).fetchall()
+        return [dict(r) for r in rows]
+
+    def count(self, buyer=None, date=None, min_amount=None, max_amount=None):
+        where, params = self._where(buyer, date, min_amount, max_amount)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM invoices WHERE {where}", params).fetchone()[0]
+
+    # --- Legacy import ---
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def import_legacy(self, registry_files=LEGACY_REGISTRY_FILES, force=False):
+        """
+        One-time import of invoice_registry.json entries and existing PDFs.
+        Registry entries are matched to their PDF through the INV-{ts} number.
+        Returns the number of rows added.
+        """
+        if not force and self._get_meta("legacy_import_done"):
+            return 0
+
+        added = 0
+        for reg_path in registry_files:
+            reg_path = Path(reg_path)
+            if not reg_path.exists():
+                continue
+            try:
+                with open(reg_path, 'r') as f:
+                    registry = json.load(f)
+            except Exception as e:
+                print(f"Invoice registry import error ({reg_path}): {e}")
+                continue
+            for code, data in registry.items():
+                ts = _ts_from_stem(str(data.get("inv_no", "")).replace("-", "_"))
+                if self._insert({
+                    "verify_hash": _clean_hash(code),
+                    "inv_no": data.get("inv_no"),
+                    "buyer": data.get("buyer", ""),
+                    "inv_date": data.get("date"),
+                    "amount": _to_float(data.get("amount")),
+                    "created_ts": float(ts) if ts else reg_path.stat().st_mtime,
+                }):
+                    added += 1
+
+        added += self.sync_dir()
+        self._set_meta("legacy_import_done", datetime.datetime.now().isoformat())
+        return added
+
+    def _index_pdf(self, pdf):
+        """Adds a PDF found in the folder, attached to its registry row when there is one."""
+        st = pdf.stat()
+        ts = _ts_from_stem(pdf.stem)
+        inv_no = f"INV-{ts}" if ts else None
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE invoices SET file_path = ?, file_size = ?, created_ts = ?, created_date = ? "
+                "WHERE inv_no = ? AND file_path IS NULL",
+                (str(pdf), st.st_size, st.st_mtime,
+                 datetime.datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d"), inv_no))
+        if inv_no and cur.rowcount:
+            return False
+        return self._insert({
+            "inv_no": inv_no,
+            "buyer": pdf.stem.split('_')[0] if '_' in pdf.stem else "Unknown",
+            "file_path": str(pdf),
+            "file_size": st.st_size,
+            "created_ts": st.st_mtime,
+        }) is not None
+
+    def sync_dir(self):
+        """
+        Incremental check of the invoices folder: indexes PDFs that are not
+        in the DB yet, hides rows whose PDF is gone and shows them again if
+        the file comes back. One folder listing plus one query of stored
+        paths. Returns the number of rows added.
+        """
+        if not self.invoices_dir or not self.invoices_dir.exists():
+            return 0
+        on_disk = {str(pdf): pdf for pdf in self.invoices_dir.glob("*.pdf")}
+        with self._lock:
+            known = dict(self._conn.execute(
+                "SELECT file_path, deleted FROM invoices WHERE file_path IS NOT NULL").fetchall())
+
+        added = sum(1 for path, pdf in on_disk.items() if path not in known and self._index_pdf(pdf))
+
+        gone, back = [], []
+        for path, deleted in known.items():
+            exists = path in on_disk if Path(path).parent == self.invoices_dir else Path(path).exists()
+            if exists and deleted:
+                back.append((path,))
+            elif not exists and not deleted:
+                gone.append((path,))
+        if gone or back:
+            with self._lock, self._conn:
+                self._conn.executemany("UPDATE invoices SET deleted = 1 WHERE file_path = ?", gone)
+                self._conn.executemany("UPDATE invoices SET deleted = 0 WHERE file_path = ?", back)
+        return added
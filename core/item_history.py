@@ -0,0 +1,75 @@
+import sqlite3
+import threading
+import datetime
+from pathlib import Path
+from .config import CONFIG_DIR
+
+ITEM_HISTORY_DB_NAME = "item_history.db"
+ITEM_HISTORY_FILE = CONFIG_DIR / ITEM_HISTORY_DB_NAME
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    action TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_uid_ts ON history(uid, ts);
+"""
+
+class ItemHistoryStore:
+    """
+    Append-only per-item history (status changes, edits, merges) in SQLite,
+    indexed by (uid, ts). Kept out of the ID registry so the registry JSON
+    only grows with the number of items, not with every edit ever made.
+    """
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else ITEM_HISTORY_FILE
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def append(self, item_id, action, details, ts=None):
+        """Adds one entry. ts defaults to now ('%Y-%m-%d %H:%M:%S')."""
+        ts = ts or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO history (uid, ts, action, details) VALUES (?, ?, ?, ?)",
+                               (str(item_id), ts, action, details))
+
+    def import_entries(self, item_id, entries):
+        """Bulk append of legacy {'ts', 'action', 'details'} dicts. Returns the count."""
+        rows = [(str(item_id), e.get('ts', ''), e.get('action'), e.get('details', '')) for e in entries]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT INTO history (uid, ts, action, details) VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def has_history(self, item_id):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM history WHERE uid = ? LIMIT 1", (str(item_id),)).fetchone() is not None
+
+    def get(self, item_id, limit=None, newest_first=False):
+        """Entries for one item in time order (oldest first unless newest_first)."""
+        order = "DESC" if newest_first else "ASC"
+        sql = f"SELECT ts, action, details FROM history WHERE uid = ? ORDER BY ts {order}, id {order}"
+        params = [str(item_id)]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(r) for r in rows]
+
+    def count(self, item_id=None):
+        with self._lock:
+            if item_id is None:
+                return self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM history WHERE uid = ?", (str(item_id),)).fetchone()[0]
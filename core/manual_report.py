@@ -2,16 +2,18 @@ import json
 import datetime
 import pandas as pd
 from pathlib import Path
-from .utils import SafeJsonWriter
+from .utils import DurableJsonStore
 
 class ManualReportSession:
     def __init__(self, config_manager):
         self.config_dir = config_manager.get_config_dir()
         self.session_file = self.config_dir / "manual_report_session.json"
         self.scanned_items = self._load()
+        self._store = DurableJsonStore(self.session_file, lambda: self._make_serializable(self.scanned_items))
 
     def _load(self):
         """Loads the list of scanned items from disk."""
+        DurableJsonStore.flush_path(self.session_file)
         if not self.session_file.exists():
             return []
         try:
@@ -47,9 +49,12 @@ class ManualReportSession:
         return data
 
     def save(self):
-        """Saves the current list to disk."""
-        serializable_items = self._make_serializable(self.scanned_items)
-        SafeJsonWriter.write(self.session_file, serializable_items)
+        """Schedules a save of the current list (batched; see close())."""
+        self._store.mark_dirty()
+
+    def close(self):
+        """Writes any pending scans to disk."""
+        self._store.close()
 
     def add_item(self, item_dict):
         """
@@ -0,0 +1,338 @@
+import json
+import math
+import threading
+import time
+import uuid
+from pathlib import Path
+from .utils import SafeJsonWriter
+from .print_transport import PartialSendError
+from .config import CONFIG_DIR
+
+PRINT_QUEUE_FILE = CONFIG_DIR / "print_queue.json"
+
+# Job states
+JOB_QUEUED = "QUEUED"
+JOB_PRINTING = "PRINTING"
+JOB_DONE = "DONE"
+JOB_FAILED = "FAILED"
+JOB_CANCELLED = "CANCELLED"
+JOB_INTERRUPTED = "INTERRUPTED"  # Was printing when the app stopped; held until resolve_interrupted()
+
+# Job modes: 'zpl' = raw batch, 'image' = rendered label via print_label_windows,
+# 'auto' = raw batch first, image per label if that sends nothing
+MODE_ZPL = "zpl"
+MODE_IMAGE = "image"
+MODE_AUTO = "auto"
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 2.0
+DEFAULT_COALESCE_WINDOW = 1.0
+FINISHED_HISTORY = 50
+
+def _json_safe(item):
+    """Row dict -> plain JSON types (numpy scalars unwrapped, NaN/timestamps handled)."""
+    clean = {}
+    for key, value in dict(item).items():
+        if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+            try:
+                value = value.item()
+            except (ValueError, TypeError):
+                pass
+        if isinstance(value, float) and math.isnan(value):
+            value = None
+        elif value is not None and not isinstance(value, (str, int, float, bool)):
+            value = str(value)
+        clean[str(key)] = value
+    return clean
+
+class PrintJob:
+    def __init__(self, items, printer_name=None, mode=MODE_AUTO, coalesce=True, job_id=None):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.items = [_json_safe(i) for i in items]
+        self.printer_name = printer_name
+        self.mode = mode
+        self.coalesce = coalesce
+        self.status = JOB_QUEUED
+        self.attempts = 0
+        self.error = ""
+        self.labels_sent = 0
+        self.created = time.time()
+        self.next_attempt = self.created
+        self.callbacks = []
+
+    def to_dict(self):
+        return {
+            "id": self.id, "items": self.items, "printer_name": self.printer_name,
+            "mode": self.mode, "coalesce": self.coalesce, "status": self.status,
+            "attempts": self.attempts, "error": self.error, "labels_sent": self.labels_sent,
+            "created": self.created,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        job = cls(data.get("items", []), data.get("printer_name"), data.get("mode", MODE_AUTO),
+                  data.get("coalesce", True), data.get("id"))
+        job.attempts = data.get("attempts", 0)
+        job.created = data.get("created", job.created)
+        job.labels_sent = data.get("labels_sent", 0)
+        job.error = data.get("error", "")
+        if data.get("status") in (JOB_PRINTING, JOB_INTERRUPTED):
+            job.status = JOB_INTERRUPTED  # Some labels may already be out; don't reprint blindly
+        return job
+
+class PrintQueue:
+    """
+    Background label printing. Jobs run on one worker thread, survive restarts
+    (unfinished jobs are persisted), retry with exponential backoff and can be
+    cancelled while queued. Coalescible jobs for the same printer/mode queued
+    within coalesce_window seconds are printed as one batch, so single labels
+    pair up into 2-up formats.
+
+    Labels are credited individually: after a partial send a job keeps only
+    its unsent labels and retries those. The PRINTING state is persisted
+    before each send; a job found in it on load is INTERRUPTED and waits
+    for resolve_interrupted() rather than reprinting on its own; so does a
+    raw batch that fails after part of its stream reached the printer.
+
+    Listeners and per-job callbacks receive the PrintJob on every state change
+    and run on the worker thread (GUI callers should marshal with after()).
+    """
+    def __init__(self, printer_manager, file_path=None, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff=DEFAULT_BACKOFF, coalesce_window=DEFAULT_COALESCE_WINDOW, autostart=True):
+        self.printer = printer_manager
+        self.file_path = Path(file_path) if file_path else PRINT_QUEUE_FILE
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.coalesce_window = coalesce_window
+
+        self._cond = threading.Condition()
+        self._jobs = []        # Active jobs in submission order
+        self._finished = []    # Recent DONE/FAILED/CANCELLED jobs
+        self._listeners = []
+        self._running = False
+        self._thread = None
+
+        self._load()
+        if autostart:
+            self.start()
+
+    # --- Persistence ---
+
+    def _load(self):
+        if not self.file_path.exists():
+            return
+        try:
+            with open(self.file_path, 'r') as f:
+                data = json.load(f)
+            self._jobs = [PrintJob.from_dict(j) for j in data.get("jobs", [])]
+        except Exception as e:
+            print(f"Print queue load error: {e}")
+
+    def _save_unlocked(self):
+        SafeJsonWriter.write(self.file_path, {"jobs": [j.to_dict() for j in self._jobs]})
+
+    # --- Public API ---
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._worker, daemon=True, name="PrintQueue")
+        self._thread.start()
+
+    def shutdown(self, wait=False, timeout=5.0):
+        """Stops the worker. Queued jobs stay on disk and resume next start."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if wait and self._thread:
+            self._thread.join(timeout)
+
+    def submit(self, items, printer_name=None, mode=MODE_AUTO, callback=None, coalesce=True):
+        """Queues items for printing. Returns the job id."""
+        job = PrintJob(items, printer_name, mode, coalesce)
+        if callback:
+            job.callbacks.append(callback)
+        with self._cond:
+            self._jobs.append(job)
+            self._save_unlocked()
+            self._cond.notify_all()
+        self._notify(job)
+        return job.id
+
+    def cancel(self, job_id):
+        """Cancels a queued (not yet printing) job. Returns True if cancelled."""
+        with self._cond:
+            job = next((j for j in self._jobs if j.id == job_id), None)
+            if not job or job.status != JOB_QUEUED:
+                return False
+            self._finish_unlocked(job, JOB_CANCELLED)
+            self._save_unlocked()
+            self._cond.notify_all()
+        self._notify(job)
+        return True
+
+    def get_job(self, job_id):
+        with self._cond:
+            for job in self._jobs + self._finished:
+                if job.id == job_id:
+                    return job
+        return None
+
+    def get_jobs(self):
+        """Snapshot of active then recently finished jobs (without item payloads)."""
+        with self._cond:
+            jobs = self._jobs + self._finished[::-1]
+            snapshot = []
+            for job in jobs:
+                data = job.to_dict()
+                data["labels"] = len(data.pop("items"))
+                snapshot.append(data)
+            return snapshot
+
+    def interrupted_jobs(self):
+        """Jobs that were printing when the app last stopped (see resolve_interrupted)."""
+        with self._cond:
+            return [j for j in self._jobs if j.status == JOB_INTERRUPTED]
+
+    def resolve_interrupted(self, job_id, reprint):
+        """Requeues an interrupted job, or marks it DONE when its labels did print."""
+        with self._cond:
+            job = next((j for j in self._jobs if j.id == job_id), None)
+            if not job or job.status != JOB_INTERRUPTED:
+                return False
+            if reprint:
+                job.status = JOB_QUEUED
+                job.next_attempt = time.time()
+            else:
+                job.labels_sent += len(job.items)
+                self._finish_unlocked(job, JOB_DONE)
+            self._save_unlocked()
+            self._cond.notify_all()
+        self._notify(job)
+        return True
+
+    def pending_count(self):
+        with self._cond:
+            return sum(len(j.items) for j in self._jobs)
+
+    def wait_idle(self, timeout=None):
+        """Blocks until no jobs are active. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._jobs:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def add_listener(self, callback):
+        """callback(job) on every job state change."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    # --- Worker ---
+
+    def _notify(self, job):
+        for callback in list(self._listeners) + list(job.callbacks):
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"Print queue listener error: {e}")
+
+    def _finish_unlocked(self, job, status):
+        job.status = status
+        if job in self._jobs:
+            self._jobs.remove(job)
+        self._finished.append(job)
+        del self._finished[:-FINISHED_HISTORY]
+
+    def _next_batch_unlocked(self):
+        """Returns (jobs, wait_seconds). jobs is empty when nothing is ready yet."""
+        now = time.time()
+        ready = [j for j in self._jobs if j.status == JOB_QUEUED and j.next_attempt <= now]
+        if not ready:
+            upcoming = [j.next_attempt for j in self._jobs if j.status == JOB_QUEUED]
+            return [], (min(upcoming) - now if upcoming else None)
+
+        head = ready[0]
+        if not head.coalesce:
+            return [head], 0
+        # Hold coalescible jobs until the window closes so later labels can join
+        window_end = head.created + self.coalesce_window
+        if now < window_end and head.attempts == 0:
+            return [], window_end - now
+        batch = [j for j in ready if j.coalesce and j.printer_name == head.printer_name and j.mode == head.mode]
+        return batch, 0
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        return
+                    batch, wait = self._next_batch_unlocked()
+                    if batch:
+                        break
+                    self._cond.wait(wait)
+                for job in batch:
+                    job.status = JOB_PRINTING
+                    job.attempts += 1
+                self._save_unlocked()  # A crash from here on leaves the jobs INTERRUPTED
+            for job in batch:
+                self._notify(job)
+
+            items = [item for job in batch for item in job.items]
+            interrupted = False
+            try:
+                ok = self._print(items, batch[0].printer_name, batch[0].mode)
+                error = "" if all(ok) else "Printer did not accept the job"
+            except PartialSendError as e:
+                ok, error, interrupted = [False] * len(items), str(e), True
+            except Exception as e:
+                ok, error = [False] * len(items), str(e)
+
+            with self._cond:
+                start = 0
+                for job in batch:
+                    if interrupted:
+                        # Unknown how many labels printed: ask, don't retry or fall back
+                        job.error = error
+                        job.status = JOB_INTERRUPTED
+                        continue
+                    job_ok = ok[start:start + len(job.items)]
+                    start += len(job.items)
+                    job.labels_sent += sum(job_ok)
+                    job.items = [item for item, sent in zip(job.items, job_ok) if not sent]
+                    if not job.items:
+                        job.error = ""
+                        self._finish_unlocked(job, JOB_DONE)
+                        continue
+                    job.error = f"{len(job.items)} label(s) not accepted" if any(job_ok) else error
+                    if job.attempts > self.max_retries:
+                        self._finish_unlocked(job, JOB_FAILED)
+                    else:
+                        job.status = JOB_QUEUED
+                        job.next_attempt = time.time() + self.backoff * (2 ** (job.attempts - 1))
+                self._save_unlocked()
+                self._cond.notify_all()
+            for job in batch:
+                self._notify(job)
+
+    def _print(self, items, printer_name, mode):
+        """
+        Sends items to the printer. Returns one bool per item: was its label sent.
+        Auto mode falls back to image printing only when no ZPL was written;
+        a part-sent batch raises PartialSendError instead.
+        """
+        if mode in (MODE_ZPL, MODE_AUTO):
+            count = self.printer.print_batch_zpl(items, printer_name)
+            if count or mode == MODE_ZPL:
+                return [i < count for i in range(len(items))]  # The ZPL stream goes out in order
+        return [bool(self.printer.print_label_windows(item, printer_name)) for item in items]
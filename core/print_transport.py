@@ -0,0 +1,195 @@
+import socket
+import threading
+from abc import ABC, abstractmethod
+
+# Try importing win32 libraries, handle failure for non-Windows dev env
+try:
+    import win32print
+    HAS_WIN32 = True
+except ImportError:
+    HAS_WIN32 = False
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+JETDIRECT_PORT = 9100
+
+class PartialSendError(OSError):
+    """A job failed after some of its data had already reached the printer."""
+    def __init__(self, sent, error):
+        super().__init__(f"Job interrupted after {sent} bytes: {error}")
+        self.sent = sent
+
+class RawTransport(ABC):
+    """
+    Destination for raw printer data (ZPL). One open()/close() pair is one job;
+    write() may be called any number of times in between.
+    """
+    @abstractmethod
+    def open(self, job_name="RawZPL"):
+        """Starts a job."""
+
+    @abstractmethod
+    def write(self, data):
+        """Writes bytes to the open job."""
+
+    @abstractmethod
+    def close(self):
+        """Ends the job; a no-op when none is open."""
+
+    def abort(self):
+        """Closes after a failure. Defaults to close()."""
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def send(self, chunks, job_name="RawZPL"):
+        """
+        Writes an iterable of bytes chunks as a single job. Returns bytes sent.
+        Raises PartialSendError if it fails once data has been written.
+        """
+        sent = 0
+        self.open(job_name)
+        try:
+            for chunk in chunks:
+                if chunk:
+                    self.write(chunk)
+                    sent += len(chunk)
+            self.close()
+        except Exception as e:
+            self.abort()
+            if sent:
+                raise PartialSendError(sent, e) from e
+            raise
+        return sent
+
+class WindowsSpoolerTransport(RawTransport):
+    """Raw job through the Windows print spooler (one StartDocPrinter per job)."""
+    def __init__(self, printer_name=None):
+        if not HAS_WIN32:
+            raise RuntimeError("Win32 not available for printing.")
+        self.printer_name = printer_name or win32print.GetDefaultPrinter()
+        self._handle = None
+
+    def open(self, job_name="RawZPL"):
+        self._handle = win32print.OpenPrinter(self.printer_name)
+        if not self._handle:
+            raise OSError(f"Could not open printer: {self.printer_name}")
+        try:
+            if not win32print.StartDocPrinter(self._handle, 1, (job_name, None, "raw")):
+                raise OSError("Failed to start print job")
+            win32print.StartPagePrinter(self._handle)
+        except Exception:
+            win32print.ClosePrinter(self._handle)
+            self._handle = None
+            raise
+
+    def write(self, data):
+        win32print.WritePrinter(self._handle, data)
+
+    def close(self):
+        if not self._handle:
+            return
+        try:
+            win32print.EndPagePrinter(self._handle)
+            win32print.EndDocPrinter(self._handle)
+        finally:
+            try:
+                win32print.ClosePrinter(self._handle)
+            finally:
+                self._handle = None
+
+class TcpTransport(RawTransport):
+    """Raw TCP (JetDirect / port 9100) network printer."""
+    def __init__(self, host, port=JETDIRECT_PORT, timeout=10.0):
+        self.host = host
+        self.port = int(port)
+        self.timeout = timeout
+        self._sock = None
+
+    def open(self, job_name="RawZPL"):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+
+    def write(self, data):
+        self._sock.sendall(data)
+
+    def close(self):
+        if self._sock:
+            try:
+                self._sock.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+
+class FileTransport(RawTransport):
+    """Writes to a file or device path (e.g. /dev/usb/lp0, \\\\.\\COM3, a .zpl dump)."""
+    def __init__(self, path, append=True):
+        self.path = path
+        self.append = append
+        self._fh = None
+
+    def open(self, job_name="RawZPL"):
+        self._fh = open(self.path, 'ab' if self.append else 'wb')
+
+    def write(self, data):
+        self._fh.write(data)
+
+    def close(self):
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+class MemoryTransport(RawTransport):
+    """Captures jobs in memory. Used by tests and for dry runs."""
+    def __init__(self):
+        self.jobs = []      # list of (job_name, bytes)
+        self.writes = 0
+        self._lock = threading.Lock()
+        self._current = None
+
+    def open(self, job_name="RawZPL"):
+        self._current = (job_name, bytearray())
+
+    def write(self, data):
+        self._current[1].extend(data)
+        self.writes += 1
+
+    def close(self):
+        if self._current is not None:
+            with self._lock:
+                self.jobs.append((self._current[0], bytes(self._current[1])))
+            self._current = None
+
+def create_transport(target=None):
+    """
+    Builds a transport from a target string:
+      tcp://host[:port]  -> TcpTransport (port defaults to 9100)
+      file://path        -> FileTransport
+      memory://          -> MemoryTransport
+      anything else      -> Windows printer name (None = default printer)
+    """
+    target = (target or "").strip()
+    lower = target.lower()
+    if lower.startswith("tcp://"):
+        host, _, port = target[6:].partition(":")
+        return TcpTransport(host, int(port) if port else JETDIRECT_PORT)
+    if lower.startswith("file://"):
+        return FileTransport(target[7:])
+    if lower.startswith("memory://"):
+        return MemoryTransport()
+    return WindowsSpoolerTransport(target or None)
+
+def iter_chunks(parts, chunk_size=DEFAULT_CHUNK_SIZE, encoding="utf-8"):
+    """Encodes string parts and regroups them into ~chunk_size byte writes."""
+    buf = []
+    size = 0
+    for part in parts:
+        data = part.encode(encoding)
+        buf.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b"".join(buf)
+            buf = []
+            size = 0
+    if buf:
+        yield b"".join(buf)
@@ -1,8 +1,14 @@
 import os
 import datetime
+from concurrent.futures import ProcessPoolExecutor
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
 from PIL import Image
+from .barcode_utils import BarcodeGenerator, BARCODE_QUIET_MODULES
+from .code128 import code128_modules, module_runs
+from .zpl_template import ZPLTemplate, ZPLTemplateLoader
+from .print_transport import create_transport, iter_chunks, DEFAULT_CHUNK_SIZE, PartialSendError
 
 # Try importing win32 libraries, handle failure for non-Windows dev env
 try:
@@ -21,10 +27,141 @@ try:
 except ImportError:
     HAS_ESCPOS = False
 
+# Variables holding raw ZPL (empty when the item has no grade); never escaped,
+# in the built-in layouts and in custom_template.zpl alike
+RAW_LABEL_VARS = ("grade_block", "grade_block_2")
+
+# Built-in layouts used when no custom_template.zpl is configured.
+FALLBACK_TEMPLATE_1UP = ZPLTemplate("""
+^XA
+^PW400
+^LL176
+^FO0,10^A0N,30,30
+^FB400,1,0,C,0^FD${store_name}^FS
+
+^FO95,42^BY3,2,40^BCN,40,N,N,N
+^FD${id}^FS
+
+${grade_block}
+
+^FO0,85^A0N,25,25
+^FB400,1,0,C,0^FD${id}^FS
+
+^FO25,112^A0N,29,29
+^FB350,2,0,L,0^FD${model}^FS
+
+^FO25,145^A0N,26,26
+^FB200,1,0,L,0^FD${ram_rom}^FS
+
+^FO150,142^A0N,32,32
+^FB240,1,0,R,0^FD${price}^FS
+
+^XZ
+""", raw_vars=RAW_LABEL_VARS)
+
+FALLBACK_TEMPLATE_2UP = ZPLTemplate("""^XA^PW830^LL176
+^FO0,10^A0N,30,30
+^FB400,1,0,C,0^FD${store_name}^FS
+
+^FO95,42^BY3,2,40^BCN,40,N,N,N
+^FD${id}^FS
+
+${grade_block}
+
+^FO0,85^A0N,25,25
+^FB400,1,0,C,0^FD${id}^FS
+
+^FO25,112^A0N,29,29
+^FB350,2,0,L,0^FD${model}^FS
+
+^FO25,145^A0N,26,26
+^FB200,1,0,L,0^FD${ram_rom}^FS
+
+^FO150,142^A0N,32,32
+^FB240,1,0,R,0^FD${price}^FS
+
+^FO416,10^A0N,30,30
+^FB400,1,0,C,0^FD${store_name_2}^FS
+
+^FO511,42^BY3,2,40^BCN,40,N,N,N
+^FD${id_2}^FS
+
+${grade_block_2}
+
+^FO416,85^A0N,25,25
+^FB400,1,0,C,0^FD${id_2}^FS
+
+^FO441,112^A0N,29,29
+^FB350,2,0,L,0^FD${model_2}^FS
+
+^FO441,145^A0N,26,26
+^FB200,1,0,L,0^FD${ram_rom_2}^FS
+
+^FO566,142^A0N,32,32
+^FB240,1,0,R,0^FD${price_2}^FS
+^XZ""", raw_vars=RAW_LABEL_VARS)
+
+# Grade badge X position for the left/right label of a 2-up row
+GRADE_BOX_X = (330, 740)
+
+# Label sheet PDF export
+PDF_RASTER_DPI = 300
+PDF_PARALLEL_MIN_LABELS = 64  # Below this, process start-up costs more than it saves
+PDF_MAX_WORKERS = 4
+
+def _rasterize_label(args):
+    """Process-pool worker: renders one label, returns (size, RGB bytes)."""
+    item, w_mm, h_mm, dpi, store_name = args
+    img = BarcodeGenerator({'store_name': store_name}).generate_label_preview(item, w_mm, h_mm, dpi=dpi)
+    return img.size, img.tobytes()
+
 class PrinterManager:
     def __init__(self, config_manager, barcode_generator):
         self.config = config_manager
         self.barcode_gen = barcode_generator
+        self._templates = ZPLTemplateLoader()  # Compiled once, reloaded on mtime change
+
+    def _get_custom_template(self):
+        template_path = self.config.get_config_dir() / "custom_template.zpl"
+        return self._templates.load(template_path, raw_vars=RAW_LABEL_VARS)
+
+    def _label_values(self, item, store, slot=0):
+        """Template variables for one label. slot is 0 (left) or 1 (right)."""
+        try:
+            price = f"Rs. {float(item.get('price', 0) or 0):,.0f}"
+        except (TypeError, ValueError):
+            price = f"Rs. {item.get('price', '')}"
+        grade = str(item.get('grade', '') or '').upper()
+        grade_block = ""
+        if grade:
+            gx = GRADE_BOX_X[slot]
+            badge = grade.replace('^', ' ').replace('~', ' ')  # Raw block, escape by hand
+            grade_block = f"^FO{gx},45^GB50,32,32^FS\n^FO{gx},49^A0N,24,24^FR^FB50,1,0,C,0^FD{badge}^FS"
+        return {
+            "store_name": store,
+            "id": str(item.get('unique_id', '')),
+            "model": str(item.get('model', '') or '')[:25],
+            "ram_rom": str(item.get('ram_rom', '') or ''),
+            "price": price,
+            "grade": grade,
+            "imei": str(item.get('imei', '') or ''),
+            "grade_block": grade_block,
+        }
+
+    def render_label_formats(self, items, fallback=FALLBACK_TEMPLATE_2UP):
+        """
+        Renders items with the active template (or fallback).
+        Returns a list of (zpl_format, label_count), one entry per ^XA...^XZ.
+        """
+        template = self._get_custom_template() or fallback
+        store = self.config.get('store_name', 'My Mobile Shop')[:20]
+        per_format = template.labels_per_format
+        values = [self._label_values(item, store, i % per_format) for i, item in enumerate(items)]
+        return template.render_batch(values)
+
+    def generate_batch_zpl(self, items):
+        """Full ZPL stream for items (2-up pairs or one format per label)."""
+        return "".join(zpl for zpl, _ in self.render_label_formats(items))
 
     def get_system_printers(self):
         if not HAS_WIN32:
@@ -69,153 +206,35 @@ class PrinterManager:
             print(f"PDF Print Error: {e}")
             return False
 
-    def send_raw_zpl(self, zpl_string, printer_name=None):
-        """Sends raw ZPL string directly to the printer."""
-        if not HAS_WIN32:
-            print("Win32 not available for printing.")
-            return False
+    def get_transport(self, printer_name=None):
+        """Raw transport for printer_name, else the configured label target, else the default printer."""
+        return create_transport(printer_name or self.config.get('label_printer_target', ''))
 
-        if not printer_name:
-            try:
-                printer_name = win32print.GetDefaultPrinter()
-            except:
-                return False
-
-        encoded_zpl = zpl_string.encode("utf-8")
-        h_printer = None
+    def _send_raw(self, parts, printer_name, transport, job_name, raise_partial=False):
+        """
+        Streams string parts as one raw job. Returns True on success. With
+        raise_partial, a failure after data went out raises PartialSendError.
+        """
         try:
-            h_printer = win32print.OpenPrinter(printer_name)
-            if not h_printer:
-                raise Exception(f"Could not open printer: {printer_name}")
-            
-            job_info = win32print.StartDocPrinter(h_printer, 1, ("RawZPL", None, "raw"))
-            if not job_info:
-                raise Exception("Failed to start print job")
-            
-            win32print.StartPagePrinter(h_printer)
-            win32print.WritePrinter(h_printer, encoded_zpl)
-            win32print.EndPagePrinter(h_printer)
-            win32print.EndDocPrinter(h_printer)
-            success = True
+            transport = transport or self.get_transport(printer_name)
+            transport.send(iter_chunks(parts, DEFAULT_CHUNK_SIZE), job_name)
+            return True
+        except PartialSendError as e:
+            print(f"Raw Print Error: {e}")
+            if raise_partial:
+                raise
+            return False
         except Exception as e:
             print(f"Raw Print Error: {e}")
-            success = False
-        finally:
-            if h_printer:
-                try:
-                    win32print.ClosePrinter(h_printer)
-                except:
-                    pass
-        return success
-
-    def print_label_zpl(self, item_data, printer_name=None):
-        if not HAS_WIN32:
             return False
 
-        if not printer_name:
-            try:
-                printer_name = win32print.GetDefaultPrinter()
-            except:
-                return False
-
-        # Load Custom Template if exists
-        template_path = self.config.get_config_dir() / "custom_template.zpl"
-        zpl_template = ""
-        
-        if os.path.exists(template_path):
-            try:
-                with open(template_path, 'r') as f:
-                    zpl_template = f.read()
-            except Exception as e:
-                print(f"Template load error: {e}")
-
-        store_name = self.config.get('store_name', 'My Mobile Shop')[:20]
-        uid = str(item_data.get('unique_id', ''))
-        model = item_data.get('model', '')[:25]
-        ram_rom = item_data.get('ram_rom', '')
-        price = f"Rs. {item_data.get('price', 0):,.0f}"
-        grade = str(item_data.get('grade', '')).upper()
-        
-        # Helper for conditional Grade ZPL
-        grade_zpl = ""
-        if grade:
-            grade_zpl = f"^FO330,45^GB50,32,32^FS\n^FO330,49^A0N,24,24^FR^FB50,1,0,C,0^FD{grade}^FS"
-
-        if zpl_template and len(zpl_template) > 10:
-            # Use Template with Variable Injection
-            # We use simple string replace or format map. 
-            # Our designer uses ${variable} syntax.
-            
-            # Dictionary of available variables
-            vars_map = {
-                "${store_name}": store_name,
-                "${id}": uid,
-                "${model}": model,
-                "${ram_rom}": ram_rom,
-                "${price}": price,
-                "${grade}": grade,
-                "${imei}": str(item_data.get('imei', '')),
-            }
-            
-            zpl = zpl_template
-            for k, v in vars_map.items():
-                zpl = zpl.replace(k, v)
-                
-        else:
-            # Fallback to Hardcoded logic
-            zpl = f"""
-^XA
-^PW400
-^LL176
-^FO0,10^A0N,30,30
-^FB400,1,0,C,0^FD{store_name}^FS
-
-^FO95,42^BY3,2,40^BCN,40,N,N,N
-^FD{uid}^FS
-
-{grade_zpl}
-
-^FO0,85^A0N,25,25
-^FB400,1,0,C,0^FD{uid}^FS
-
-^FO25,112^A0N,29,29
-^FB350,2,0,L,0^FD{model}^FS
+    def send_raw_zpl(self, zpl_string, printer_name=None, transport=None):
+        """Sends raw ZPL string directly to the printer."""
+        return self._send_raw([zpl_string], printer_name, transport, "RawZPL")
 
-^FO25,145^A0N,26,26
-^FB200,1,0,L,0^FD{ram_rom}^FS
-
-^FO150,142^A0N,32,32
-^FB240,1,0,R,0^FD{price}^FS
-
-^XZ
-"""
-        # Send Raw ZPL
-        encoded_zpl = zpl.encode("utf-8")
-        h_printer = None
-        try:
-            h_printer = win32print.OpenPrinter(printer_name)
-            if not h_printer:
-                raise Exception(f"Could not open printer: {printer_name}")
-            
-            job_info = win32print.StartDocPrinter(h_printer, 1, ("LabelZPL", None, "raw"))
-            if not job_info:
-                raise Exception("Failed to start print job")
-            
-            win32print.StartPagePrinter(h_printer)
-            win32print.WritePrinter(h_printer, encoded_zpl)
-            win32print.EndPagePrinter(h_printer)
-            win32print.EndDocPrinter(h_printer)
-            success = True
-        except Exception as e:
-            print(f"ZPL Print Error: {e}")
-            success = False
-        finally:
-            if h_printer:
-                try:
-                    win32print.ClosePrinter(h_printer)
-                except:
-                    pass
-        return success
+    def print_label_zpl(self, item_data, printer_name=None, transport=None):
+        zpl = self.render_label_formats([item_data], fallback=FALLBACK_TEMPLATE_1UP)[0][0]
+        return self._send_raw([zpl], printer_name, transport, "LabelZPL")
 
     def _calculate_barcode_x(self, data, column_center_x, module_width=2):
         """
@@ -228,179 +247,19 @@ class PrinterManager:
         start_x = column_center_x - (barcode_width_dots / 2)
         return int(start_x)
 
-    def print_batch_zpl(self, items, printer_name=None):
-        if not HAS_WIN32:
+    def print_batch_zpl(self, items, printer_name=None, transport=None):
+        """
+        Prints items as a single raw job (formats streamed in chunked writes).
+        Returns the number of labels sent, 0 when nothing reached the printer.
+        Raises PartialSendError if the job failed part-way, as some labels
+        may already have printed.
+        """
+        formats = self.render_label_formats(items)
+        if not formats:
             return 0
-
-        if not printer_name:
-            try:
-                printer_name = win32print.GetDefaultPrinter()
-            except:
-                return 0
-        
-        # Load Template logic
-        template_path = self.config.get_config_dir() / "custom_template.zpl"
-        zpl_template = None
-        if os.path.exists(template_path):
-            try:
-                with open(template_path, 'r') as f:
-                    zpl_template = f.read()
-            except Exception as e:
-                print(f"Template load error: {e}")
-
-        count = 0
-        h_printer = None
-        try:
-            h_printer = win32print.OpenPrinter(printer_name)
-            if not h_printer:
-                raise Exception(f"Could not open printer: {printer_name}")
-            
-            # Process in pairs
-            for i in range(0, len(items), 2):
-                item1 = items[i]
-                item2 = items[i+1] if i+1 < len(items) else None
-                
-                if zpl_template and len(zpl_template) > 10:
-                    # USE TEMPLATE
-                    zpl_content = zpl_template
-                    
-                    # Prepare Variables
-                    store = self.config.get('store_name', 'My Mobile Shop')[:20]
-                    
-                    # Helper to map item to prefix
-                    def get_vars(itm, suffix=""):
-                        if not itm:
-                            return {
-                                f"${{store_name{suffix}}}": "",
-                                f"${{id{suffix}}}": "",
-                                f"${{model{suffix}}}": "",
-                                f"${{ram_rom{suffix}}}": "",
-                                f"${{price{suffix}}}": "",
-                                f"${{grade{suffix}}}": "",
-                                f"${{imei{suffix}}}": ""
-                            }
-                            
-                        return {
-                            f"${{store_name{suffix}}}": store,
-                            f"${{id{suffix}}}": str(itm.get('unique_id', '')),
-                            f"${{model{suffix}}}": itm.get('model', '')[:25],
-                            f"${{ram_rom{suffix}}}": itm.get('ram_rom', ''),
-                            f"${{price{suffix}}}": f"Rs. {itm.get('price', 0):,.0f}",
-                            f"${{grade{suffix}}}": str(itm.get('grade', '')).upper(),
-                            f"${{imei{suffix}}}": str(itm.get('imei', ''))
-                        }
-
-                    # Map Left (No suffix) and Right (_2 suffix)
-                    vars_map = get_vars(item1, "")
-                    vars_map.update(get_vars(item2, "_2"))
-                    
-                    for k, v in vars_map.items():
-                        zpl_content = zpl_content.replace(k, v)
-
-                else:
-                    # FALLBACK TO HARDCODED
-                    zpl_content = "^XA^PW830^LL176"
-                    
-                    def get_fields(item, is_right_side):
-                        store = self.config.get('store_name', 'My Mobile Shop')[:20]
-                        uid = str(item.get('unique_id', ''))
-                        model = item.get('model', '')[:25]
-                        ram = item.get('ram_rom', '')
-                        pr = f"Rs. {item.get('price', 0):,.0f}"
-                        grade = str(item.get('grade', '')).upper()
-
-                        if not is_right_side:
-                            # LEFT SIDE
-                            grade_zpl = ""
-                            if grade:
-                                grade_zpl = f"^FO330,45^GB50,32,32^FS\n^FO330,49^A0N,24,24^FR^FB50,1,0,C,0^FD{grade}^FS"
-                            
-                            return f"""
-^FX --- LEFT SIDE: {model} (ID {uid}) --- ^FS
-^FO0,10^A0N,30,30
-^FB400,1,0,C,0^FD{store}^FS
-
-^FO95,42^BY3,2,40^BCN,40,N,N,N
-^FD{uid}^FS
-
-{grade_zpl}
-
-^FO0,85^A0N,25,25
-^FB400,1,0,C,0^FD{uid}^FS
-
-^FO25,112^A0N,29,29
-^FB350,2,0,L,0^FD{model}^FS
-
-^FO25,145^A0N,26,26
-^FB200,1,0,L,0^FD{ram}^FS
-
-^FO150,142^A0N,32,32
-^FB240,1,0,R,0^FD{pr}^FS
-"""
-                        else:
-                            # RIGHT SIDE
-                            grade_zpl = ""
-                            if grade:
-                                grade_zpl = f"^FO740,45^GB50,32,32^FS\n^FO740,49^A0N,24,24^FR^FB50,1,0,C,0^FD{grade}^FS"
-
-                            return f"""
-^FX --- RIGHT SIDE: {model} (ID {uid}) --- ^FS
-^FO416,10^A0N,30,30
-^FB400,1,0,C,0^FD{store}^FS
-
-^FO511,42^BY3,2,40^BCN,40,N,N,N
-^FD{uid}^FS
-
-{grade_zpl}
-
-^FO416,85^A0N,25,25
-^FB400,1,0,C,0^FD{uid}^FS
-
-^FO441,112^A0N,29,29
-^FB350,2,0,L,0^FD{model}^FS
-
-^FO441,145^A0N,26,26
-^FB200,1,0,L,0^FD{ram}^FS
-
-^FO566,142^A0N,32,32
-^FB240,1,0,R,0^FD{pr}^FS
-"""
-                    
-                    # Add Label 1 (Left)
-                    zpl_content += get_fields(item1, False)
-                    
-                    # Add Label 2 (Right) if exists
-                    if item2:
-                        zpl_content += get_fields(item2, True)
-                    
-                    zpl_content += "^XZ"
-                
-                # Send Job
-                try:
-                    job_info = win32print.StartDocPrinter(h_printer, 1, ("BatchLabel", None, "raw"))
-                    if not job_info:
-                        raise Exception("Failed to start print job")
-                    
-                    win32print.StartPagePrinter(h_printer)
-                    win32print.WritePrinter(h_printer, zpl_content.encode("utf-8"))
-                    win32print.EndPagePrinter(h_printer)
-                    win32print.EndDocPrinter(h_printer)
-                    count += (2 if item2 else 1)
-                except Exception as print_err:
-                    print(f"Error printing label: {print_err}")
-                    continue
-            
-            return count
-            
-        except Exception as e:
-            print(f"Batch Print Error: {e}")
+        if not self._send_raw((zpl for zpl, _ in formats), printer_name, transport, "BatchLabel", raise_partial=True):
             return 0
-        finally:
-            if h_printer:
-                try:
-                    win32print.ClosePrinter(h_printer)
-                except:
-                    pass
+        return sum(count for _, count in formats)
 
     def print_label_windows(self, item_data, printer_name=None):
         # Prefer ZPL if configured or default to it for thermal
@@ -480,13 +339,16 @@ class PrinterManager:
         print("ESC/POS printing triggered (Stub).")
         return True
 
-    def export_labels_pdf(self, items, filename):
+    def export_labels_pdf(self, items, filename, vector=False, workers=None):
         """
         items: list of item_data dicts
         filename: output path
+        vector: draw text and barcode as PDF vectors instead of 300 dpi images
+        workers: raster processes (None = auto for large batches, 0/1 = in-process)
         """
-        w_mm = self.config.get('label_width_mm')
-        h_mm = self.config.get('label_height_mm')
+        items = list(items)
+        w_mm = float(self.config.get('label_width_mm'))
+        h_mm = float(self.config.get('label_height_mm'))
         
         # A4 Page setup or Custom Label Roll?
         # Requirement says "Batch print... arrange as per label sheet"
@@ -501,16 +363,15 @@ class PrinterManager:
         x_start = 10*mm
         y_start = page_h - 10*mm - (h_mm*mm)
         x, y = x_start, y_start
+
+        labels = items if vector else self._iter_label_images(items, w_mm, h_mm, workers)
         
-        for item in items:
-            # Generate temp image
-            # ReportLab can insert images
-            img = self.barcode_gen.generate_label_preview(item, w_mm, h_mm, dpi=300)
-            img_path = f"temp_lbl_{item['unique_id']}.png"
-            img.save(img_path)
-            
-            c.drawImage(img_path, x, y, width=w_mm*mm, height=h_mm*mm)
-            os.remove(img_path) # Cleanup
+        for label in labels:
+            if vector:
+                self._draw_label_vector(c, label, x, y, w_mm*mm, h_mm*mm)
+            else:
+                # In-memory image, streamed as workers finish (no temp files)
+                c.drawImage(ImageReader(label), x, y, width=w_mm*mm, height=h_mm*mm)
             
             # Move Cursor
             x += (w_mm + 2)*mm
@@ -525,3 +386,66 @@ class PrinterManager:
                 
         c.save()
         return True
+
+    def _iter_label_images(self, items, w_mm, h_mm, workers=None):
+        """Yields label images in item order, rasterized in a process pool for large batches."""
+        if workers is None:
+            workers = min(PDF_MAX_WORKERS, os.cpu_count() or 1) if len(items) >= PDF_PARALLEL_MIN_LABELS else 0
+        done = 0
+        if workers > 1:
+            store = self.config.get('store_name', "4 Bros Mobile")
+            jobs = [(dict(item), w_mm, h_mm, PDF_RASTER_DPI, store) for item in items]
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    for size, data in pool.map(_rasterize_label, jobs, chunksize=8):
+                        yield Image.frombytes('RGB', size, data)
+                        done += 1
+                return
+            except Exception as e:
+                print(f"Parallel label render failed, continuing in process: {e}")
+        for item in items[done:]:
+            yield self.barcode_gen.generate_label_preview(item, w_mm, h_mm, dpi=PDF_RASTER_DPI)
+
+    def _draw_label_vector(self, c, item, x, y, w, h):
+        """Vector version of BarcodeGenerator.generate_label_preview (same proportions)."""
+        top = y + h
+        pad = w * 0.02
+
+        def text_baseline(offset, size):
+            # PIL positions text by its top edge, ReportLab by baseline
+            return top - offset - size * 0.8
+
+        header = str(self.config.get('store_name', "4 Bros Mobile"))
+        size = h * 0.15
+        c.setFont("Helvetica", size)
+        c.drawCentredString(x + w / 2, text_baseline(h * 0.01, size), header)
+
+        # Barcode: 80% width, 40% height, starting 20% down
+        barcode_val = str(item.get('unique_id', '00000'))
+        bc_w, bc_h = w * 0.8, h * 0.4
+        bc_x, bc_top = x + (w - bc_w) / 2, top - h * 0.20
+        data = "".join(ch if 32 <= ord(ch) <= 126 else '?' for ch in barcode_val)
+        modules = code128_modules(data)
+        quiet = BARCODE_QUIET_MODULES
+        module_w = bc_w / (len(modules) + 2 * quiet)
+        for is_bar, start, length in module_runs(modules):
+            if is_bar:
+                c.rect(bc_x + (start + quiet) * module_w, bc_top - bc_h, length * module_w, bc_h, stroke=0, fill=1)
+
+        size = h * 0.10
+        c.setFont("Helvetica", size)
+        c.drawCentredString(x + w / 2, text_baseline(h * 0.60, size), barcode_val)
+
+        # Model & RAM/ROM (bottom left), price (bottom right)
+        size = h * 0.12
+        c.setFont("Helvetica", size)
+        c.drawString(x + pad, text_baseline(h * 0.70, size), str(item.get('model', 'Unknown'))[:15])
+        c.drawString(x + pad, text_baseline(h * 0.82, size), str(item.get('ram_rom', '') or ''))
+
+        try:
+            price_text = f"Rs. {float(item.get('price', 0) or 0):,.0f}"  # Base-14 fonts have no rupee glyph
+        except (TypeError, ValueError):
+            price_text = f"Rs. {item.get('price', '')}"
+        size = h * 0.15
+        c.setFont("Helvetica", size)
+        c.drawRightString(x + w - pad, text_baseline(h * 0.70 + pad, size), price_text)
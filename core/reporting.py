@@ -1,19 +1,229 @@
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
-import os
-from datetime import datetime
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-try:
-    from docx import Document
-    from docx.shared import Inches
-except ImportError:
-    Document = None
+from .exporters import EXPORTERS, ExportCancelled
+
+# --- Filter compilation ---
+
+CONDITION_LOGICS = ('START', 'AND', 'OR', 'AND NOT', 'OR NOT', 'XOR')
+_CONJUNCTIVE = ('AND', 'AND NOT')
+
+# Rough selectivity/cost rank per operator: AND chains run lowest first, so
+# later (often costlier) predicates only see the rows that are still left.
+_OP_RANK = {
+    'Equals': 0, 'Is Empty': 1, 'Modulo': 2,
+    '>': 3, '<': 3, '>=': 3, '<=': 3, 'Above': 3, 'Below': 3,
+    'Contains': 4, 'Is Not Empty': 5, 'Not Equals': 6,
+}
+_NEGATED_OP = {'Equals': 'Not Equals', 'Not Equals': 'Equals', 'Is Empty': 'Is Not Empty', 'Is Not Empty': 'Is Empty'}
+
+COLUMN_CACHE_SIZE = 64
+
+class ColumnCache:
+    """
+    LRU of derived columns (lower-cased strings, numeric coercions) keyed by
+    inventory generation and frame, shared by every ReportGenerator so
+    repeated reports on unchanged data skip the string normalization.
+    """
+    def __init__(self, max_entries=COLUMN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        value = compute()
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+_shared_column_cache = ColumnCache()
+
+class FilterPredicate:
+    """One compiled condition; evaluates to a bool ndarray over the given row positions."""
+    def __init__(self, field, op, val, is_object, is_date):
+        self.field = field
+        self.op = op
+        self.val = val
+        self.is_object = is_object
+        self.is_date = is_date
+        self.compare_val = val
+        if op in ('>', '<', '>=', '<=', 'Above', 'Below'):
+            try:
+                self.compare_val = pd.to_datetime(val) if is_date else float(val)
+            except Exception:
+                pass
+        self.modulo = None
+        if op == 'Modulo' and "=" in str(val):
+            try:
+                div, rem = map(int, str(val).split('='))
+                self.modulo = (div, rem)
+            except ValueError as e:
+                print(f"Mask build error: {e}")  # Malformed: matches nothing, as before
+
+    def rank(self, negated=False):
+        op = _NEGATED_OP.get(self.op, self.op) if negated else self.op
+        return _OP_RANK.get(op, len(_OP_RANK))
+
+    def evaluate(self, generator, positions=None):
+        n = generator.row_count if positions is None else len(positions)
+        try:
+            result = self._evaluate(generator, positions)
+            return np.array(result, dtype=bool) if result is not None else np.zeros(n, dtype=bool)
+        except Exception as e:
+            print(f"Mask build error: {e}")
+            return np.zeros(n, dtype=bool)  # False mask on error
+
+    def _evaluate(self, generator, positions):
+        op = self.op
+        take = (lambda a: a) if positions is None else (lambda a: a[positions])
+        raw = lambda: generator.df[self.field] if positions is None else generator.df[self.field].iloc[positions]
+
+        if op in ('Equals', 'Not Equals'):
+            if self.is_object:
+                codes, uniques = generator.derived(self.field, 'lower')
+                # Compare each distinct value once; the extra False is for missing (code -1)
+                table = np.append(uniques == str(self.val).lower(), False)
+                hit = table[take(codes)]
+            else:
+                hit = (raw() == self.val).to_numpy()
+            return hit if op == 'Equals' else ~hit
+        if op == 'Contains':
+            codes, uniques = generator.derived(self.field, 'lower')
+            matches = pd.Series(uniques, dtype=object).str.contains(self.val, case=False, na=False)
+            return np.append(matches.to_numpy(dtype=bool), False)[take(codes)]
+        if op == 'Modulo':
+            if not self.modulo:
+                return None
+            div, rem = self.modulo
+            return take(generator.derived(self.field, 'numeric')) % div == rem
+        if op in ('>', 'Above'):
+            return (raw() > self.compare_val).to_numpy()
+        if op in ('<', 'Below'):
+            return (raw() < self.compare_val).to_numpy()
+        if op == '>=':
+            return (raw() >= self.compare_val).to_numpy()
+        if op == '<=':
+            return (raw() <= self.compare_val).to_numpy()
+        if op == 'Is Empty':
+            col = raw()
+            return (col.isna() | (col == '')).to_numpy()
+        if op == 'Is Not Empty':
+            col = raw()
+            return (col.notna() & (col != '')).to_numpy()
+        return None
+
+class FilterPlan:
+    """
+    Compiled condition list. Conditions still fold left to right as before,
+    but each run of AND / AND NOT terms is a conjunction: it is reordered by
+    operator rank and evaluated only on the rows still selected, stopping
+    as soon as none are left. OR terms only evaluate the rows not yet
+    selected.
+    """
+    def __init__(self, steps):
+        self.steps = steps  # [(logic, predicate, [(predicate, negated), ...])]
+
+    def __len__(self):
+        return sum(1 + len(ands) for _, _, ands in self.steps)
+
+    def mask(self, generator):
+        """Bool ndarray over generator.df rows."""
+        acc = None
+        for logic, pred, ands in self.steps:
+            if acc is None:
+                acc = pred.evaluate(generator)
+            elif logic in ('OR', 'OR NOT'):
+                pos = np.flatnonzero(~acc)
+                if len(pos):
+                    hit = pred.evaluate(generator, pos)
+                    acc[pos] = ~hit if logic == 'OR NOT' else hit
+            else:  # XOR
+                acc ^= pred.evaluate(generator)
+            for and_pred, negated in ands:
+                pos = np.flatnonzero(acc)
+                if not len(pos):
+                    break
+                hit = and_pred.evaluate(generator, pos)
+                acc[pos] = ~hit if negated else hit
+        return acc if acc is not None else np.ones(generator.row_count, dtype=bool)
+
+def _predicate(df, field, op, val):
+    # Text columns are object dtype, or 'str' under newer pandas
+    dtype = df[field].dtype
+    is_text = dtype == 'object' or pd.api.types.is_string_dtype(dtype)
+    return FilterPredicate(field, op, val, is_text, pd.api.types.is_datetime64_any_dtype(dtype))
+
+def compile_filters(conditions, df):
+    """
+    Turns the filter panel's conditions into a FilterPlan for df's columns.
+    Conditions on unknown fields or with empty values are dropped, and the
+    first remaining one starts the chain, as apply_filters always did.
+    """
+    steps = []
+    for cond in conditions or []:
+        field, op, val = cond['field'], cond['operator'], cond['value']
+        if field not in df.columns:
+            continue
+        if not val and op not in ['Is Empty', 'Is Not Empty']:
+            continue
+        pred = _predicate(df, field, op, val)
+        logic = cond.get('logic', 'AND')
+        if logic not in CONDITION_LOGICS or logic == 'START':
+            logic = 'AND'  # Default AND
+        if not steps:
+            steps.append(('START', pred, []))
+        elif logic in _CONJUNCTIVE:
+            steps[-1][2].append((pred, logic == 'AND NOT'))
+        else:
+            steps.append((logic, pred, []))
+    for _, _, ands in steps:
+        ands.sort(key=lambda item: item[0].rank(item[1]))
+    return FilterPlan(steps)
 
 class ReportGenerator:
-    def __init__(self, inventory_df):
-        self.df = inventory_df.copy()
+    def __init__(self, inventory_df, generation=None, column_cache=None):
+        """
+        generation: InventoryManager.generation of inventory_df, if known.
+        Derived columns are then shared with later generators for the same
+        data; otherwise they live only as long as this generator.
+        """
+        self.df = inventory_df  # Read-only: every result below is a new frame
+        self.row_count = len(inventory_df)
+        if generation is not None:
+            self._cache = column_cache or _shared_column_cache
+            self._cache_key = (generation, id(inventory_df), self.row_count)
+        else:
+            self._cache = column_cache or ColumnCache()
+            self._cache_key = (None, id(inventory_df), self.row_count)
+
+    def derived(self, field, kind):
+        """
+        Cached form of df[field]: 'lower' is the lower-cased str column
+        dictionary-encoded as (codes, uniques), so text predicates run once
+        per distinct value; 'numeric' is the coerced column with NaN -> 0.
+        """
+        def compute():
+            col = self.df[field]
+            if kind == 'lower':
+                codes, uniques = pd.factorize(col.astype(str).str.lower())
+                return codes, np.asarray(uniques, dtype=object)
+            return pd.to_numeric(col, errors='coerce').fillna(0).to_numpy()
+        return self._cache.get(self._cache_key + (field, kind), compute)
+
+    def compile(self, conditions):
+        return compile_filters(conditions, self.df)
 
     def apply_filters(self, conditions):
         """
@@ -25,118 +235,15 @@ class ReportGenerator:
             return pd.DataFrame()
             
         if not conditions:
-            return self.df
+            return self.df.copy()
 
-        # Initialize the master mask
-        # If the first condition is valid, we'll set it.
-        # Otherwise, we start with all True.
-        final_mask = pd.Series([True] * len(self.df), index=self.df.index)
-        first_valid = True
-
-        for i, cond in enumerate(conditions):
-            logic = cond.get('logic', 'AND')
-            if i == 0: logic = 'START' # Force start logic for first item
-            
-            field = cond['field']
-            op = cond['operator']
-            val = cond['value']
-
-            if field not in self.df.columns:
-                continue
-            
-            # Handle empty values
-            if not val and op not in ['Is Empty', 'Is Not Empty']:
-                continue
-
-            try:
-                current_mask = self._build_mask(field, op, val)
-                
-                if logic == 'START' or first_valid:
-                    final_mask = current_mask
-                    first_valid = False
-                elif logic == 'AND':
-                    final_mask = final_mask & current_mask
-                elif logic == 'OR':
-                    final_mask = final_mask | current_mask
-                elif logic == 'AND NOT':
-                    final_mask = final_mask & (~current_mask)
-                elif logic == 'OR NOT':
-                    final_mask = final_mask | (~current_mask)
-                elif logic == 'XOR':
-                    final_mask = final_mask ^ current_mask
-                else:
-                    # Default AND
-                    final_mask = final_mask & current_mask
-
-            except Exception as e:
-                print(f"Error applying filter {cond}: {e}")
-                # Don't break the whole chain?
-                pass
-
-        return self.df[final_mask]
+        plan = conditions if isinstance(conditions, FilterPlan) else self.compile(conditions)
+        return self.df[plan.mask(self)]
 
     def _build_mask(self, field, op, val):
         """Generates a boolean Series mask for a single condition."""
-        # Helper for type conversion
-        df = self.df
-        col_type = df[field].dtype
-        mask = pd.Series([False] * len(df), index=df.index)
-        
-        try:
-            if op == 'Equals':
-                if col_type == 'object':
-                     mask = df[field].astype(str).str.lower() == str(val).lower()
-                else:
-                    mask = df[field] == val
-            
-            elif op == 'Contains':
-                mask = df[field].astype(str).str.contains(val, case=False, na=False)
-            
-            elif op == 'Not Equals':
-                if col_type == 'object':
-                     mask = df[field].astype(str).str.lower() != str(val).lower()
-                else:
-                    mask = df[field] != val
-
-            elif op == 'Modulo':
-                if "=" in str(val):
-                    div, rem = map(int, str(val).split('='))
-                    nums = pd.to_numeric(df[field], errors='coerce').fillna(0)
-                    mask = (nums % div == rem)
-
-            elif op in ['>', '<', '>=', '<=', 'Above', 'Below']:
-                # Handle Date/Numeric
-                is_date = pd.api.types.is_datetime64_any_dtype(df[field])
-                compare_val = val
-                
-                if is_date:
-                    try:
-                        compare_val = pd.to_datetime(val)
-                    except: pass
-                else:
-                    try:
-                        compare_val = float(val)
-                    except: pass
-                
-                if op == '>' or op == 'Above':
-                    mask = df[field] > compare_val
-                elif op == '<' or op == 'Below':
-                    mask = df[field] < compare_val
-                elif op == '>=':
-                    mask = df[field] >= compare_val
-                elif op == '<=':
-                    mask = df[field] <= compare_val
-            
-            elif op == 'Is Empty':
-                 mask = df[field].isna() | (df[field] == '')
-                 
-            elif op == 'Is Not Empty':
-                 mask = df[field].notna() & (df[field] != '')
-        except Exception as e:
-            print(f"Mask build error: {e}")
-            return mask # False mask on error
-            
-        return mask
+        pred = _predicate(self.df, field, op, val)
+        return pd.Series(pred.evaluate(self), index=self.df.index)
 
     def apply_limit(self, df, limit):
         try:
@@ -160,11 +267,14 @@ class ReportGenerator:
             return pd.DataFrame()
 
 
-    def export(self, data, columns, format_type, filepath, include_serial=False):
+    def export(self, data, columns, format_type, filepath, include_serial=False, progress=None, cancel=None):
         """
         data: Filtered DataFrame
         columns: List of columns to include
-        format_type: 'excel', 'pdf', 'word'
+        format_type: 'excel', 'csv', 'parquet', 'pdf', 'word'
+        progress: optional progress(done_rows, total_rows); cancel: optional
+        callable, polled between chunks, that returns True to abort.
+        Every format is written in row chunks by core.exporters.
         """
         if data.empty:
             return False, "No data to export"
@@ -172,78 +282,20 @@ class ReportGenerator:
         # Select only requested columns
         # Respect user order (columns list order)
         valid_cols = [c for c in columns if c in data.columns]
-        export_data = data[valid_cols].copy()
+        export_data = data[valid_cols]
 
         if include_serial:
+            export_data = export_data.copy(deep=False)
             export_data.insert(0, 'S.No', range(1, 1 + len(export_data)))
 
+        if format_type not in EXPORTERS:
+            return False, f"Unknown export format: {format_type}"
+
         try:
-            if format_type == 'excel':
-                export_data.to_excel(filepath, index=False)
-            
-            elif format_type == 'pdf':
-                self._export_pdf(export_data, filepath)
-                
-            elif format_type == 'word':
-                if Document is None:
-                    return False, "python-docx library not installed."
-                self._export_word(export_data, filepath)
-            
+            EXPORTERS[format_type](export_data, filepath, progress=progress, cancel=cancel)
             return True, f"Successfully exported to {filepath}"
-            
+
+        except ExportCancelled:
+            return False, "Export cancelled"
         except Exception as e:
             return False, str(e)
-
-    def _export_pdf(self, df, filepath):
-        doc = SimpleDocTemplate(filepath, pagesize=landscape(A4))
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # Title
-        title = Paragraph(f"Stock Report - {datetime.now().strftime('%Y-%m-%d')}", styles['Title'])
-        elements.append(title)
-        elements.append(Spacer(1, 20))
-
-        # Data conversion
-        # Headers
-        data = [df.columns.tolist()]
-        # Rows
-        for index, row in df.iterrows():
-            data.append([str(x) for x in row.tolist()])
-
-        # Table
-        t = Table(data)
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),  # Small font to fit many cols
-        ]))
-        
-        elements.append(t)
-        doc.build(elements)
-
-    def _export_word(self, df, filepath):
-        doc = Document()
-        doc.add_heading(f"Stock Report - {datetime.now().strftime('%Y-%m-%d')}", 0)
-
-        # Add table
-        table = doc.add_table(rows=1, cols=len(df.columns))
-        table.style = 'Table Grid'
-
-        # Header
-        hdr_cells = table.rows[0].cells
-        for i, col_name in enumerate(df.columns):
-            hdr_cells[i].text = str(col_name)
-
-        # Rows
-        for index, row in df.iterrows():
-            row_cells = table.add_row().cells
-            for i, val in enumerate(row):
-                row_cells[i].text = str(val)
-
-        doc.save(filepath)
\ No newline at end of file
@@ -0,0 +1,208 @@
+import sqlite3
+import threading
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from .config import CONFIG_DIR
+from .analytics import to_datetime64, SOLD_STATUSES
+
+SALES_ARCHIVE_DB_NAME = "sales_archive.db"
+SALES_ARCHIVE_FILE = CONFIG_DIR / SALES_ARCHIVE_DB_NAME
+
+# Cube layout. Every dimension is a string; missing values are "".
+# 'day' is the sold date as 'YYYY-MM-DD' ("" for unsold items).
+CUBE_DIMS = ("day", "brand", "model", "supplier", "buyer", "status")
+CUBE_MEASURES = ("count", "revenue", "cost")
+_FACT_COLUMNS = CUBE_DIMS + ("revenue", "cost")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sales (
+    uid TEXT PRIMARY KEY,
+    day TEXT, brand TEXT, model TEXT, supplier TEXT, buyer TEXT, status TEXT,
+    revenue REAL, cost REAL
+);
+"""
+
+def _text(df, col):
+    if col not in df.columns:
+        return pd.Series("", index=df.index)
+    return df[col].astype(str).str.strip().where(df[col].notna(), "")
+
+def _number(df, col):
+    if col not in df.columns:
+        return pd.Series(0.0, index=df.index)
+    return pd.to_numeric(df[col], errors='coerce').fillna(0.0)
+
+def fact_frame(df):
+    """One row per inventory row with the cube dimensions, revenue and cost, indexed by unique_id."""
+    model = _text(df, 'model')
+    if 'date_sold' in df.columns:
+        day = to_datetime64(df['date_sold']).dt.strftime('%Y-%m-%d').fillna("")
+    else:
+        day = pd.Series("", index=df.index)
+    facts = pd.DataFrame({
+        'day': day,
+        'brand': model.str.split(n=1).str[0].str.upper().fillna(""),
+        'model': model,
+        'supplier': _text(df, 'supplier'),
+        'buyer': _text(df, 'buyer'),
+        'status': _text(df, 'status').str.upper(),
+        'revenue': _number(df, 'price'),
+        'cost': _number(df, 'price_original'),
+    }, index=df.index)
+    facts.index = _text(df, 'unique_id').to_numpy() if 'unique_id' in df.columns else facts.index.astype(str)
+    facts.index.name = 'uid'
+    return facts
+
+class SalesArchive:
+    """
+    SQLite copy of every sold item's cube facts, keyed by unique_id, so sales
+    still count after the rows are deleted from the supplier sheets. Items
+    that come back as unsold are dropped from the archive.
+    """
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else SALES_ARCHIVE_FILE
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._frame = pd.read_sql_query("SELECT * FROM sales", self._conn, index_col='uid')
+        self._frame = self._frame.reindex(columns=list(_FACT_COLUMNS))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        return len(self._frame)
+
+    def sync(self, facts):
+        """
+        Records the sold rows of `facts` (see fact_frame), forgets archived
+        items that are live again but unsold, and returns the archived facts
+        for items no longer in `facts`. Only changed rows are written.
+        """
+        live = facts[facts.index != ""]
+        sold = live[live['status'].isin(SOLD_STATUSES)]
+        sold = sold[~sold.index.duplicated(keep='last')][list(_FACT_COLUMNS)]
+        with self._lock:
+            old = self._frame.reindex(sold.index)
+            changed = sold[(old.ne(sold)).any(axis=1)]
+            unsold = self._frame.index.intersection(live.index.difference(sold.index))
+            if len(changed) or len(unsold):
+                with self._conn:
+                    if len(unsold):
+                        self._conn.executemany("DELETE FROM sales WHERE uid = ?", [(u,) for u in unsold])
+                    if len(changed):
+                        self._conn.executemany(
+                            f"INSERT OR REPLACE INTO sales (uid, {', '.join(_FACT_COLUMNS)}) "
+                            f"VALUES ({', '.join('?' * (len(_FACT_COLUMNS) + 1))})",
+                            list(changed.itertuples(name=None)))
+                frame = self._frame.drop(index=unsold)
+                frame = pd.concat([frame[~frame.index.isin(changed.index)], changed]) if len(frame) else changed
+                self._frame = frame
+            return self._frame[~self._frame.index.isin(live.index)]
+
+class SalesCube:
+    """
+    Counts, revenue and cost materialized over day x brand x model x supplier
+    x buyer x status. Each dimension is factorized once; the cube keeps one
+    row of measures per non-empty cell, so rollups and slices only touch
+    the cells, never the inventory rows.
+    """
+    def __init__(self, labels, codes, measures):
+        self.labels = labels        # dim -> ndarray of labels (code -> label)
+        self.codes = codes          # (cells, dims) int64
+        self.measures = measures    # (cells, measures) float64
+
+    @classmethod
+    def build(cls, df, archive=None):
+        """Cube over the inventory rows, plus archived sales of rows that are gone when archive is given."""
+        facts = fact_frame(df) if not df.empty else pd.DataFrame(columns=list(_FACT_COLUMNS))
+        if archive is not None:
+            gone = archive.sync(facts)
+            if len(gone):
+                facts = pd.concat([facts, gone]) if len(facts) else gone
+
+        labels, columns = {}, []
+        for dim in CUBE_DIMS:
+            codes, uniques = pd.factorize(facts[dim].astype(str), sort=True)
+            labels[dim] = np.asarray(uniques, dtype=object)
+            columns.append(codes.astype(np.int64))
+        if not len(facts):
+            return cls(labels, np.empty((0, len(CUBE_DIMS)), dtype=np.int64),
+                       np.empty((0, len(CUBE_MEASURES))))
+
+        row_codes = np.column_stack(columns)
+        cells, inverse = _group(row_codes, [len(labels[d]) for d in CUBE_DIMS])
+        measures = np.column_stack([
+            np.bincount(inverse, minlength=len(cells)).astype(float),
+            np.bincount(inverse, weights=facts['revenue'].to_numpy(float), minlength=len(cells)),
+            np.bincount(inverse, weights=facts['cost'].to_numpy(float), minlength=len(cells)),
+        ])
+        return cls(labels, cells, measures)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _mask(self, where=None, days=None):
+        mask = np.ones(len(self.codes), dtype=bool)
+        for dim, values in (where or {}).items():
+            if isinstance(values, str) or not hasattr(values, '__iter__'):
+                values = [values]
+            allowed = np.isin(self.labels[dim], [str(v) for v in values])
+            mask &= allowed[self.codes[:, CUBE_DIMS.index(dim)]]
+        if days:
+            start, end = (str(d)[:10] if d else None for d in days)
+            day_labels = self.labels['day']
+            allowed = day_labels != ""
+            if start:
+                allowed &= day_labels >= start
+            if end:
+                allowed &= day_labels <= end
+            mask &= allowed[self.codes[:, CUBE_DIMS.index('day')]]
+        return mask
+
+    def total(self, where=None, days=None):
+        """{'count', 'revenue', 'cost', 'profit'} over the cells matching the slice."""
+        sums = self.measures[self._mask(where, days)].sum(axis=0)
+        count, revenue, cost = (float(v) for v in sums) if len(sums) else (0.0, 0.0, 0.0)
+        return {"count": int(count), "revenue": revenue, "cost": cost, "profit": revenue - cost}
+
+    def rollup(self, by, where=None, days=None, sort="revenue", limit=None):
+        """
+        Measures grouped by one or more dimensions over a slice.
+        where: {dim: value or [values]}; days: (start, end) 'YYYY-MM-DD',
+        inclusive, either may be None. Returns a DataFrame indexed by `by`
+        with count, revenue, cost and profit, largest `sort` first.
+        """
+        by = (by,) if isinstance(by, str) else tuple(by)
+        mask = self._mask(where, days)
+        cols = [CUBE_DIMS.index(d) for d in by]
+        codes, measures = self.codes[mask][:, cols], self.measures[mask]
+        cells, inverse = _group(codes, [len(self.labels[d]) for d in by])
+        sums = np.column_stack([np.bincount(inverse, weights=measures[:, i], minlength=len(cells))
+                                for i in range(len(CUBE_MEASURES))]) if len(cells) \
+            else np.empty((0, len(CUBE_MEASURES)))
+        keys = [self.labels[d][cells[:, i]] for i, d in enumerate(by)]
+        index = pd.MultiIndex.from_arrays(keys, names=by) if len(by) > 1 else pd.Index(keys[0], name=by[0])
+        result = pd.DataFrame(sums, index=index, columns=list(CUBE_MEASURES))
+        result['count'] = result['count'].astype(int)
+        result['profit'] = result['revenue'] - result['cost']
+        if sort:
+            result = result.sort_values(sort, ascending=False, kind='stable')
+        return result.head(limit) if limit else result
+
+def _group(codes, sizes):
+    """Distinct rows of an int code matrix and each row's group number."""
+    if not len(codes):
+        return np.empty((0, codes.shape[1]), dtype=np.int64), np.empty(0, dtype=np.int64)
+    if np.prod([float(max(s, 1)) for s in sizes]) < 2 ** 62:
+        # Mixed-radix key: one 1-D unique instead of a row-wise one
+        keys = np.ravel_multi_index(codes.T, [max(s, 1) for s in sizes])
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        return np.column_stack(np.unravel_index(uniq, [max(s, 1) for s in sizes])), inverse.ravel()
+    uniq, inverse = np.unique(codes, axis=0, return_inverse=True)
+    return uniq, inverse.ravel()
@@ -3,20 +3,107 @@ import re
 import json
 import base64
 import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import unpad
 from bs4 import BeautifulSoup
+from .tac_cache import TACCache
+
+DEFAULT_FETCH_WORKERS = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class HostRateLimiter:
+    """
+    Enforces a minimum interval between requests to the same host and
+    backs off exponentially after throttling or connection failures.
+    """
+    def __init__(self, min_interval=0.25, max_backoff=30.0):
+        self.min_interval = min_interval
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._next_slot = {}  # host -> earliest time for the next request
+        self._backoff = {}    # host -> current penalty in seconds
+
+    def wait(self, host):
+        """Blocks until the caller may send a request to host."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval + self._backoff.get(host, 0.0)
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def penalize(self, host, retry_after=None):
+        with self._lock:
+            current = self._backoff.get(host, 0.0)
+            penalty = min(self.max_backoff, max(current * 2, self.min_interval * 2))
+            if retry_after:
+                penalty = min(self.max_backoff, max(penalty, retry_after))
+            self._backoff[host] = penalty
+
+    def reset(self, host):
+        with self._lock:
+            self._backoff.pop(host, None)
+
+    def get_backoff(self, host):
+        return self._backoff.get(host, 0.0)
 
 class PhoneScraper:
-    def __init__(self):
+    def __init__(self, tac_cache=None, rate_limiter=None, max_retries=3):
+        self.tac_cache = tac_cache if tac_cache is not None else TACCache()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else HostRateLimiter()
+        self.max_retries = max_retries
         self.imei_api_url = "https://alpha.imeicheck.com/api/free_with_key/modelBrandName"
         self.imei_api_key = os.environ.get("MSM_IMEI_API_KEY", "FB6E-37C8-7D0A-ED31-B48A-12QK")
         self.gsm_search_url = "https://m.gsmarena.com/resl.php3"
+        
+        # Shared keep-alive session (connection reuse across lookups)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=DEFAULT_FETCH_WORKERS)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
-    def fetch_details(self, imei):
+    def _http_get(self, url, **kwargs):
+        """GET through the shared session with per-host rate limit and backoff."""
+        host = urlparse(url).netloc
+        kwargs.setdefault("timeout", 10)
+        for attempt in range(self.max_retries):
+            self.rate_limiter.wait(host)
+            try:
+                resp = self.session.get(url, **kwargs)
+            except requests.RequestException:
+                self.rate_limiter.penalize(host)
+                if attempt == self.max_retries - 1:
+                    raise
+                continue
+                
+            if resp.status_code in RETRY_STATUSES and attempt < self.max_retries - 1:
+                retry_after = resp.headers.get("Retry-After", "")
+                self.rate_limiter.penalize(host, float(retry_after) if retry_after.isdigit() else None)
+                continue
+                
+            self.rate_limiter.reset(host)
+            return resp
+        return resp
+
+    def close(self):
+        self.session.close()
+
+    def fetch_details(self, imei, use_cache=True):
         """
         Full pipeline: IMEI -> Model Code -> GSMArena Search -> Decrypt -> Phone Name
+        Known TACs (first 8 digits) are answered from the local cache.
         """
+        if use_cache:
+            cached = self.tac_cache.get(imei)
+            if cached:
+                return cached
+
         try:
             # 1. Get Model Code from IMEI API
             model_code = self._get_model_code_from_imei(imei)
@@ -24,7 +111,9 @@ class PhoneScraper:
                 return {"error": "Could not fetch Model Code from IMEI"}
 
             # 2. Search GSMArena
-            return self._search_gsmarena(model_code)
+            result = self._search_gsmarena(model_code)
+            self.tac_cache.put(imei, result)
+            return result
 
         except Exception as e:
             return {"error": str(e)}
@@ -36,7 +125,7 @@ class PhoneScraper:
             "format": "json"
         }
         try:
-            resp = requests.get(self.imei_api_url, params=params, timeout=10)
+            resp = self._http_get(self.imei_api_url, params=params)
             data = resp.json()
             if data.get("status") == "succes": # Note typo in API "succes"
                 # Prefer "model" (e.g. 24090RA29I), fallback to "name"
@@ -52,7 +141,10 @@ class PhoneScraper:
             headers = {
                 "User-Agent": "Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Mobile Safari/537.36"
             }
-            resp = requests.get(self.gsm_search_url, params=params, headers=headers, timeout=10)
+            resp = self._http_get(self.gsm_search_url, params=params, headers=headers)
+            if not resp.ok:
+                # Still 429/5xx after retries: an error, not a "no match" worth caching
+                return {"error": f"GSMArena search failed (HTTP {resp.status_code})"}
             html = resp.text
             
             # 3. Extract Keys and Data
@@ -104,6 +196,94 @@ class PhoneScraper:
         plaintext = unpad(cipher.decrypt(ciphertext), AES.block_size)
         return plaintext.decode('utf-8')
 
+class FetchScheduler:
+    """
+    Bounded worker pool for IMEI lookups.
+    Duplicate IMEIs, and IMEIs sharing a TAC with a lookup already in flight,
+    are coalesced onto one network request. Results are delivered as Futures.
+    """
+    def __init__(self, scraper=None, max_workers=DEFAULT_FETCH_WORKERS):
+        self.scraper = scraper if scraper is not None else PhoneScraper()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="IMEIFetch")
+        self._lock = threading.Lock()
+        self._inflight = {}  # imei or ("TAC", tac) -> Future
+
+    def submit(self, imei):
+        """Returns a Future resolving to the fetch_details() result dict."""
+        imei = str(imei).strip()
+        with self._lock:
+            future = self._inflight.get(imei)
+            if future is not None:
+                return future
+                
+            cached = self.scraper.tac_cache.get(imei)
+            if cached:
+                future = Future()
+                future.set_result(cached)
+                return future
+
+            tac = self.scraper.tac_cache.tac_for(imei)
+            tac_future = self._inflight.get(("TAC", tac)) if tac else None
+            keys = [imei]
+            if tac_future is not None:
+                future = Future()
+                tac_future.add_done_callback(lambda _f: self._after_tac(imei, future))
+            else:
+                future = self._executor.submit(self.scraper.fetch_details, imei, False)
+                if tac:
+                    keys.append(("TAC", tac))
+                    
+            for key in keys:
+                self._inflight[key] = future
+        future.add_done_callback(lambda _f: self._forget(keys, future))
+        return future
+
+    def subscribe(self, imei, callback):
+        """
+        Submits imei and calls callback(imei, result_dict) when done.
+        Runs on a worker thread; GUI callers should marshal with after().
+        """
+        future = self.submit(imei)
+        future.add_done_callback(lambda f: callback(imei, self.result_of(f)))
+        return future
+
+    @staticmethod
+    def result_of(future):
+        """Result dict of a finished future, mapping failures to {'error': ...}."""
+        if future.cancelled():
+            return {"error": "Cancelled"}
+        exc = future.exception()
+        if exc is not None:
+            return {"error": str(exc)}
+        return future.result()
+
+    def _after_tac(self, imei, future):
+        # The TAC lookup has finished; answer from cache or fetch on our own
+        cached = self.scraper.tac_cache.get(imei)
+        if cached:
+            future.set_result(cached)
+            return
+        try:
+            inner = self._executor.submit(self.scraper.fetch_details, imei, False)
+        except RuntimeError as e:  # Executor shut down
+            future.set_result({"error": str(e)})
+            return
+        inner.add_done_callback(lambda f: future.set_result(self.result_of(f)))
+
+    def _forget(self, keys, future):
+        with self._lock:
+            for key in keys:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def pending_count(self):
+        with self._lock:
+            return len({id(f) for f in self._inflight.values()})
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self.scraper.close()
+
 if __name__ == "__main__":
     # Test
     s = PhoneScraper()
@@ -0,0 +1,154 @@
+import json
+import re
+import time
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from .utils import SafeJsonWriter
+from .config import CONFIG_DIR
+
+TAC_CACHE_FILE = CONFIG_DIR / "tac_cache.json"
+
+# First 8 digits of an IMEI (Type Allocation Code) identify the model
+TAC_LENGTH = 8
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_TTL_DAYS = 90
+
+# Scraper placeholders, not decoded model names: transient failures or a
+# page layout the scraper could not read, so they are never cached
+_UNCACHEABLE_SUFFIXES = ("(Scrape Error)", "(No GSMArena match)", "(Unknown)")
+
+class TACCache:
+    """
+    Persistent TAC -> (model_code, name) cache with LRU bound and TTL.
+    Entries are stored oldest-first so the JSON file preserves LRU order.
+    """
+    def __init__(self, file_path=None, max_entries=DEFAULT_MAX_ENTRIES, ttl_days=DEFAULT_TTL_DAYS):
+        self.file_path = Path(file_path) if file_path else TAC_CACHE_FILE
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_days * 86400
+        self._lock = threading.Lock()
+        self.entries = self._load()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        if not self.file_path.exists():
+            return OrderedDict()
+        try:
+            with open(self.file_path, 'r') as f:
+                data = json.load(f)
+            return OrderedDict(data.get("entries", []))
+        except Exception as e:
+            print(f"TAC cache load error: {e}")
+            return OrderedDict()
+
+    def save(self):
+        with self._lock:
+            self._save_unlocked()
+
+    def _save_unlocked(self):
+        SafeJsonWriter.write(self.file_path, {"entries": list(self.entries.items())})
+
+    @staticmethod
+    def tac_for(imei):
+        """Returns the TAC for a numeric IMEI, or None if it doesn't look like one."""
+        digits = re.sub(r'[\s-]', '', str(imei))
+        if not digits.isdigit() or not 14 <= len(digits) <= 16:
+            return None
+        return digits[:TAC_LENGTH]
+
+    def get(self, imei):
+        """
+        Returns {"model_code", "name", "cached": True} for a known TAC,
+        or None on miss/expiry.
+        """
+        tac = self.tac_for(imei)
+        with self._lock:
+            entry = self.entries.get(tac) if tac else None
+            if entry and self.ttl_seconds and time.time() - entry.get("ts", 0) > self.ttl_seconds:
+                del self.entries[tac]
+                entry = None
+            if not entry:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(tac)
+            self.hits += 1
+            return {"model_code": entry.get("model_code", ""), "name": entry["name"], "cached": True}
+
+    def put(self, imei, result, persist=True):
+        """Stores a successful scraper result for the IMEI's TAC."""
+        tac = self.tac_for(imei)
+        name = (result or {}).get("name")
+        if not tac or not name or (result or {}).get("error"):
+            return False
+        if name.endswith(_UNCACHEABLE_SUFFIXES):
+            return False
+
+        with self._lock:
+            self.entries[tac] = {
+                "model_code": result.get("model_code", ""),
+                "name": name,
+                "ts": time.time()
+            }
+            self.entries.move_to_end(tac)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            if persist:
+                self._save_unlocked()
+        return True
+
+    def seed_from_inventory(self, df):
+        """
+        Adds TACs from existing inventory IMEI/model pairs without overwriting
+        fetched entries. The most common model per TAC wins.
+        Returns the number of TACs added.
+        """
+        if df is None or df.empty or 'imei' not in df.columns or 'model' not in df.columns:
+            return 0
+
+        pairs = df[['imei', 'model']].copy()
+        pairs['imei'] = pairs['imei'].astype(str).str.split('/')
+        pairs = pairs.explode('imei')
+        pairs['imei'] = pairs['imei'].str.strip()
+        pairs = pairs[pairs['imei'].str.fullmatch(r'\d{14,16}', na=False)]
+        pairs['model'] = pairs['model'].astype(str).str.strip()
+        pairs = pairs[(pairs['model'] != '') & (pairs['model'] != 'Unknown Model')]
+        if pairs.empty:
+            return 0
+
+        pairs['tac'] = pairs['imei'].str[:TAC_LENGTH]
+        counts = pairs.groupby(['tac', 'model']).size().reset_index(name='n')
+        best = counts.sort_values('n', ascending=False).drop_duplicates('tac')
+
+        added = 0
+        now = time.time()
+        with self._lock:
+            for tac, model in zip(best['tac'], best['model']):
+                if tac in self.entries:
+                    continue
+                # Seeded entries are least recently used until first hit
+                self.entries[tac] = {"model_code": "", "name": model, "ts": now}
+                self.entries.move_to_end(tac, last=False)
+                added += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            if added:
+                self._save_unlocked()
+        return added
+
+    def get_stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0
+        }
+
+    def clear(self):
+        with self._lock:
+            self.entries = OrderedDict()
+            self.hits = 0
+            self.misses = 0
+            self._save_unlocked()
@@ -1,23 +1,37 @@
+import atexit
 import json
 import os
-import shutil
-import datetime
+import threading
+import weakref
 from pathlib import Path
 
 class SafeJsonWriter:
     @staticmethod
-    def write(file_path, data):
+    def write(file_path, data, indent=4):
         """
         Writes JSON data to a file atomically.
         1. Write to .tmp file
         2. Rename .tmp to actual file
         """
+        try:
+            if indent is None:
+                text = json.dumps(data, separators=(',', ':'))
+            else:
+                text = json.dumps(data, indent=indent)
+        except Exception as e:
+            print(f"SafeWrite Error: {e}")
+            return False
+        return SafeJsonWriter.write_text(file_path, text)
+
+    @staticmethod
+    def write_text(file_path, text):
+        """Atomically replaces file_path with already-serialized JSON text."""
         path = Path(file_path)
         tmp_path = path.with_suffix('.tmp')
         
         try:
             with open(tmp_path, 'w') as f:
-                json.dump(data, f, indent=4)
+                f.write(text)
                 f.flush()
                 os.fsync(f.fileno()) # Ensure write to disk
                 
@@ -34,70 +48,109 @@ class SafeJsonWriter:
                     pass
             return False
 
-def rotate_backups(original_filename, backup_dir, max_backups=5):
-    """
-    Keeps only the last N backups for a specific file.
-    """
-    try:
-        backup_dir = Path(backup_dir)
-        # Filter files that start with the original filename stem
-        # Format is: {stem}_{ts}{suffix}.bak
-        stem = Path(original_filename).stem
-        suffix = Path(original_filename).suffix
-        
-        candidates = []
-        for p in backup_dir.glob(f"*{suffix}.bak"):
-            if p.name.startswith(stem + "_"):
-                candidates.append(p)
-        
-        # Sort by modification time (Newest first)
-        candidates.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-        
-        # Remove old ones
-        if len(candidates) > max_backups:
-            for old_file in candidates[max_backups:]:
-                try:
-                    old_file.unlink()
-                    print(f"Cleanup: Removed old backup {old_file.name}")
-                except Exception as del_err:
-                    print(f"Cleanup Error: {del_err}")
-                    
-    except Exception as e:
-        print(f"Rotation Error: {e}")
-
-def backup_excel_file(file_path):
+DEFAULT_COMMIT_INTERVAL = 1.0  # Seconds a dirty store waits before committing
+
+class DurableJsonStore:
     """
-    Creates a timestamped backup of an Excel file.
-    Returns the backup path if successful, None otherwise.
+    Group-commit layer over SafeJsonWriter for a JSON file owned by another
+    object. The owner mutates its data and calls mark_dirty(); the latest
+    snapshot is written compactly (atomic replace + fsync) at most once per
+    commit interval on a timer thread. flush()/close() commit immediately.
+
+    If the owner guards its data with a lock, pass it as `lock` so the
+    snapshot is serialized under it, and never call flush() while holding it.
     """
-    path = Path(file_path)
-    if not path.exists():
-        return None
-        
-    # Store backups in the app data directory (matches config.py APP_DIR)
-    app_dir = Path.home() / "Documents" / "MobileShopManager"
-    backup_dir = app_dir / "backups"
-    try:
-        backup_dir.mkdir(parents=True, exist_ok=True)
-    except Exception as e:
-        print(f"Failed to create backup dir: {e}")
-        return None
-        
-    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    # Clean filename to avoid issues
-    safe_name = f"{path.stem}_{ts}{path.suffix}.bak"
-    backup_path = backup_dir / safe_name
-    
-    try:
-        shutil.copy2(path, backup_path)
-        
-        # Trigger Rotation
-        rotate_backups(path.name, backup_dir, max_backups=5)
-        
-        return str(backup_path)
-    except Exception as e:
-        print(f"Backup Error: {e}")
-        return None
+    _open_stores = weakref.WeakSet()
+    _registry_lock = threading.Lock()
+
+    def __init__(self, path, snapshot, interval=DEFAULT_COMMIT_INTERVAL, lock=None):
+        self.path = Path(path)
+        self.snapshot = snapshot  # () -> JSON-serializable data
+        self.interval = interval
+        self.lock = lock
+        self.commits = 0
+        self._dirty = False
+        self._timer = None
+        self._state_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        with DurableJsonStore._registry_lock:
+            DurableJsonStore._open_stores.add(self)
+
+    @property
+    def dirty(self):
+        return self._dirty
+
+    def mark_dirty(self):
+        """Schedules a commit. Cheap; safe to call while holding the owner's lock."""
+        with self._state_lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.interval, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _on_timer(self):
+        with self._state_lock:
+            self._timer = None
+        self.flush()
+
+    def flush(self):
+        """Commits pending changes now. Returns False if the write failed."""
+        with self._write_lock:
+            with self._state_lock:
+                if not self._dirty:
+                    return True
+                self._dirty = False
+                timer, self._timer = self._timer, None
+            if timer:
+                timer.cancel()
+            try:
+                if self.lock is not None:
+                    with self.lock:
+                        text = json.dumps(self.snapshot(), separators=(',', ':'))
+                else:
+                    text = json.dumps(self.snapshot(), separators=(',', ':'))
+                ok = SafeJsonWriter.write_text(self.path, text)
+            except Exception as e:
+                print(f"Store commit error ({self.path.name}): {e}")
+                ok = False
+            if ok:
+                self.commits += 1
+            else:
+                with self._state_lock:
+                    self._dirty = True  # Retried on the next change, flush() or close()
+        return ok
+
+    def close(self):
+        """Final commit; the store stays usable but is no longer tracked."""
+        ok = self.flush()
+        with DurableJsonStore._registry_lock:
+            DurableJsonStore._open_stores.discard(self)
+        return ok
+
+    @classmethod
+    def _stores(cls, path=None):
+        with cls._registry_lock:
+            stores = list(cls._open_stores)
+        if path is not None:
+            path = Path(path)
+            stores = [s for s in stores if s.path == path]
+        return stores
+
+    @classmethod
+    def flush_path(cls, path):
+        """Commits any in-process pending writes to path (call before re-reading it)."""
+        for store in cls._stores(path):
+            store.flush()
+
+    @classmethod
+    def flush_all(cls):
+        """Final commit of every tracked store (at exit). Each is closed, so a
+        store whose file was since removed is not rewritten later."""
+        for store in cls._stores():
+            store.close()
+
+atexit.register(DurableJsonStore.flush_all)
 
 def generate_file_display_map(paths):
     """
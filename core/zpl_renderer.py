@@ -0,0 +1,326 @@
+import hashlib
+import io
+import os
+import platform
+import threading
+from collections import OrderedDict
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+from .code128 import code128_modules, module_runs
+
+# 203 dpi thermal printers = 8 dots per mm
+DOTS_PER_MM = 8
+DEFAULT_WIDTH_DOTS = 812   # 4 inch
+DEFAULT_HEIGHT_DOTS = 203  # 1 inch
+DEFAULT_FONT_HEIGHT = 9    # ZPL default font size in dots
+LABEL_GAP_DOTS = 8         # Spacing between stacked labels in one preview
+
+def _default_font_paths():
+    """Bold sans fonts closest to ZPL font 0 (Helvetica Bold Condensed)."""
+    system = platform.system()
+    if system == 'Windows':
+        return ["C:\\Windows\\Fonts\\arialbd.ttf", "C:\\Windows\\Fonts\\arial.ttf"]
+    if system == 'Darwin':
+        return ["/Library/Fonts/Arial Bold.ttf", "/System/Library/Fonts/Helvetica.ttc"]
+    return [
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    ]
+
+class _Field:
+    """Per-field state between ^FO and ^FS."""
+    def __init__(self, x=0, y=0):
+        self.x = x
+        self.y = y
+        self.font_h = DEFAULT_FONT_HEIGHT
+        self.font_w = DEFAULT_FONT_HEIGHT
+        self.block = None      # (width, max_lines, spacing, justify)
+        self.reverse = False
+        self.barcode = None    # dict of ^BC params
+        self.box = None        # (w, h, thickness, color)
+        self.data = None
+
+class ZPLRenderer:
+    """
+    Offline rasterizer for the ZPL subset used by our label templates:
+    ^XA/^XZ, ^PW, ^LL, ^LH, ^FO, ^A0, ^FB, ^GB, ^FR, ^BY, ^BC, ^FD, ^FS.
+    Output is a 203 dpi 1-bit image. Unsupported commands are ignored.
+    """
+    def __init__(self, font_paths=None, cache_size=64):
+        # font_paths=[] forces Pillow's built-in font (deterministic output)
+        self.font_paths = _default_font_paths() if font_paths is None else list(font_paths)
+        self.cache_size = cache_size
+        self._font_cache = {}
+        self._png_cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # --- Public API ---
+
+    def render_png(self, zpl, width=None, height=None):
+        """Returns PNG bytes for zpl, served from a content-hash LRU cache."""
+        key = hashlib.sha1(f"{width}x{height}|{zpl}".encode('utf-8')).hexdigest()
+        with self._lock:
+            png = self._png_cache.get(key)
+            if png is not None:
+                self._png_cache.move_to_end(key)
+                self.cache_hits += 1
+                return png
+            self.cache_misses += 1
+
+        buf = io.BytesIO()
+        self.render(zpl, width, height).save(buf, format='PNG')
+        png = buf.getvalue()
+
+        with self._lock:
+            self._png_cache[key] = png
+            while len(self._png_cache) > self.cache_size:
+                self._png_cache.popitem(last=False)
+        return png
+
+    def render(self, zpl, width=None, height=None):
+        """
+        Renders every ^XA...^XZ format in zpl and stacks them vertically.
+        ^PW/^LL in the format take precedence over width/height.
+        """
+        labels = [self._render_format(cmds, width, height) for cmds in self._split_formats(zpl)]
+        if not labels:
+            return Image.new('1', (width or DEFAULT_WIDTH_DOTS, height or DEFAULT_HEIGHT_DOTS), 1)
+        if len(labels) == 1:
+            return labels[0]
+
+        total_w = max(img.width for img in labels)
+        total_h = sum(img.height for img in labels) + LABEL_GAP_DOTS * (len(labels) - 1)
+        sheet = Image.new('1', (total_w, total_h), 1)
+        y = 0
+        for img in labels:
+            sheet.paste(img, (0, y))
+            y += img.height + LABEL_GAP_DOTS
+        return sheet
+
+    def clear_cache(self):
+        with self._lock:
+            self._png_cache.clear()
+
+    # --- Parsing ---
+
+    @staticmethod
+    def _split_formats(zpl):
+        """Yields command lists [(code, params), ...] per ^XA...^XZ block."""
+        # ZPL ignores CR/LF between and inside commands
+        text = zpl.replace('\r', '').replace('\n', '')
+        current = None
+        for token in text.split('^')[1:]:
+            code, params = token[:2].upper(), token[2:]
+            if code == 'XA':
+                current = []
+            elif code == 'XZ':
+                if current is not None:
+                    yield current
+                current = None
+            elif current is not None:
+                current.append((code, params))
+        if current:
+            yield current
+
+    @staticmethod
+    def _int(value, default):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return default
+
+    @staticmethod
+    def _params(params):
+        return [p.strip() for p in params.split(',')]
+
+    # --- Rendering ---
+
+    def _render_format(self, commands, width, height):
+        pw = ll = None
+        for code, params in commands:
+            if code == 'PW':
+                pw = self._int(params, None)
+            elif code == 'LL':
+                ll = self._int(params, None)
+        w = pw or width or DEFAULT_WIDTH_DOTS
+        h = ll or height or DEFAULT_HEIGHT_DOTS
+
+        # 'L' canvas: 255 = paper, 0 = ink. Converted to 1-bit at the end.
+        img = Image.new('L', (w, h), 255)
+        home_x = home_y = 0
+        by_module, by_height = 2, 10
+        field = _Field()
+
+        for code, params in commands:
+            p = self._params(params)
+            if code == 'LH':
+                home_x, home_y = self._int(p[0], 0), self._int(p[1] if len(p) > 1 else 0, 0)
+            elif code == 'FO':
+                field.x = home_x + self._int(p[0], 0)
+                field.y = home_y + self._int(p[1] if len(p) > 1 else 0, 0)
+            elif code[0] == 'A':
+                # ^A{font}{orientation},h,w - only font 0 normal orientation is modelled
+                field.font_h = self._int(p[1] if len(p) > 1 else None, field.font_h)
+                field.font_w = self._int(p[2] if len(p) > 2 else None, field.font_h)
+            elif code == 'FB':
+                field.block = (
+                    self._int(p[0], 0),
+                    max(1, self._int(p[1] if len(p) > 1 else 1, 1)),
+                    self._int(p[2] if len(p) > 2 else 0, 0),
+                    (p[3] if len(p) > 3 and p[3] else 'L').upper(),
+                )
+            elif code == 'FR':
+                field.reverse = True
+            elif code == 'BY':
+                by_module = self._int(p[0], by_module)
+                if len(p) > 2 and p[2]:
+                    by_height = self._int(p[2], by_height)
+            elif code == 'BC':
+                field.barcode = {
+                    'height': self._int(p[1] if len(p) > 1 and p[1] else None, by_height),
+                    'text': (p[2] if len(p) > 2 and p[2] else 'Y').upper() == 'Y',
+                    'above': (p[3] if len(p) > 3 and p[3] else 'N').upper() == 'Y',
+                    'module': by_module,
+                }
+            elif code == 'GB':
+                thick = self._int(p[2] if len(p) > 2 else 1, 1)
+                field.box = (
+                    self._int(p[0], thick),
+                    self._int(p[1] if len(p) > 1 else None, thick),
+                    thick,
+                    (p[3] if len(p) > 3 and p[3] else 'B').upper(),
+                )
+            elif code == 'FD':
+                field.data = params
+            elif code == 'FS':
+                self._draw_field(img, field)
+                field = _Field(field.x, field.y)
+
+        return img.point(lambda v: 255 if v >= 128 else 0).convert('1')
+
+    def _draw_field(self, img, field):
+        mask = Image.new('L', img.size, 0)
+        ink = 0
+        if field.box:
+            ink = self._draw_box(mask, field)
+        elif field.barcode and field.data is not None:
+            self._draw_barcode(mask, field)
+        elif field.data:
+            self._draw_text(mask, field)
+        else:
+            return
+
+        if field.reverse:
+            img.paste(ImageChops.invert(img), (0, 0), mask)
+        else:
+            img.paste(ink, (0, 0), mask)
+
+    def _draw_box(self, mask, field):
+        w, h, t, color = field.box
+        w, h = max(w, t), max(h, t)
+        draw = ImageDraw.Draw(mask)
+        x0, y0, x1, y1 = field.x, field.y, field.x + w - 1, field.y + h - 1
+        if t * 2 >= min(w, h):
+            draw.rectangle([x0, y0, x1, y1], fill=255)
+        else:
+            draw.rectangle([x0, y0, x1, y1], outline=255, width=t)
+        return 255 if color == 'W' else 0
+
+    def _draw_barcode(self, mask, field):
+        bc = field.barcode
+        try:
+            modules = code128_modules(field.data)
+        except ValueError:
+            return
+        draw = ImageDraw.Draw(mask)
+        mw, bh = bc['module'], bc['height']
+        bar_y = field.y
+        text_h = max(DEFAULT_FONT_HEIGHT, mw * 9)
+        if bc['text'] and bc['above']:
+            bar_y += text_h + 2
+        for is_bar, start, length in module_runs(modules):
+            if is_bar:
+                x0 = field.x + start * mw
+                draw.rectangle([x0, bar_y, x0 + length * mw - 1, bar_y + bh - 1], fill=255)
+
+        if bc['text']:
+            total_w = len(modules) * mw
+            text_y = field.y if bc['above'] else bar_y + bh + 2
+            font = self._font(text_h)
+            tw = draw.textlength(field.data, font=font)
+            draw.text((field.x + (total_w - tw) / 2, text_y), field.data, fill=255, font=font)
+
+    def _draw_text(self, mask, field):
+        text = field.data
+        if field.block:
+            block_w, max_lines, spacing, justify = field.block
+            lines = self._wrap(text.replace('\\&', '\n'), field, block_w)[:max_lines]
+        else:
+            block_w, spacing, justify = 0, 0, 'L'
+            lines = [text]
+
+        y = field.y
+        for line in lines:
+            line_w = self._text_width(line, field)
+            x = field.x
+            if block_w and justify == 'C':
+                x += (block_w - line_w) / 2
+            elif block_w and justify == 'R':
+                x += block_w - line_w
+            self._draw_line(mask, int(round(x)), y, line, field)
+            y += field.font_h + spacing
+
+    def _wrap(self, text, field, block_w):
+        lines = []
+        for paragraph in text.split('\n'):
+            current = ""
+            for word in paragraph.split(' '):
+                candidate = f"{current} {word}" if current else word
+                if current and block_w and self._text_width(candidate, field) > block_w:
+                    lines.append(current)
+                    current = word
+                else:
+                    current = candidate
+            lines.append(current)
+        return lines
+
+    def _text_width(self, text, field):
+        font = self._font(field.font_h)
+        scale = field.font_w / field.font_h if field.font_h else 1.0
+        return ImageDraw.Draw(Image.new('L', (1, 1))).textlength(text, font=font) * scale
+
+    def _draw_line(self, mask, x, y, text, field):
+        font = self._font(field.font_h)
+        if field.font_w == field.font_h:
+            ImageDraw.Draw(mask).text((x, y), text, fill=255, font=font)
+            return
+        # Non-square ^A sizes: render at height then stretch horizontally
+        natural_w = int(ImageDraw.Draw(Image.new('L', (1, 1))).textlength(text, font=font)) + 1
+        line_h = int(field.font_h * 1.3) + 1
+        tmp = Image.new('L', (natural_w, line_h), 0)
+        ImageDraw.Draw(tmp).text((0, 0), text, fill=255, font=font)
+        target_w = max(1, int(natural_w * field.font_w / field.font_h))
+        tmp = tmp.resize((target_w, line_h))
+        mask.paste(255, (x, y), tmp)
+
+    def _font(self, size):
+        size = max(1, int(size))
+        font = self._font_cache.get(size)
+        if font is not None:
+            return font
+        for path in self.font_paths:
+            if os.path.exists(path):
+                try:
+                    font = ImageFont.truetype(path, size)
+                    break
+                except OSError:
+                    continue
+        if font is None:
+            try:
+                font = ImageFont.load_default(size)
+            except TypeError:  # Pillow < 10.1 has no sized default font
+                font = ImageFont.load_default()
+        self._font_cache[size] = font
+        return font
@@ -0,0 +1,135 @@
+import os
+import re
+import threading
+
+PLACEHOLDER_RE = re.compile(r'\$\{([^}]+)\}')
+SECOND_LABEL_SUFFIX = "_2"
+
+# Field data must not contain command prefixes; CR/LF are noise in ZPL
+_PLAIN_ESCAPE = str.maketrans({'^': ' ', '~': ' ', '\r': None, '\n': ' '})
+
+def normalize_var_name(name):
+    """'RAM/ROM' and 'ram_rom' refer to the same variable."""
+    return name.strip().lower().replace('/', '_').replace(' ', '_')
+
+def _hex_escape(value, indicator):
+    # ^FH field: encode specials (and the indicator itself) as _XX hex
+    out = []
+    for ch in value:
+        if ch in ('^', '~', indicator):
+            out.append(f"{indicator}{ord(ch):02X}")
+        elif ch not in '\r\n':
+            out.append(ch)
+    return "".join(out)
+
+class ZPLTemplate:
+    """
+    A ZPL template parsed once into literal and ${var} segments.
+    Rendering joins the segments, so each label costs one pass over
+    the placeholders instead of one str.replace per variable.
+    """
+    def __init__(self, text, raw_vars=()):
+        self.text = text
+        raw_vars = {normalize_var_name(v) for v in raw_vars}
+
+        self.literals = []
+        self.slots = []  # (var_key, escape_mode) where mode is None (raw), '' (plain) or the ^FH indicator
+        pos = 0
+        for match in PLACEHOLDER_RE.finditer(text):
+            self.literals.append(text[pos:match.start()])
+            key = normalize_var_name(match.group(1))
+            mode = None if key in raw_vars else self._field_escape_mode(text, match.start())
+            self.slots.append((key, mode, match.group(0)))
+            pos = match.end()
+        self.literals.append(text[pos:])
+
+        self.var_names = {key for key, _, _ in self.slots}
+        self.is_2up = any(key.endswith(SECOND_LABEL_SUFFIX) for key in self.var_names)
+        self.labels_per_format = 2 if self.is_2up else 1
+
+    @staticmethod
+    def _field_escape_mode(text, index):
+        """Hex-escape inside fields that declare ^FH, plain-escape otherwise."""
+        field_start = text.rfind('^FS', 0, index)
+        field = text[field_start + 1 if field_start >= 0 else 0:index]
+        fh = field.rfind('^FH')
+        if fh < 0:
+            return ''
+        indicator = field[fh + 3:fh + 4]
+        return indicator if indicator and indicator != '^' else '_'
+
+    def render(self, values):
+        """
+        Renders one format. values maps normalized variable names to strings;
+        unknown placeholders are left as-is.
+        """
+        literals = self.literals
+        parts = [literals[0]]
+        for i, (key, mode, raw) in enumerate(self.slots, start=1):
+            value = values.get(key)
+            if value is None:
+                parts.append(raw)
+            elif mode is None:
+                parts.append(value)
+            elif mode == '':
+                parts.append(value.translate(_PLAIN_ESCAPE))
+            else:
+                parts.append(_hex_escape(value, mode))
+            parts.append(literals[i])
+        return "".join(parts)
+
+    def render_batch(self, label_values):
+        """
+        Renders a list of per-label value dicts. 2-up templates take labels
+        in pairs (second label under '_2' names); 1-up templates get one
+        format per label. Returns a list of (zpl, label_count).
+        """
+        formats = []
+        if not self.is_2up:
+            for values in label_values:
+                formats.append((self.render(values), 1))
+            return formats
+
+        blank = {key: "" for key in self.var_names}
+        for i in range(0, len(label_values), 2):
+            merged = dict(blank)
+            merged.update(label_values[i])
+            count = 1
+            if i + 1 < len(label_values):
+                for key, value in label_values[i + 1].items():
+                    merged[key + SECOND_LABEL_SUFFIX] = value
+                count = 2
+            formats.append((self.render(merged), count))
+        return formats
+
+class ZPLTemplateLoader:
+    """Compiles template files on first use and recompiles when mtime/size change."""
+    def __init__(self):
+        self._cache = {}  # path -> (mtime_ns, size, ZPLTemplate)
+        self._lock = threading.Lock()
+
+    def load(self, path, raw_vars=()):
+        """Returns the compiled template, or None if missing/unreadable/empty."""
+        path = str(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                return cached[2]
+
+        try:
+            with open(path, 'r') as f:
+                text = f.read()
+        except Exception as e:
+            print(f"Template load error: {e}")
+            return None
+
+        # Same threshold the printer used for "template is usable"
+        template = ZPLTemplate(text, raw_vars) if len(text) > 10 else None
+        with self._lock:
+            self._cache[path] = (st.st_mtime_ns, st.st_size, template)
+        return template
@@ -8,10 +8,16 @@ import pandas as pd
 from core.config import ConfigManager
 from core.inventory import InventoryManager
 from core.printer import PrinterManager
-from core.billing import BillingManager
+from core.print_queue import PrintQueue, JOB_PRINTING, JOB_DONE, JOB_FAILED, JOB_CANCELLED, JOB_INTERRUPTED
+from core.billing import BillingManager, InvoiceService
+from core.invoice_store import InvoiceStore
 from core.updater import UpdateChecker
 from core.version import APP_VERSION
 from core.activity_log import ActivityLogger
+from core.analytics import AnalyticsManager
+from core.sales_cube import SalesArchive
+from core.analytics_worker import AnalyticsWorker
+from core.utils import DurableJsonStore
 from core.barcode_utils import BarcodeGenerator
 from core.watcher import InventoryWatcher
 from core.licensing import LicenseManager
@@ -94,15 +100,24 @@ class MainApp(tb.Window):
         self.activity_logger = ActivityLogger(self.app_config)
         self.updater = UpdateChecker()
         self.inventory = InventoryManager(self.app_config, self.activity_logger)
+        self.sales_archive = SalesArchive()
+        self.analytics = AnalyticsManager(self.inventory, sales_archive=self.sales_archive)  # Shared by Dashboard and Analytics screens
+        self.analytics_worker = AnalyticsWorker()  # Computes screen sections off the Tk thread
         
         splash.update_progress("Setting up printing & billing...", 50)
         self.barcode_gen = BarcodeGenerator(self.app_config)
         self.printer = PrinterManager(self.app_config, self.barcode_gen)
+        self.print_queue = PrintQueue(self.printer)
+        self.print_queue.add_listener(self._on_print_job)
         self.billing = BillingManager(self.app_config, self.activity_logger)
+        self.invoices = InvoiceStore(invoices_dir=self.app_config.get_invoices_dir())
+        self.invoices.import_legacy()  # One-time: old registry JSON + existing PDFs
+        self.invoice_service = InvoiceService(self.billing, self.invoices)
         
         # --- Watcher ---
         splash.update_progress("Starting file watcher...", 60)
         self.watcher = InventoryWatcher(self.inventory, self._on_inventory_update)
+        self.inventory.add_change_listener(self._on_inventory_change)
         
         # --- UI Initialization ---
         splash.update_progress("Building interface...", 75)
@@ -123,6 +138,7 @@ class MainApp(tb.Window):
         if 'inventory' in self.screens:
              self.screens['inventory'].on_show()
         self.after(500, self._check_conflicts)
+        self.after(700, self._check_interrupted_prints)
         if not self.app_config.mappings:
             WelcomeDialog(self, self._on_welcome_choice)
 
@@ -315,7 +331,10 @@ class MainApp(tb.Window):
         QuickNavOverlay(self, screens_map, self.show_screen)
 
     def show_screen(self, key):
-        for screen in self.screens.values(): screen.pack_forget()
+        for screen in self.screens.values():
+            if screen.winfo_ismapped() and screen is not self.screens.get(key):
+                screen.on_hide()
+            screen.pack_forget()
         target = self.screens.get(key)
         
         # Suppress conflict popups while in Quick Entry or Status screens to avoid interruption
@@ -345,6 +364,19 @@ class MainApp(tb.Window):
     def _on_inventory_update(self):
         self.after(0, self._refresh_ui)
 
+    def _on_inventory_change(self, action, item_ids):
+        # Row-level change (e.g. Quick Entry add): refresh views from memory
+        self.after(0, self._refresh_views)
+
+    def _refresh_views(self):
+        if 'inventory' in self.screens: self.screens['inventory'].refresh_data(reload_from_disk=False)
+        if 'dashboard' in self.screens:
+            try:
+                self.screens['dashboard']._refresh_stats()
+            except Exception:
+                pass
+        self._check_conflicts()
+
     def _refresh_ui(self):
         if 'inventory' in self.screens: self.screens['inventory'].refresh_data()
         # Bug #13 fix: also refresh dashboard so KPI cards stay current
@@ -365,6 +397,79 @@ class MainApp(tb.Window):
         else:
             self.status_var.set("Inventory Ready.")
 
+    def generate_invoice_async(self, items, buyer, inv_num, save_path, discount=None, on_done=None, on_failed=None):
+        """
+        Renders an invoice on the background worker. on_done(path) runs on the
+        Tk thread after success; failures are reported here, then on_failed().
+        """
+        future = self.invoice_service.submit(items, buyer, inv_num, save_path, discount=discount)
+        self.status_var.set(f"Generating invoice {inv_num}...")
+
+        def finished(fut):
+            try:
+                success, _, total = fut.result()
+                error = None if success else "Invoice generator reported failure"
+            except Exception as e:
+                success, total, error = False, 0.0, str(e)
+            self.after(0, lambda: self._on_invoice_done(inv_num, str(save_path), success, total, error, on_done, on_failed))
+
+        future.add_done_callback(finished)
+        return future
+
+    def _on_invoice_done(self, inv_num, path, success, total, error, on_done, on_failed=None):
+        if not success:
+            self.status_var.set(f"Invoice {inv_num} failed.")
+            messagebox.showerror("Invoice Error", f"Failed to generate invoice {inv_num}: {error}")
+            if on_failed:
+                on_failed()
+            return
+        self.status_var.set(f"Invoice {inv_num} saved (Rs. {total:,.2f}).")
+        if on_done:
+            on_done(path)
+
+    def _check_interrupted_prints(self):
+        if getattr(self, '_resolving_prints', False):
+            return  # Already asking; the loop below picks up new jobs too
+        self._resolving_prints = True
+        try:
+            while True:
+                jobs = self.print_queue.interrupted_jobs()
+                if not jobs:
+                    break
+                job = jobs[0]
+                reprint = messagebox.askyesno(
+                    "Interrupted Print Job",
+                    f"{len(job.items)} label(s) were interrupted while printing"
+                    f"{': ' + job.error if job.error else ''}.\n"
+                    f"Some may already have printed.\n\nPrint them again?")
+                self.print_queue.resolve_interrupted(job.id, reprint)
+        finally:
+            self._resolving_prints = False
+
+    def _on_print_job(self, job):
+        # Called from the print worker thread
+        self.after(0, lambda: self._show_print_status(job))
+
+    def _show_print_status(self, job):
+        labels = len(job.items)
+        pending = self.print_queue.pending_count()
+        if job.status == JOB_PRINTING:
+            self.status_var.set(f"Printing {labels} label(s)... ({pending} queued)")
+        elif job.status == JOB_DONE:
+            self.status_var.set(f"Printed {job.labels_sent} label(s).")
+        elif job.status == JOB_FAILED:
+            self.status_var.set(f"Print failed: {job.error}")
+            self.show_toast("Print Failed", f"{labels} label(s) not printed: {job.error}", "danger")
+        elif job.status == JOB_CANCELLED:
+            self.status_var.set(f"Print job cancelled ({labels} label(s)).")
+        elif job.status == JOB_INTERRUPTED:
+            self.status_var.set(f"Print interrupted: {job.error}")
+            self._check_interrupted_prints()
+        elif job.attempts:
+            self.status_var.set(f"Printer unavailable, retrying ({job.attempts}/{self.print_queue.max_retries})...")
+        else:
+            self.status_var.set(f"{pending} label(s) queued for printing.")
+
     def _resolve_conflict_callback(self, conflict_data, action):
         self.inventory.resolve_conflict(conflict_data, action)
         if conflict_data in self.inventory.conflicts: self.inventory.conflicts.remove(conflict_data)
@@ -372,7 +477,19 @@ class MainApp(tb.Window):
 
     def on_close(self):
         self.watcher.stop_watching()
+        if 'quick_entry' in self.screens:
+            self.screens['quick_entry'].fetcher.shutdown()
+        self.print_queue.shutdown()  # Unprinted jobs resume on next start
+        self.analytics_worker.shutdown()
         self.inventory.shutdown()  # Drain pending writes before exit
+        self.invoice_service.shutdown(wait=True)  # Finish PDFs already queued
+        self.invoices.close()
+        self.activity_logger.close()  # Flush queued log entries
+        self.sales_archive.close()
+        if 'manual_scan' in self.screens:
+            self.screens['manual_scan'].manual_session.close()
+        self.app_config.close()
+        DurableJsonStore.flush_all()  # Any other registries with uncommitted edits
         self.destroy()
 
 if __name__ == "__main__":
@@ -51,6 +51,10 @@ class BaseScreen(ttk.Frame):
         """Called when screen becomes visible"""
         pass
 
+    def on_hide(self):
+        """Called when the user navigates away from the screen"""
+        pass
+
     def focus_primary(self):
         """Focus on the primary input widget of the screen"""
         pass
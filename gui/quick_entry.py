@@ -2,16 +2,17 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import pandas as pd
 import datetime
-import threading
 import os
 from pathlib import Path
-from core.scraper import PhoneScraper
+from core.scraper import PhoneScraper, FetchScheduler
+from core.print_queue import MODE_ZPL
 from gui.base import AutocompleteEntry, BaseScreen
 
 class QuickEntryScreen(BaseScreen):
     def __init__(self, parent, app_context):
         super().__init__(parent, app_context)
         self.scraper = PhoneScraper()
+        self.fetcher = FetchScheduler(self.scraper)  # Pooled, coalesced lookups
         
         # State Variables
         self.var_imei = tk.StringVar()
@@ -253,6 +254,11 @@ class QuickEntryScreen(BaseScreen):
 
     def on_show(self):
         self._refresh_files()
+        # Seed TAC cache so batches of known models resolve offline
+        try:
+            self.scraper.tac_cache.seed_from_inventory(self.app.inventory.get_inventory())
+        except Exception as e:
+            print(f"TAC seed error: {e}")
         self.ent_imei.focus_set()
 
     def _refresh_files(self):
@@ -370,18 +376,11 @@ class QuickEntryScreen(BaseScreen):
         ts = datetime.datetime.now().strftime("%H:%M:%S")
         self.list_batch_log.insert(0, f"[{ts}] Scanned: {imei}")
         
-        # Pre-fetch in background
-        def run():
-            data = self.scraper.fetch_details(imei)
+        # Pre-fetch in background (bounded pool, duplicate TACs coalesced)
+        def on_result(imei, data):
             self.fetched_data[imei] = data
-            # Update log if model found
-            name = data.get("name")
-            if name:
-                # Find index? It's inserted at 0. 
-                # Updating listbox safely from thread is tricky, better leave simple log.
-                pass
             
-        threading.Thread(target=run, daemon=True).start()
+        self.fetcher.subscribe(imei, on_result)
 
     def _focus_batch_start(self):
         if not self.var_batch_mode.get():
@@ -480,11 +479,10 @@ class QuickEntryScreen(BaseScreen):
         if not batch_row:
              self.lbl_status.config(text="Fetching info...", foreground="blue")
         
-        def run():
-            data = self.scraper.fetch_details(imei)
+        def on_result(imei, data):
             self.after(0, lambda: self._on_fetch_complete(data, batch_row))
             
-        threading.Thread(target=run, daemon=True).start()
+        self.fetcher.subscribe(imei, on_result)
 
     def _on_fetch_complete(self, data, batch_row=None):
         name = data.get("name", "")
@@ -622,14 +620,13 @@ class QuickEntryScreen(BaseScreen):
             "source_file": target
         }
         
-        # 1. Update Registry (Create ID)
-        uid = self.app.inventory.id_registry.get_or_create_id(new_data)
-        new_data['unique_id'] = uid
-        
-        # 2. Append to Excel
+        # 1. Append to Excel
         success = self._append_to_excel(target, new_data)
         
         if success:
+            # 2. Upsert into memory (creates the ID, no full reload needed)
+            uid = self.app.inventory.add_items([new_data], target)[0]
+            new_data['unique_id'] = uid
             self.lbl_status.config(text=f"Saved ID: {uid}", foreground="green")
             
             # 3. Print?
@@ -726,8 +723,10 @@ class QuickEntryScreen(BaseScreen):
             return False
 
     def _print_label(self, item):
-        printers = self.app.printer.get_system_printers()
-        if not printers: return
-        target = printers[0]
-        zpl = self.app.printer.generate_zpl_2up([item]) 
-        self.app.printer.send_raw_zpl(zpl, target)
+        target = self.app.app_config.get('label_printer_target', '')
+        if not target:
+            printers = self.app.printer.get_system_printers()
+            if not printers: return
+            target = printers[0]
+        # Labels saved in quick succession are paired into 2-up formats by the queue
+        self.app.print_queue.submit([item], printer_name=target, mode=MODE_ZPL)
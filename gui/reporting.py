@@ -1,7 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from core.reporting import ReportGenerator
+from core.exporters import default_extension
 import datetime
+import threading
 import pandas as pd
 from .base import BaseScreen
 from .screens.reporting_widgets import AdvancedFilterPanel, SamplingPanel
@@ -84,7 +86,17 @@ class ReportingScreen(BaseScreen):
         self.lbl_preview_count.pack(side=tk.LEFT, padx=20)
         
         ttk.Button(p_tb, text="Export Excel", command=lambda: self.export_data('excel'), bootstyle="success").pack(side=tk.RIGHT, padx=5)
+        ttk.Button(p_tb, text="Export CSV", command=lambda: self.export_data('csv'), bootstyle="info").pack(side=tk.RIGHT, padx=5)
+        ttk.Button(p_tb, text="Export Word", command=lambda: self.export_data('word'), bootstyle="primary").pack(side=tk.RIGHT, padx=5)
         ttk.Button(p_tb, text="Export PDF", command=lambda: self.export_data('pdf'), bootstyle="danger").pack(side=tk.RIGHT, padx=5)
+
+        # Export progress (shown while a background export runs)
+        self.export_frame = ttk.Frame(p_tb)
+        self.export_progress = ttk.Progressbar(self.export_frame, length=160, maximum=100)
+        self.export_progress.pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.export_frame, text="Cancel", command=self.cancel_export, bootstyle="secondary-outline").pack(side=tk.LEFT)
+        self._export_cancel = threading.Event()
+        self._export_running = False
         
         self.tree = ttk.Treeview(self.preview_frame, show='headings')
         self.tree.pack(fill=tk.BOTH, expand=True)
@@ -153,7 +165,7 @@ class ReportingScreen(BaseScreen):
         filters = self.filter_panel.get_filters()
         sampling = self.sampling_panel.get_sampling_data()
         
-        generator = ReportGenerator(df)
+        generator = ReportGenerator(df, generation=getattr(self.controller.inventory, 'generation', None))
         
         # 1. Filter
         res = generator.apply_filters(filters)
@@ -214,21 +226,47 @@ class ReportingScreen(BaseScreen):
         if self.preview_df is None or self.preview_df.empty:
             messagebox.showwarning("Empty", "No data to export.")
             return
+        if self._export_running:
+            messagebox.showwarning("Busy", "An export is already running.")
+            return
             
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         f_path = filedialog.asksaveasfilename(
-            defaultextension=f".{format_type}" if format_type != 'excel' else '.xlsx',
+            defaultextension=default_extension(format_type),
             initialfile=f"Report_{timestamp}"
         )
         if not f_path: return
         
         cols = self.get_selected_fields()
-        generator = ReportGenerator(self.preview_df)
-        success, msg = generator.export(self.preview_df, cols, format_type, f_path, include_serial=self.serial_var.get())
-        
+        df = self.preview_df
+        include_serial = self.serial_var.get()
+        generator = ReportGenerator(df)
+
+        self._export_running = True
+        self._export_cancel.clear()
+        self.export_progress.config(value=0)
+        self.export_frame.pack(side=tk.RIGHT, padx=10)
+
+        def progress(done, total):
+            pct = 100.0 * done / total if total else 100.0
+            self.after(0, lambda: self.export_progress.config(value=pct))
+
+        def worker():
+            success, msg = generator.export(df, cols, format_type, f_path, include_serial=include_serial,
+                                            progress=progress, cancel=self._export_cancel.is_set)
+            self.after(0, lambda: self._on_export_done(success, msg, f_path))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def cancel_export(self):
+        self._export_cancel.set()
+
+    def _on_export_done(self, success, msg, f_path):
+        self._export_running = False
+        self.export_frame.pack_forget()
         if success:
             messagebox.showinfo("Success", f"Exported to {f_path}")
-        else:
+        elif not self._export_cancel.is_set():
             messagebox.showerror("Error", msg)
             
     def focus_primary(self):
@@ -6,7 +6,7 @@ import ttkbootstrap as tb
 
 from ..base import BaseScreen
 from ..dialogs import ConflictResolutionDialog
-from core.analytics import AnalyticsManager
+from core.analytics import DIM_STATUS, DIM_BRAND
 
 class DashboardScreen(BaseScreen):
     def __init__(self, parent, app_context):
@@ -163,7 +163,7 @@ class DashboardScreen(BaseScreen):
     def open_sim_settings(self):
         # Dynamic import to avoid circular dependency if simulation imports screens
         from gui.simulation import PriceSimulationDialog
-        dlg = PriceSimulationDialog(self, self.sim_params)
+        dlg = PriceSimulationDialog(self, self.sim_params, analytics=self.app.analytics)
         if dlg.result:
             self.sim_params = dlg.result
             self._refresh_stats()
@@ -172,128 +172,73 @@ class DashboardScreen(BaseScreen):
         self._refresh_stats()
         self._refresh_log()
 
+    def on_hide(self):
+        self.app.analytics_worker.cancel('dashboard')
+
     def _refresh_stats(self):
-        df = self.app.inventory.get_inventory()
-        
         if self.sim_params.get('enabled'):
             self.lbl_sim.pack(fill=tk.X, pady=(0, 10), after=self.scroll_frame.winfo_children()[0])
         else:
             self.lbl_sim.pack_forget()
 
-        sold_month = 0
-        if df.empty:
-            count = 0
-            val = 0
-            self._update_alerts(pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
-        else:
-            # Filter Available
-            available = df[df['status'] == 'IN']
-            count = len(available)
-            val = available['price'].sum()
-            
-            # Sold This Month
-            now = datetime.datetime.now()
-            sold_df = df[df['status'].isin(['OUT', 'SOLD'])]
-            if not sold_df.empty:
-                def is_this_month(row):
-                    try:
-                        d = row.get('last_updated')
-                        if isinstance(d, str): d = datetime.datetime.fromisoformat(d)
-                        if not isinstance(d, datetime.datetime): return False
-                        return d.month == now.month and d.year == now.year
-                    except: return False
-                sold_month = sold_df.apply(is_this_month, axis=1).sum()
-            
-            # Aging Logic
-            def get_age(row):
-                try:
-                    d = row.get('last_updated')
-                    if isinstance(d, str): d = datetime.datetime.fromisoformat(d)
-                    if not isinstance(d, datetime.datetime): return 0
-                    return (now - d).days
-                except: return 0
-            
-            if not available.empty:
-                available = available.copy()
-                available['age_days'] = available.apply(get_age, axis=1)
-                aging_stock = available[available['age_days'] > 60].sort_values('age_days', ascending=False)
-            else:
-                aging_stock = pd.DataFrame()
-                
-            aging_count = len(aging_stock)
-            aging_color = "#ef4444" if aging_count > 0 else "#10b981"
-            self.card_aging.lbl_val.config(text=str(aging_count), fg=aging_color)
-            self._update_alerts(available, aging_stock, df)
-            
-        self.card_stock.lbl_val.config(text=str(count))
-        self.card_value.lbl_val.config(text=f"₹{val:,.0f}")
-        self.card_sold.lbl_val.config(text=str(sold_month))
-        
-        # AI Forecast Logic
+        analytics = self.app.analytics
+        sections = [("metrics", analytics.get_dashboard_metrics)]
         if str(self.app.app_config.get("enable_ai_features", "True")) == "True":
-            self.f_ai.pack(fill=tk.X, padx=20, pady=10, before=self.tree_aging.master.master.master)
-            
-            if 'analytics' in self.app.screens:
-                # This assumes 'analytics' screen is initialized.
-                # Since we are in Dashboard, and AnalyticsScreen is separate, we might share the manager?
-                # Or Dashboard creates its own? The original code accessed app.screens['analytics'].
-                # If AnalyticsScreen is not loaded, this might fail.
-                # Safe check:
-                if hasattr(self.app.screens.get('analytics', None), 'analytics'):
-                    forecast = self.app.screens['analytics'].analytics.get_demand_forecast()
-                    for i in self.tree_ai.get_children(): self.tree_ai.delete(i)
-                    
-                    for item in forecast:
-                         tag = 'normal'
-                         if item['status'] == 'OUT_OF_STOCK': tag = 'danger'
-                         elif item['status'] == 'LOW_STOCK': tag = 'warning'
-                         
-                         self.tree_ai.insert('', tk.END, values=(
-                             item['model'], 
-                             f"{item['velocity']}/wk",
-                             item['stock'],
-                             f"{item['days_left']} days",
-                             item['status']
-                         ), tags=(tag,))
-                    
-                    self.tree_ai.tag_configure('danger', foreground='red')
-                    self.tree_ai.tag_configure('warning', foreground='#ffcc00')
+            sections.append(("forecast", analytics.get_demand_forecast))
         else:
             self.f_ai.pack_forget()
+        self.app.analytics_worker.submit('dashboard', sections, lambda r: self.after(0, lambda: self._on_result(r)))
 
-    def _update_alerts(self, available_df, aging_df, full_df):
+    def _on_result(self, result):
+        if not self.app.analytics_worker.is_current(result.channel, result.request_id) or not result.ok:
+            return
+        if result.section == "metrics":
+            self._render_metrics(result.data)
+        elif result.section == "forecast":
+            self._render_forecast(result.data)
+
+    def _render_metrics(self, metrics):
+        aging_color = "#ef4444" if metrics.aging_count > 0 else "#10b981"
+        self.card_aging.lbl_val.config(text=str(metrics.aging_count), fg=aging_color)
+        self._update_alerts(metrics)
+            
+        self.card_stock.lbl_val.config(text=str(metrics.stock_count))
+        self.card_value.lbl_val.config(text=f"₹{metrics.stock_value:,.0f}")
+        self.card_sold.lbl_val.config(text=str(metrics.sold_this_month))
+
+    def _render_forecast(self, forecast):
+        # AI Forecast Logic
+        self.f_ai.pack(fill=tk.X, padx=20, pady=10, before=self.tree_aging.master.master.master)
+        for i in self.tree_ai.get_children(): self.tree_ai.delete(i)
+        
+        for item in forecast:
+            tag = 'normal'
+            if item['status'] == 'OUT_OF_STOCK': tag = 'danger'
+            elif item['status'] == 'LOW_STOCK': tag = 'warning'
+            
+            self.tree_ai.insert('', tk.END, values=(
+                item['model'], 
+                f"{item['velocity']}/wk",
+                item['stock'],
+                f"{item['days_left']} days",
+                item['status']
+            ), tags=(tag,))
+        
+        self.tree_ai.tag_configure('danger', foreground='red')
+        self.tree_ai.tag_configure('warning', foreground='#ffcc00')
+
+    def _update_alerts(self, metrics):
         for i in self.tree_aging.get_children(): self.tree_aging.delete(i)
-        if not aging_df.empty:
-            for _, row in aging_df.head(20).iterrows():
-                self.tree_aging.insert('', tk.END, values=(row['model'], f"{row['age_days']} days", f"₹{row['price']:,.0f}"))
+        for model, age_days, price in metrics.aging_rows:
+            self.tree_aging.insert('', tk.END, values=(model, f"{age_days} days", f"₹{price:,.0f}"))
                 
         for i in self.tree_low.get_children(): self.tree_low.delete(i)
-        if not available_df.empty:
-            available_df['model_fam'] = available_df['model'].apply(lambda x: " ".join(str(x).split()[:2]))
-            counts = available_df['model_fam'].value_counts()
-            low_stock = counts[counts < 2]
-            for model, count in low_stock.head(20).items():
-                self.tree_low.insert('', tk.END, values=(model, count, "-"))
+        for model, count in metrics.low_stock:
+            self.tree_low.insert('', tk.END, values=(model, count, "-"))
 
         for i in self.tree_top.get_children(): self.tree_top.delete(i)
-        if not full_df.empty:
-            sold = full_df[full_df['status'].isin(['OUT', 'SOLD'])]
-            if not sold.empty:
-                now = datetime.datetime.now()
-                def is_recent(row):
-                    try:
-                        d = row.get('last_updated')
-                        if isinstance(d, str): d = datetime.datetime.fromisoformat(d)
-                        if not isinstance(d, datetime.datetime): return False
-                        return (now - d).days <= 30
-                    except: return False
-                
-                recent_sold = sold[sold.apply(is_recent, axis=1)].copy()
-                if not recent_sold.empty:
-                    recent_sold['model_fam'] = recent_sold['model'].apply(lambda x: " ".join(str(x).split()[:2]))
-                    top_counts = recent_sold['model_fam'].value_counts()
-                    for idx, (model, count) in enumerate(top_counts.head(10).items()):
-                        self.tree_top.insert('', tk.END, values=(idx+1, model, count))
+        for idx, (model, count) in enumerate(metrics.top_sellers):
+            self.tree_top.insert('', tk.END, values=(idx+1, model, count))
 
     def _refresh_log(self):
         for i in self.tree_log.get_children():
@@ -415,7 +360,7 @@ class ConflictScreen(BaseScreen):
 class AnalyticsScreen(BaseScreen):
     def __init__(self, parent, app_context):
         super().__init__(parent, app_context)
-        self.analytics = AnalyticsManager(app_context.inventory)
+        self.analytics = app_context.analytics
         self.sim_params = {}
         self._init_ui()
 
@@ -460,6 +405,9 @@ class AnalyticsScreen(BaseScreen):
         self.buyer_inner = ttk.Frame(b_canvas, padding=10)
         
         self.buyer_inner.bind("<Configure>", lambda e: b_canvas.configure(scrollregion=b_canvas.bbox("all")))
+        self.lbl_no_buyers = ttk.Label(self.buyer_inner, text="No sales data recorded yet.", foreground="gray")
+        self.brand_rows = []   # (frame, name, bar, count) widgets reused across refreshes
+        self.buyer_rows = []
         b_canvas.create_window((0, 0), window=self.buyer_inner, anchor="nw")
         b_canvas.configure(yscrollcommand=b_scroll.set)
         
@@ -522,7 +470,7 @@ class AnalyticsScreen(BaseScreen):
 
     def open_sim_settings(self):
         from gui.simulation import PriceSimulationDialog
-        dlg = PriceSimulationDialog(self, self.sim_params)
+        dlg = PriceSimulationDialog(self, self.sim_params, analytics=self.app.analytics)
         if dlg.result:
             self.sim_params = dlg.result
             self.refresh()
@@ -542,87 +490,101 @@ class AnalyticsScreen(BaseScreen):
                     str(row.get('last_updated', '-'))[:10]
                 ))
 
+    def on_hide(self):
+        self.app.analytics_worker.cancel('analytics')
+
     def refresh(self):
-        stats = self.analytics.get_summary(self.sim_params)
-        df = self.app.inventory.get_inventory()
-        
         if self.sim_params.get('enabled'):
             self.lbl_sim.pack(fill=tk.X, pady=(0, 10), after=self.scroll_frame.winfo_children()[0])
         else:
             self.lbl_sim.pack_forget()
 
+        # Cheapest sections first so the KPIs appear immediately
+        sim_params = dict(self.sim_params)
+        aggregates = self.analytics.aggregates
+        sections = [
+            ("kpis", lambda: (self.analytics.get_summary(sim_params), aggregates.group(DIM_STATUS, 'OUT')['price_sum'])),
+            ("brands", lambda: aggregates.counts(DIM_BRAND, limit=6)),
+            ("models", lambda: aggregates.model_summary(limit=20)),
+            ("buyers", lambda: self.analytics.get_buyer_stats(limit=15)),
+            ("sold", self.analytics.get_sold_items),
+        ]
+        self.app.analytics_worker.submit('analytics', sections, lambda r: self.after(0, lambda: self._on_result(r)))
+
+    def _on_result(self, result):
+        if not self.app.analytics_worker.is_current(result.channel, result.request_id) or not result.ok:
+            return
+        render = getattr(self, f"_render_{result.section}", None)
+        if render:
+            render(result.data)
+
+    def _render_kpis(self, data):
+        stats, revenue = data
         self.kpi_stock.config(text=f"₹{stats['total_value']:,.0f}")
         self.kpi_sold.config(text=str(stats.get('status_counts', {}).get('OUT', 0)))
-        
-        sold_df = df[df['status'] == 'OUT']
-        self.sold_data = sold_df
-        
-        revenue = sold_df['price'].sum() if not sold_df.empty else 0
         self.kpi_revenue.config(text=f"₹{revenue:,.0f}")
         
         p_val = stats['realized_profit']
         p_color = "success" if p_val >= 0 else "danger"
         self.kpi_profit.config(text=f"₹{p_val:,.0f}", bootstyle=p_color)
 
-        for w in self.brand_inner.winfo_children(): w.destroy()
-        if not df.empty:
-            df['brand'] = df['model'].apply(lambda x: str(x).split()[0].upper())
-            brand_counts = df['brand'].value_counts().head(6)
-            max_val = brand_counts.max() if not brand_counts.empty else 1
-            
-            for brand, count in brand_counts.items():
+    def _render_sold(self, sold_data):
+        self.sold_data = sold_data
+
+    def _render_brands(self, brand_counts):
+        # Rows are reused between refreshes; only their text and bar width change
+        rows = self.brand_rows
+        max_val = max(brand_counts.values()) if brand_counts else 1
+        for i, (brand, count) in enumerate(brand_counts.items()):
+            if i == len(rows):
                 f = ttk.Frame(self.brand_inner)
-                f.pack(fill=tk.X, pady=5)
-                ttk.Label(f, text=f"{brand:<12}", font=('Consolas', 10)).pack(side=tk.LEFT)
+                name_lbl = ttk.Label(f, font=('Consolas', 10))
+                name_lbl.pack(side=tk.LEFT)
                 bar_container = ttk.Frame(f, height=15, bootstyle="secondary")
                 bar_container.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
-                pct = (count / max_val)
                 bar = ttk.Frame(bar_container, height=15, bootstyle="info")
-                bar.place(relx=0, rely=0, relwidth=pct, relheight=1)
-                ttk.Label(f, text=str(count), font=('bold')).pack(side=tk.RIGHT)
-
-        for w in self.buyer_inner.winfo_children(): w.destroy()
-        self.buyer_widgets = []
-        
-        if not sold_df.empty:
-            temp_sold = sold_df.copy()
-            temp_sold['buyer_clean'] = temp_sold['buyer'].astype(str).str.strip()
-            buyer_stats = temp_sold.groupby('buyer_clean').agg({'unique_id': 'count', 'price': 'sum'}).sort_values('price', ascending=False).head(15)
-            
-            for buyer, row in buyer_stats.iterrows():
+                count_lbl = ttk.Label(f, font=('bold'))
+                count_lbl.pack(side=tk.RIGHT)
+                rows.append((f, name_lbl, bar, count_lbl))
+            f, name_lbl, bar, count_lbl = rows[i]
+            name_lbl.config(text=f"{brand:<12}")
+            bar.place(relx=0, rely=0, relwidth=count / max_val, relheight=1)
+            count_lbl.config(text=str(count))
+            f.pack(fill=tk.X, pady=5)
+        for f, *_ in rows[len(brand_counts):]:
+            f.pack_forget()
+
+    def _render_buyers(self, buyer_stats):
+        rows = self.buyer_rows
+        for i, (buyer, items, total) in enumerate(buyer_stats):
+            if i == len(rows):
                 f = ttk.Frame(self.buyer_inner, cursor="hand2")
-                f.pack(fill=tk.X, pady=2)
-                
-                def on_click(event, b=buyer, frame=f): 
-                    for bf in self.buyer_widgets: frame.master.nametowidget(bf).configure(bootstyle="default")
-                    self._show_buyer_history(b)
-                
-                name_lbl = ttk.Label(f, text=f"👤 {str(buyer)[:20]}", font=('Segoe UI', 10))
+                name_lbl = ttk.Label(f, font=('Segoe UI', 10))
                 name_lbl.pack(side=tk.LEFT, padx=5)
-                
-                price_lbl = ttk.Label(f, text=f"₹{row['price']:,.0f}", bootstyle="primary")
+                price_lbl = ttk.Label(f, bootstyle="primary")
                 price_lbl.pack(side=tk.RIGHT, padx=5)
-                
-                count_lbl = ttk.Label(f, text=f"{int(row['unique_id'])} items", foreground="gray")
+                count_lbl = ttk.Label(f, foreground="gray")
                 count_lbl.pack(side=tk.RIGHT, padx=5)
-                
-                for widget in [f, name_lbl, price_lbl, count_lbl]:
-                    widget.bind("<Button-1>", on_click)
-                
-                self.buyer_widgets.append(f)
+                rows.append((f, name_lbl, price_lbl, count_lbl))
+            f, name_lbl, price_lbl, count_lbl = rows[i]
+            name_lbl.config(text=f"👤 {str(buyer)[:20]}")
+            price_lbl.config(text=f"₹{total:,.0f}")
+            count_lbl.config(text=f"{items} items")
+            for widget in (f, name_lbl, price_lbl, count_lbl):
+                widget.bind("<Button-1>", lambda event, b=buyer: self._show_buyer_history(b))
+            f.pack(fill=tk.X, pady=2)
+        for f, *_ in rows[len(buyer_stats):]:
+            f.pack_forget()
+
+        if buyer_stats:
+            self.lbl_no_buyers.pack_forget()
         else:
-            ttk.Label(self.buyer_inner, text="No sales data recorded yet.", foreground="gray").pack(pady=20)
+            self.lbl_no_buyers.pack(pady=20)
 
+    def _render_models(self, model_rows):
         for item in self.tree_details.get_children(): self.tree_details.delete(item)
-        if not df.empty:
-            model_summary = df.groupby('model').apply(lambda x: pd.Series({
-                'in_stock': (x['status'] == 'IN').sum(),
-                'sold': (x['status'] == 'OUT').sum(),
-                'avg_price': x['price'].mean()
-            }), include_groups=False).sort_values('in_stock', ascending=False).head(20)
-            
-            for model, row in model_summary.iterrows():
-                self.tree_details.insert('', tk.END, values=(model, int(row['in_stock']), int(row['sold']), f"₹{row['avg_price']:,.0f}"))
+        for model, in_stock, sold, avg_price in model_rows:
+            self.tree_details.insert('', tk.END, values=(model, int(in_stock), int(sold), f"₹{avg_price:,.0f}"))
 
     def _export_pdf(self):
         f = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF", "*.pdf")], initialfile=f"Analytics_Detailed_{datetime.date.today()}.pdf")
@@ -643,7 +605,6 @@ class AnalyticsScreen(BaseScreen):
             elements.append(Spacer(1, 20))
             
             stats = self.analytics.get_summary()
-            df = self.app.inventory.get_inventory()
             
             elements.append(Paragraph("Financial Snapshot", styles['Heading2']))
             data = [
@@ -667,7 +628,7 @@ class AnalyticsScreen(BaseScreen):
             
             elements.append(Paragraph("Detailed Sales Log (Sold Items)", styles['Heading2']))
             
-            sold_df = df[df['status'] == 'OUT'].copy()
+            sold_df = self.analytics.get_sold_items().copy()
             if not sold_df.empty:
                 if 'last_updated' in sold_df.columns:
                     sold_df['last_updated'] = pd.to_datetime(sold_df['last_updated'], errors='coerce')
@@ -8,11 +8,13 @@ from pathlib import Path
 
 from ..base import BaseScreen, AutocompleteEntry
 from ..dialogs import PrinterSelectionDialog, ItemSelectionDialog
+from core.invoice_store import DEFAULT_PAGE_SIZE as INVOICE_PAGE_SIZE
 
 class BillingScreen(BaseScreen):
     def __init__(self, parent, app_context):
         super().__init__(parent, app_context)
         self.cart_items = []
+        self._rendering = False  # One invoice render at a time
         self._init_ui()
 
     def _init_ui(self):
@@ -105,9 +107,12 @@ class BillingScreen(BaseScreen):
         ttk.Button(btn_frame, text="Clear Cart", command=self.clear_cart).pack(side=tk.LEFT)
         ttk.Button(btn_frame, text="Edit Price", command=self._edit_price).pack(side=tk.LEFT, padx=10)
         
-        ttk.Button(btn_frame, text="Print Invoice", command=self._print_invoice).pack(side=tk.RIGHT, padx=5)
-        ttk.Button(btn_frame, text="Save PDF", command=self._save_invoice).pack(side=tk.RIGHT, padx=5)
-        ttk.Button(btn_frame, text="SAVE & SOLD", command=self._save_and_sold, style="Accent.TButton").pack(side=tk.RIGHT, padx=20)
+        self.btn_print = ttk.Button(btn_frame, text="Print Invoice", command=self._print_invoice)
+        self.btn_print.pack(side=tk.RIGHT, padx=5)
+        self.btn_save = ttk.Button(btn_frame, text="Save PDF", command=self._save_invoice)
+        self.btn_save.pack(side=tk.RIGHT, padx=5)
+        self.btn_sold = ttk.Button(btn_frame, text="SAVE & SOLD", command=self._save_and_sold, style="Accent.TButton")
+        self.btn_sold.pack(side=tk.RIGHT, padx=20)
 
     def on_show(self):
         self.ent_scan.focus_set()
@@ -122,28 +127,23 @@ class BillingScreen(BaseScreen):
             messagebox.showwarning("Empty", "Cart is empty")
             return
 
-        # 1. First Save the Invoice
-        path = self._generate_file()
-        if not path:
-            return # Generation failed or cancelled
-
-        # 2. Then Mark as Sold
-        buyer_name = self.ent_name.get().strip()
-        buyer_contact = self.ent_contact.get().strip()
-        
-        count = 0
         updates = {
             "status": "OUT",
-            "buyer": buyer_name,
-            "buyer_contact": buyer_contact
+            "buyer": self.ent_name.get().strip(),
+            "buyer_contact": self.ent_contact.get().strip()
         }
-        
-        for item in self.cart_items:
-            if self.app.inventory.update_item_data(item['unique_id'], updates):
-                count += 1
-                
-        messagebox.showinfo("Success", f"Invoice saved.\nMarked {count} items as SOLD (OUT).")
-        self.clear_cart()
+
+        # 1. First Save the Invoice, 2. Then Mark as Sold
+        def on_saved(path, items):
+            count = 0
+            for item in items:
+                if self.app.inventory.update_item_data(item['unique_id'], updates):
+                    count += 1
+                    
+            messagebox.showinfo("Success", f"Invoice saved.\nMarked {count} items as SOLD (OUT).")
+            self.clear_cart(items)
+
+        self._generate_file(on_saved)
 
     def _handle_sold_item(self, item):
         buyer = item.get('buyer', 'Unknown')
@@ -268,8 +268,13 @@ class BillingScreen(BaseScreen):
         self.cart_items.extend(items)
         self._refresh_cart()
 
-    def clear_cart(self):
-        self.cart_items = []
+    def clear_cart(self, items=None):
+        """Empties the cart, or removes only the given items (e.g. those just invoiced)."""
+        if items is None:
+            self.cart_items = []
+        else:
+            done = {id(item) for item in items}
+            self.cart_items = [item for item in self.cart_items if id(item) not in done]
         self.ent_disc_amt.delete(0, tk.END)
         self.ent_disc_amt.insert(0, "0")
         self.ent_disc_reason.delete(0, tk.END)
@@ -317,17 +322,35 @@ class BillingScreen(BaseScreen):
         
         self._calculate_totals()
 
-    def _generate_file(self):
+    def _set_rendering(self, rendering):
+        self._rendering = rendering
+        for btn in (self.btn_print, self.btn_save, self.btn_sold):
+            btn.config(state='disabled' if rendering else 'normal')
+
+    def _generate_file(self, on_done):
+        """
+        Renders the cart's invoice in the background; on_done(path, items) runs
+        on success with the items that were invoiced. The invoice buttons stay
+        disabled until the render finishes, so one cart is never rendered twice.
+        """
+        if self._rendering:
+            return None
         if not self.cart_items:
             messagebox.showwarning("Empty", "Cart is empty")
             return None
-            
+
+        # Snapshot the sale; items scanned while the PDF renders stay in the cart
+        items = list(self.cart_items)
+
         buyer_name = self.ent_name.get().strip() or "Customer"
         safe_name = "".join([c for c in buyer_name if c.isalnum() or c in (' ', '-', '_')]).strip()
         ts = int(datetime.datetime.now().timestamp())
+        inv_dir = self.app.app_config.get_invoices_dir()
+        while (inv_dir / f"{safe_name}_{ts}.pdf").exists():
+            ts += 1  # Back-to-back invoices within a second keep distinct numbers and files
         filename = f"{safe_name}_{ts}.pdf"
         
-        save_path = self.app.app_config.get_invoices_dir() / filename
+        save_path = inv_dir / filename
         
         buyer = {
             "name": buyer_name,
@@ -342,7 +365,7 @@ class BillingScreen(BaseScreen):
             val = float(self.ent_disc_amt.get())
             if val > 0:
                 reason = self.ent_disc_reason.get().strip() or "Discount"
-                subtotal = sum(float(item.get('price', 0)) for item in self.cart_items)
+                subtotal = sum(float(item.get('price', 0)) for item in items)
                 
                 d_amt = 0.0
                 if self.var_disc_type.get() == "PERCENT":
@@ -360,67 +383,43 @@ class BillingScreen(BaseScreen):
         
         inv_num = f"INV-{ts}"
         
-        # Call Generator first to get the authoritative Hash
-        try:
-            success, verify_hash, pdf_total = self.app.billing.generate_invoice(self.cart_items, buyer, inv_num, str(save_path), discount=discount)
-            
-            if success:
-                # --- Save to Signature Registry ---
-                try:
-                    import json
-                    from pathlib import Path
-                    reg_path = Path.home() / "Documents" / "4BrosManager" / "config" / "invoice_registry.json"
-                    
-                    registry = {}
-                    if reg_path.exists():
-                        try:
-                            with open(reg_path, 'r') as f:
-                                registry = json.load(f)
-                        except: pass
-                    
-                    registry[verify_hash] = {
-                        "inv_no": inv_num,
-                        "date": str(datetime.date.today()),
-                        "amount": f"{pdf_total:.2f}",
-                        "buyer": buyer_name
-                    }
-                    
-                    with open(reg_path, 'w') as f:
-                        json.dump(registry, f, indent=4)
-                except Exception as e:
-                    print(f"Registry Save Error: {e}")
+        def on_saved(path):
+            self._set_rendering(False)
+            on_done(path, items)
 
-                return str(save_path)
-            else:
-                return None
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate invoice: {e}")
-            return None
+        # Rendered on the invoice worker; the store records the authoritative hash
+        self._set_rendering(True)
+        try:
+            return self.app.generate_invoice_async(items, buyer, inv_num, save_path, discount=discount,
+                                                   on_done=on_saved, on_failed=lambda: self._set_rendering(False))
+        except Exception:
+            self._set_rendering(False)
+            raise
 
     def _save_invoice(self):
-        path = self._generate_file()
-        if path:
+        def on_saved(path, items):
             messagebox.showinfo("Success", f"Invoice saved to:\n{path}")
-            self.clear_cart()
+            self.clear_cart(items)
+
+        self._generate_file(on_saved)
 
     def _print_invoice(self):
-        path = self._generate_file()
-        if not path: return
-        
-        printers = self.app.printer.get_system_printers()
-        if not printers:
-            messagebox.showwarning("No Printers", "No Windows printers found. PDF saved only.")
-            return
+        def on_saved(path, items):
+            printers = self.app.printer.get_system_printers()
+            if not printers:
+                messagebox.showwarning("No Printers", "No Windows printers found. PDF saved only.")
+                return
 
-        def on_printer_select(printer_name):
-            if self.app.printer.print_pdf(path, printer_name):
-                messagebox.showinfo("Sent", f"Invoice sent to {printer_name}")
-                self.clear_cart()
-            else:
-                messagebox.showerror("Error", "Failed to print.")
+            def on_printer_select(printer_name):
+                if self.app.printer.print_pdf(path, printer_name):
+                    messagebox.showinfo("Sent", f"Invoice sent to {printer_name}")
+                    self.clear_cart(items)
+                else:
+                    messagebox.showerror("Error", "Failed to print.")
 
-        PrinterSelectionDialog(self.winfo_toplevel(), printers, on_printer_select)
+            PrinterSelectionDialog(self.winfo_toplevel(), printers, on_printer_select)
+
+        self._generate_file(on_saved)
 
 class InvoiceHistoryScreen(BaseScreen):
     def __init__(self, parent, app_context):
@@ -430,7 +429,7 @@ class InvoiceHistoryScreen(BaseScreen):
     def _init_ui(self):
         # Toolbar / Header
         header = self.add_header("Generated Invoices", help_section="Invoicing and Billing")
-        ttk.Button(header, text="Refresh List", command=self._refresh_list).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(header, text="Refresh List", command=self._sync_and_refresh).pack(side=tk.RIGHT, padx=5)
         
         # Filter Frame
         f_filter = ttk.LabelFrame(self, text="Filter", padding=5)
@@ -456,13 +455,23 @@ class InvoiceHistoryScreen(BaseScreen):
         ttk.Button(actions, text="Print", command=self._print_pdf).pack(side=tk.LEFT, padx=5)
         ttk.Button(actions, text="Delete", command=self._delete_invoice).pack(side=tk.LEFT, padx=5)
         
+        # Paging
+        ttk.Button(actions, text="Next >>", command=lambda: self._refresh_list(self.page + 1)).pack(side=tk.RIGHT, padx=5)
+        self.lbl_page = ttk.Label(actions, text="")
+        self.lbl_page.pack(side=tk.RIGHT, padx=5)
+        ttk.Button(actions, text="<< Prev", command=lambda: self._refresh_list(self.page - 1)).pack(side=tk.RIGHT, padx=5)
+        self.page = 0
+        self.page_count = 1
+        
         # List
-        cols = ('date', 'name', 'filename', 'size')
+        cols = ('date', 'name', 'amount', 'filename', 'size')
         self.tree = ttk.Treeview(self, columns=cols, show='headings', selectmode='extended')
         self.tree.heading('date', text='Date')
         self.tree.column('date', width=120)
         self.tree.heading('name', text='Customer Name')
         self.tree.column('name', width=200)
+        self.tree.heading('amount', text='Amount')
+        self.tree.column('amount', width=100, anchor=tk.E)
         self.tree.heading('filename', text='Filename')
         self.tree.heading('size', text='Size')
         self.tree.column('size', width=80)
@@ -485,23 +494,11 @@ class InvoiceHistoryScreen(BaseScreen):
         code = self.ent_verify.get().strip().upper()
         if not code: return
         
-        # Load Registry
-        import json
-        from pathlib import Path
-        reg_path = Path.home() / "Documents" / "4BrosManager" / "config" / "invoice_registry.json"
-        
-        if not reg_path.exists():
-            messagebox.showerror("Error", "No invoice registry found. Cannot verify.")
-            return
-            
         try:
-            with open(reg_path, 'r') as f:
-                registry = json.load(f)
-                
-            clean_code = code.replace(" ", "")
-            data = registry.get(clean_code)
+            data = self.app.invoices.get_by_hash(code)
             if data:
-                msg = f"✅ VALID SIGNATURE\n\nInvoice: {data.get('inv_no')}\nDate: {data.get('date')}\nAmount: {data.get('amount')}\nBuyer: {data.get('buyer')}"
+                amount = f"{data['amount']:.2f}" if data.get('amount') is not None else "-"
+                msg = f"✅ VALID SIGNATURE\n\nInvoice: {data.get('inv_no')}\nDate: {data.get('inv_date')}\nAmount: {amount}\nBuyer: {data.get('buyer')}"
                 messagebox.showinfo("Legit", msg)
             else:
                 messagebox.showerror("FAKE", "❌ INVALID SIGNATURE\n\nThis code does not match any invoice in the system.")
@@ -510,49 +507,46 @@ class InvoiceHistoryScreen(BaseScreen):
             messagebox.showerror("Error", f"Verification failed: {e}")
 
     def on_show(self):
-        self._refresh_list()
+        self._sync_and_refresh()
 
     def focus_primary(self):
         self.ent_filter_buyer.focus_set()
 
+    def _sync_and_refresh(self):
+        # Pick up PDFs copied into (or removed from) the invoices folder outside the app
+        try:
+            self.app.invoices.sync_dir()
+        except Exception as e:
+            print(f"Invoice folder sync error: {e}")
+        self._refresh_list(self.page)
+
     def _clear_filters(self):
         self.ent_filter_buyer.delete(0, tk.END)
         self.ent_filter_date.delete(0, tk.END)
         self._refresh_list()
 
-    def _refresh_list(self):
+    def _refresh_list(self, page=0):
         for item in self.tree.get_children():
             self.tree.delete(item)
-            
-        inv_dir = self.app.app_config.get_invoices_dir()
-        if not inv_dir.exists(): return
         
         # Filters
-        f_buyer = self.ent_filter_buyer.get().strip().lower()
+        f_buyer = self.ent_filter_buyer.get().strip()
         f_date = self.ent_filter_date.get().strip()
         
-        # Get PDF files
-        files = list(inv_dir.glob("*.pdf"))
-        # Sort by modification time (newest first)
-        files.sort(key=lambda f: f.stat().st_mtime, reverse=True)
-        
-        for f in files:
-            stats = f.stat()
-            dt_obj = datetime.datetime.fromtimestamp(stats.st_mtime)
-            dt = dt_obj.strftime("%Y-%m-%d %H:%M")
-            date_only = dt_obj.strftime("%Y-%m-%d")
-            size = f"{stats.st_size / 1024:.1f} KB"
-            
-            # Try to guess name from filename: Name_Timestamp.pdf
-            name = f.stem.split('_')[0] if '_' in f.stem else "Unknown"
-            
-            # Filter Logic
-            if f_buyer and f_buyer not in name.lower():
-                continue
-            if f_date and f_date not in date_only:
-                continue
-            
-            self.tree.insert('', tk.END, values=(dt, name, f.name, size), iid=str(f))
+        # Indexed query, one page at a time (newest first)
+        total = self.app.invoices.count(buyer=f_buyer, date=f_date)
+        self.page_count = max(1, -(-total // INVOICE_PAGE_SIZE))
+        self.page = min(max(page, 0), self.page_count - 1)
+        rows = self.app.invoices.query(buyer=f_buyer, date=f_date, limit=INVOICE_PAGE_SIZE, offset=self.page * INVOICE_PAGE_SIZE)
+        
+        for row in rows:
+            dt = datetime.datetime.fromtimestamp(row['created_ts']).strftime("%Y-%m-%d %H:%M")
+            amount = f"{row['amount']:,.2f}" if row['amount'] is not None else ""
+            size = f"{row['file_size'] / 1024:.1f} KB" if row['file_size'] else ""
+            name = row['buyer'] or "Unknown"
+            self.tree.insert('', tk.END, values=(dt, name, amount, Path(row['file_path']).name, size), iid=row['file_path'])
+        
+        self.lbl_page.config(text=f"Page {self.page + 1} of {self.page_count} ({total} invoices)")
 
     def _get_selected(self):
         sel = self.tree.selection()
@@ -602,7 +596,9 @@ class InvoiceHistoryScreen(BaseScreen):
         if messagebox.askyesno("Confirm", f"Delete {len(selection)} invoice(s) permanently?"):
             try:
                 for path in selection:
-                    os.remove(path)
-                self._refresh_list()
+                    if os.path.exists(path):
+                        os.remove(path)
+                    self.app.invoices.mark_deleted(path)  # Signature stays verifiable
+                self._refresh_list(self.page)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete: {e}")
@@ -731,9 +731,9 @@ Start with one item and build from there.
 ### Q: What's a backup and where are they?
 
 **A:** 
-- App creates `.bak` file before every Excel write
-- Location: Documents/MobileShopManager/backups/
-- Timestamped: YYYYMMDD_HHMMSS format
+- App backs up a workbook before writing to it (at most once every few minutes, and only if it changed)
+- Location: Documents/MobileShopManager/backups/ (compressed, listed in index.json)
+- The last 5 versions of each file are kept
 - If something goes wrong, restore from backup
 
 ## Printing and Labels
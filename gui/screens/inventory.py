@@ -10,6 +10,7 @@ import ttkbootstrap as tb
 
 from ..base import BaseScreen, AutocompleteEntry
 from ..dialogs import ZPLPreviewDialog
+from core.print_queue import MODE_AUTO, MODE_IMAGE
 from ..widgets import IconButton, CollapsibleFrame
 from core.filters import AdvancedFilter
 
@@ -272,7 +273,7 @@ class InventoryScreen(BaseScreen):
         row = self._get_selected_row_data()
         if row:
             # Print single
-            self.app.printer.print_label_windows(row)
+            self.app.print_queue.submit([row], mode=MODE_IMAGE)
             self.checked_ids.add(self.tree.selection()[0])
             self._print_selected()
 
@@ -665,15 +666,9 @@ class InventoryScreen(BaseScreen):
             return
         
         def do_print():
-            count = self.app.printer.print_batch_zpl(items)
-            if count > 0:
-                messagebox.showinfo("Printing", f"Sent {count} labels to printer (Batch Mode).")
-            else:
-                success = 0
-                for item in items:
-                    if self.app.printer.print_label_windows(item):
-                        success += 1
-                messagebox.showinfo("Printing", f"Sent {success} labels to printer.")
+            # Batch ZPL, falling back to per-label image printing (on the print worker)
+            self.app.print_queue.submit(items, mode=MODE_AUTO, coalesce=False)
+            self.app.show_toast("Printing", f"Queued {len(items)} labels for printing.")
 
         ZPLPreviewDialog(self.winfo_toplevel(), items, do_print)
 
@@ -765,7 +760,7 @@ class InventoryScreen(BaseScreen):
             dlg.destroy()
             self.checked_ids.clear()
             self.refresh_data(reload_from_disk=False)
-            messagebox.showinfo("Success", f"Sold {success_count} items." + ("\nInvoice Generated." if var_auto.get() else ""))
+            messagebox.showinfo("Success", f"Sold {success_count} items." + ("\nInvoice is being generated." if var_auto.get() else ""))
 
         ttk.Button(dlg, text="CONFIRM SOLD", command=do_confirm, style="Accent.TButton").pack(pady=20)
 
@@ -793,27 +788,5 @@ class InventoryScreen(BaseScreen):
         save_path = self.app.app_config.get_invoices_dir() / filename
         inv_num = f"INV-{ts}"
         
-        try:
-            success, verify_hash, pdf_total = self.app.billing.generate_invoice(cart, buyer, inv_num, str(save_path))
-            
-            if success:
-                try:
-                    import json
-                    from pathlib import Path
-                    reg_path = Path.home() / "Documents" / "4BrosManager" / "config" / "invoice_registry.json"
-                    registry = {}
-                    if reg_path.exists():
-                        with open(reg_path, 'r') as f: registry = json.load(f)
-                        
-                    registry[verify_hash] = {
-                        "inv_no": inv_num,
-                        "date": date_str,
-                        "amount": f"{pdf_total:.2f}",
-                        "buyer": buyer_name
-                    }
-                    with open(reg_path, 'w') as f: json.dump(registry, f, indent=4)
-                except:
-                    pass
-                
-        except Exception as e:
-            messagebox.showerror("Invoice Error", f"Failed to auto-generate invoice: {e}")
+        # Background render; errors are reported by the app when it finishes
+        self.app.generate_invoice_async(cart, buyer, inv_num, save_path)
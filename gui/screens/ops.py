@@ -5,6 +5,7 @@ import datetime
 import ttkbootstrap as tb
 
 from ..base import BaseScreen, AutocompleteEntry
+from core.print_queue import MODE_IMAGE
 
 class SearchScreen(BaseScreen):
     def __init__(self, parent, app_context):
@@ -122,7 +123,7 @@ class SearchScreen(BaseScreen):
     def _ctx_print(self):
         row = self._get_current_match()
         if row is not None:
-            self.app.printer.print_label_windows(row.to_dict())
+            self.app.print_queue.submit([row.to_dict()], mode=MODE_IMAGE)
 
     def _ctx_edit(self):
         row = self._get_current_match()
@@ -189,11 +190,9 @@ class SearchScreen(BaseScreen):
         if row.get('date_added'):
             return str(row.get('date_added'))
             
-        reg_meta = self.app.inventory.id_registry.get_metadata(row['unique_id'])
-        history = reg_meta.get('history', [])
-        if history:
-            sorted_h = sorted(history, key=lambda x: x.get('ts', ''))
-            return sorted_h[0].get('ts')
+        first = self.app.inventory.id_registry.get_history(row['unique_id'], limit=1)
+        if first:
+            return first[0].get('ts')
             
         return str(row.get('last_updated', 'Unknown'))
 
@@ -263,15 +262,12 @@ Notes       : {row.get('notes', '')}
         self.txt_timeline.configure(state='normal')
         self.txt_timeline.delete(1.0, tk.END)
             
-        reg_meta = self.app.inventory.id_registry.get_metadata(row['unique_id'])
-        history = reg_meta.get('history', [])
+        history = self.app.inventory.id_registry.get_history(row['unique_id'])
         
         if not history:
             self.txt_timeline.insert(tk.END, "INITIAL ENTRY\n", ("status", "center"))
             self.txt_timeline.insert(tk.END, f"Recorded on {row.get('last_updated')}\n", ("date", "center"))
         else:
-            history = sorted(history, key=lambda x: x.get('ts', ''))
-            
             for i, h in enumerate(history):
                 disp_action = h.get('action')
                 details = h.get('details', '')
@@ -627,7 +623,7 @@ class StatusScreen(BaseScreen):
             if status == "OUT" and self.var_auto_inv.get():
                 try:
                     self._generate_silent_invoice(self.batch_list, buyer, self.ent_inv_date.get(), self.var_tax_inc.get())
-                    messagebox.showinfo("Done", f"Updated {count} items & Generated Invoice.")
+                    messagebox.showinfo("Done", f"Updated {count} items. Invoice is being generated.")
                 except Exception as e:
                     messagebox.showinfo("Done", f"Updated {count} items.\nWarning: Invoice failed {e}")
             else:
@@ -674,7 +670,7 @@ class StatusScreen(BaseScreen):
             
             if status == "OUT" and self.var_auto_inv.get():
                 self._generate_silent_invoice([self.current_item], updates.get('buyer'), self.ent_inv_date.get(), self.var_tax_inc.get())
-                messagebox.showinfo("Success", f"Item marked as {status}\nInvoice Generated.")
+                messagebox.showinfo("Success", f"Item marked as {status}\nInvoice is being generated.")
             else:
                 messagebox.showinfo("Success", f"Item marked as {status}")
             
@@ -734,28 +730,9 @@ class StatusScreen(BaseScreen):
         save_path = self.app.app_config.get_invoices_dir() / filename
         inv_num = f"INV-{ts}"
         
-        success, verify_hash, pdf_total = self.app.billing.generate_invoice(cart, buyer, inv_num, str(save_path))
-        
-        if success:
-            try:
-                import json
-                from pathlib import Path
-                from core.config import CONFIG_DIR
-                reg_path = CONFIG_DIR / "invoice_registry.json"
-                reg_path.parent.mkdir(parents=True, exist_ok=True)
-                registry = {}
-                if reg_path.exists():
-                    with open(reg_path, 'r') as f: registry = json.load(f)
-                    
-                registry[verify_hash] = {
-                    "inv_no": inv_num,
-                    "date": date_str,
-                    "amount": f"{pdf_total:.2f}",
-                    "buyer": buyer_name
-                }
-                with open(reg_path, 'w') as f: json.dump(registry, f, indent=4)
-            except:
-                pass
+        # Rendered on the invoice worker so the counter isn't blocked
+        self.app.generate_invoice_async(cart, buyer, inv_num, save_path,
+                                        on_done=lambda path: self._log(f"Invoice {inv_num} saved"))
 
 class EditDataScreen(BaseScreen):
     def __init__(self, parent, app_context):
@@ -144,6 +144,8 @@ class SettingsScreen(BaseScreen):
         r = 0
         r = add_entry(tab_print, "Label Width (mm):", "label_width_mm", r, width=10)
         r = add_entry(tab_print, "Label Height (mm):", "label_height_mm", r, width=10)
+        r = add_entry(tab_print, "ZPL Printer Target:", "label_printer_target", r)
+        ttk.Label(tab_print, text="(Blank = default printer, or tcp://192.168.1.50:9100, file:///dev/usb/lp0)", font=('Segoe UI', 9), foreground='gray').grid(row=r, column=0, columnspan=2, sticky=tk.W)
 
         # --- Tab 3: Invoice ---
         tab_inv = ttk.Frame(tabs, padding=20)
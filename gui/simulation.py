@@ -2,13 +2,17 @@ import tkinter as tk
 from tkinter import ttk
 import ttkbootstrap as tb
 
+# Percent offsets around the chosen value shown in the sensitivity table
+SENSITIVITY_OFFSETS = (-10, -5, -2, 0, 2, 5, 10)
+
 class PriceSimulationDialog(tb.Toplevel):
-    def __init__(self, parent, current_params=None):
+    def __init__(self, parent, current_params=None, analytics=None):
         super().__init__(parent)
         self.title("Analytics Simulation Mode")
-        self.geometry("500x450")
+        self.geometry("560x680" if analytics else "500x450")
         self.result = None
         self.current_params = current_params or {}
+        self.analytics = analytics
         self._init_ui()
         self.transient(parent)
         self.grab_set()
@@ -63,6 +67,19 @@ class PriceSimulationDialog(tb.Toplevel):
         # Example Label
         self.lbl_example = ttk.Label(f_controls, text="", foreground="#17a2b8", font=('Segoe UI', 9))
         self.lbl_example.grid(row=4, column=0, columnspan=3, pady=15)
+
+        # Sensitivity table over the real inventory (one grid evaluation per edit)
+        self.tree_sens = None
+        if self.analytics:
+            f_sens = ttk.LabelFrame(self, text=" Sensitivity (Current Inventory) ", padding=10)
+            f_sens.pack(fill=tk.BOTH, expand=True, padx=20)
+            cols = ('percent', 'total_value', 'total_cost', 'est_profit', 'realized_profit')
+            self.tree_sens = ttk.Treeview(f_sens, columns=cols, show='headings', height=len(SENSITIVITY_OFFSETS))
+            for col, text in zip(cols, ("Percent", "Stock Value", "Stock Cost", "Est. Profit", "Realized Profit")):
+                self.tree_sens.heading(col, text=text)
+                self.tree_sens.column(col, width=90, anchor='e')
+            self.tree_sens.tag_configure('current', background='#17a2b8', foreground='white')
+            self.tree_sens.pack(fill=tk.BOTH, expand=True)
         
         # Buttons
         f_btns = ttk.Frame(self)
@@ -106,6 +123,26 @@ class PriceSimulationDialog(tb.Toplevel):
             self.lbl_example.config(text=txt)
         except:
             self.lbl_example.config(text="Invalid input")
+        self._update_sensitivity()
+
+    def _update_sensitivity(self):
+        if not self.tree_sens:
+            return
+        for i in self.tree_sens.get_children(): self.tree_sens.delete(i)
+        try:
+            pct, flat = self.var_pct.get(), self.var_flat.get()
+        except (tk.TclError, ValueError):
+            return
+        percents = [pct + d for d in SENSITIVITY_OFFSETS]
+        grid = self.analytics.get_simulation_grid(percents, [flat], self.var_target.get(), self.var_base.get())
+        for d, ((p, _), row) in zip(SENSITIVITY_OFFSETS, grid.iterrows()):
+            self.tree_sens.insert('', tk.END, values=(
+                f"{p:+.1f}%",
+                f"₹{row['total_value']:,.0f}",
+                f"₹{row['total_cost']:,.0f}",
+                f"₹{row['est_profit']:,.0f}",
+                f"₹{row['realized_profit']:,.0f}",
+            ), tags=('current',) if d == 0 else ())
 
     def apply(self):
         self.result = {
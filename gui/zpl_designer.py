@@ -4,12 +4,12 @@ import ttkbootstrap as tb
 from PIL import Image, ImageTk, ImageDraw, ImageFont
 import math
 import re
-import requests
 import threading
 import io
 import time
 import os
 from .base import BaseScreen
+from core.zpl_renderer import ZPLRenderer
 
 class ZPLDesignerScreen(BaseScreen):
     def __init__(self, parent, app_context):
@@ -30,6 +30,7 @@ class ZPLDesignerScreen(BaseScreen):
         # Preview State
         self.debounce_timer = None
         self.last_zpl_sent = ""
+        self.preview_renderer = ZPLRenderer()  # Offline, cached previews
         
         # Load Configured Dimensions
         self.label_w_mm = self.config.get('label_width_mm', 104) # Default to ~830 dots (2-up)
@@ -336,11 +337,12 @@ class ZPLDesignerScreen(BaseScreen):
     def _trigger_preview_update(self, zpl_code):
         if self.debounce_timer:
             self.debounce_timer.cancel()
-        self.debounce_timer = threading.Timer(1.5, lambda: self._fetch_labelary_preview(zpl_code))
+        # Local rendering is cheap; the short debounce only coalesces keystrokes
+        self.debounce_timer = threading.Timer(0.2, lambda: self._render_local_preview(zpl_code))
         self.debounce_timer.start()
         self.lbl_preview_loading.config(text="Update pending...")
 
-    def _fetch_labelary_preview(self, zpl):
+    def _render_local_preview(self, zpl):
         # Apply 2-Up Logic for Preview ONLY
         final_zpl = zpl
         
@@ -372,21 +374,12 @@ class ZPLDesignerScreen(BaseScreen):
         self.last_zpl_sent = final_zpl
         
         try:
-            # 8 dpmm = 203 dpi
-            # Use current canvas width for preview request to ensure it fits
-            w_inch = self.dots_w / 203.0
-            h_inch = self.dots_h / 203.0
-            
-            url = f"https://api.labelary.com/v1/printers/8dpmm/labels/{w_inch:.1f}x{h_inch:.1f}/0/"
-            response = requests.post(url, data=final_zpl, headers={'Accept': 'image/png'})
-            
-            if response.status_code == 200:
-                 self.app.after(0, lambda: self._update_preview_image(response.content))
-            else:
-                 self.app.after(0, lambda: self._update_loading_text("Preview Error"))
-                
+            # Canvas size is used when the template has no ^PW/^LL
+            png = self.preview_renderer.render_png(final_zpl, self.dots_w, self.dots_h)
+            self.app.after(0, lambda: self._update_preview_image(png))
         except Exception as e:
-            self.app.after(0, lambda: self._update_loading_text("Offline"))
+            print(f"Preview render error: {e}")
+            self.app.after(0, lambda: self._update_loading_text("Preview Error"))
 
     def _update_loading_text(self, text):
         if self.winfo_exists():
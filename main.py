@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 
 # Fix for PyInstaller + Pillow
 try:
@@ -10,6 +11,7 @@ except ImportError:
 from gui.app import MainApp
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Frozen builds: label PDF export uses worker processes
     app = MainApp()
     app.protocol("WM_DELETE_WINDOW", app.on_close)
     app.mainloop()
@@ -0,0 +1,107 @@
+import unittest
+import json
+import shutil
+import tempfile
+import time
+import datetime
+from pathlib import Path
+from core.activity_log import ActivityLogger
+
+class TestActivityLog(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.config = {'output_folder': self.test_dir}
+        self.loggers = []
+
+    def tearDown(self):
+        for logger in self.loggers:
+            logger.close()
+        shutil.rmtree(self.test_dir)
+
+    def _logger(self, **kwargs):
+        logger = ActivityLogger(self.config, **kwargs)
+        self.loggers.append(logger)
+        return logger
+
+    def test_log_order_and_pending(self):
+        logger = self._logger(flush_interval=60)
+        for i in range(5):
+            logger.log("ADD", f"item {i}")
+        # Not flushed yet, but still visible
+        self.assertEqual([e['details'] for e in logger.get_logs(3)], ["item 4", "item 3", "item 2"])
+        self.assertTrue(logger.flush())
+        lines = logger.log_file.read_text().splitlines()
+        self.assertEqual([json.loads(l)['details'] for l in lines], [f"item {i}" for i in range(5)])
+        self.assertEqual(len(logger.get_logs(100)), 5)
+
+    def test_rotation(self):
+        logger = self._logger(max_bytes=2000, backup_count=2)
+        for i in range(100):
+            logger.log("SALE", f"entry {i:03d}")
+            if i % 10 == 9:
+                logger.flush()
+        logger.flush()
+        files = sorted(p.name for p in logger.log_dir.glob("activity*.jsonl"))
+        self.assertEqual(files, ["activity.1.jsonl", "activity.2.jsonl", "activity.jsonl"])
+        logs = logger.get_logs(20)
+        self.assertEqual(logs[0]['details'], "entry 099")
+        # Newest first, continuous across the file boundary
+        self.assertEqual([e['details'] for e in logs], [f"entry {i:03d}" for i in range(99, 79, -1)])
+
+    def test_query_time_range(self):
+        logger = self._logger(max_bytes=50 * 1024)
+        before = datetime.datetime.now()
+        for i in range(2000):
+            logger.log("EDIT" if i % 2 else "ADD", f"row {i}")
+        logger.flush()
+        middle = datetime.datetime.now()
+        for i in range(5):
+            logger.log("SALE", f"late {i}")
+        logger.flush()
+
+        late = logger.query(start=middle)
+        self.assertEqual([e['details'] for e in late], [f"late {i}" for i in range(4, -1, -1)])
+        self.assertEqual(len(logger.query(start=before, end=middle, action="ADD")), 1000)
+        self.assertEqual(len(logger.query(action="SALE", limit=2)), 2)
+        self.assertTrue(any(p.suffix == ".idx" for p in logger.log_dir.iterdir()))
+
+    def test_legacy_migration(self):
+        log_dir = Path(self.test_dir) / "logs"
+        log_dir.mkdir()
+        legacy = [{"timestamp": "2024-01-02T10:00:00", "action": "B", "details": "new"},
+                  {"timestamp": "2024-01-01T10:00:00", "action": "A", "details": "old"}]
+        with open(log_dir / "activity.json", 'w') as f:
+            json.dump(legacy, f)
+        logger = self._logger()
+        self.assertFalse((log_dir / "activity.json").exists())
+        self.assertEqual([e['details'] for e in logger.get_logs()], ["new", "old"])
+        logger.log("C", "newest")
+        self.assertEqual(logger.get_logs(1)[0]['details'], "newest")
+
+    def test_clear(self):
+        logger = self._logger()
+        logger.log("ADD", "x")
+        logger.flush()
+        logger.log("ADD", "y")
+        logger.clear()
+        self.assertEqual(logger.get_logs(), [])
+        logger.log("ADD", "z")
+        logger.flush()
+        self.assertEqual([e['details'] for e in logger.get_logs()], ["z"])
+
+    def test_log_is_cheap(self):
+        logger = self._logger()
+        for i in range(5000):
+            logger.log("ADD", "warmup")
+        logger.flush()
+        start = time.perf_counter()
+        for i in range(20000):
+            logger.log("ADD", f"item {i}")
+        per_call = (time.perf_counter() - start) / 20000
+        print(f"\n[Benchmark] ActivityLogger.log: {per_call * 1e6:.1f}us/call")
+        self.assertLess(per_call, 0.001)
+        self.assertTrue(logger.flush(10))
+        self.assertEqual(logger.get_logs(1)[0]['details'], "item 19999")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,295 @@
+import unittest
+import datetime
+import time
+import types
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock, patch
+from core.analytics import (
+    AnalyticsManager, AnalyticsCache, InventoryAggregates, DIM_BRAND, DIM_STATUS,
+    compute_dashboard_metrics, model_families, simulate_scenarios, SIM_METRICS
+)
+from core.inventory import InventoryManager
+from core.config import ConfigManager
+
+def _expected_summary(df):
+    """Straight pandas version of the dashboard KPIs."""
+    status = df['status'].astype(str).str.upper().str.strip()
+    stock, sold = df[status == 'IN'], df[status == 'OUT']
+    return {
+        "total_items": len(stock),
+        "total_value": stock['price'].sum(),
+        "total_cost": stock['price_original'].sum(),
+        "realized_sales": sold['price'].sum(),
+        "realized_profit": sold['price'].sum() - sold['price_original'].sum(),
+        "status_counts": status.value_counts().to_dict(),
+        "supplier_dist": df['supplier'].value_counts().to_dict(),
+    }
+
+def _make_df(n, seed=0):
+    rng = np.random.default_rng(seed)
+    models = np.array(["Redmi 14C", "Vivo V27", "Oppo A78", "Samsung A15", "iPhone 13"])
+    price = rng.integers(5000, 60000, n).astype(float)
+    return pd.DataFrame({
+        'unique_id': [str(i) for i in range(n)],
+        'model': models[rng.integers(0, len(models), n)],
+        'supplier': np.array(["S1", "S2", "S3"])[rng.integers(0, 3, n)],
+        'status': np.array(["IN", "OUT", " in", "RTN"])[rng.integers(0, 4, n)],
+        'price': price,
+        'price_original': price * 0.8,
+        'imei': [f"35{i:013d}" for i in range(n)],
+        'buyer': np.array(["Walk-in Customer", "Dealer A ", "Dealer B"])[rng.integers(0, 3, n)],
+        'source_file': "stock.xlsx",
+    })
+
+class TestInventoryAggregates(unittest.TestCase):
+    def setUp(self):
+        config = MagicMock(spec=ConfigManager)
+        config.mappings = {}
+        config.get.return_value = 0.0
+        self.inventory = InventoryManager(config)
+        registry = MagicMock()
+        registry.get_metadata.return_value = {}
+        self.inventory.id_registry = registry
+        self.inventory.inventory_df = _make_df(500)
+        self.analytics = AnalyticsManager(self.inventory)
+
+    def _assert_matches_frame(self):
+        expected = _expected_summary(self.inventory.get_inventory())
+        summary = self.analytics.get_summary()
+        for key in ("total_items", "total_value", "total_cost", "realized_sales", "realized_profit"):
+            self.assertAlmostEqual(summary[key], expected[key], places=4, msg=key)
+        self.assertEqual(summary["status_counts"], expected["status_counts"])
+        self.assertEqual(summary["supplier_dist"], expected["supplier_dist"])
+
+    def test_summary_matches_dataframe(self):
+        self._assert_matches_frame()
+        top = self.analytics.get_summary()["top_models"]
+        self.assertEqual(top, self.inventory.get_inventory()['model'].value_counts().head(5).to_dict())
+
+    def test_rebuild_retries_when_rows_change(self):
+        aggregates = self.analytics.aggregates
+        df = self.inventory.get_inventory()
+        uid = str(df.loc[df['status'] != 'OUT', 'unique_id'].iloc[0])
+        aggregate = aggregates._aggregate
+        snapshots = []
+        def racing(frame):
+            if not snapshots:
+                frame = frame.copy()  # Snapshot taken, then the Tk thread edits a row
+                self.inventory.update_item_status(uid, "OUT")
+            snapshots.append(frame)
+            return aggregate(frame)
+        with patch.object(aggregates, '_aggregate', side_effect=racing):
+            aggregates.rebuild()
+        self.assertEqual(len(snapshots), 2)
+        self._assert_matches_frame()
+
+    def test_incremental_updates(self):
+        self._assert_matches_frame()
+        rebuild = MagicMock(wraps=self.analytics.aggregates.rebuild)
+        self.analytics.aggregates.rebuild = rebuild
+
+        self.inventory.update_item_status("3", "OUT")
+        self.inventory.update_item_status("4", "IN")
+        self.inventory.update_item_data("5", {'price': 12345.0, 'model': "Nokia 105"})
+        self.inventory.write_queue.join()
+        rebuild.assert_not_called()
+        self._assert_matches_frame()
+        self.assertEqual(self.analytics.aggregates.group('model', "Nokia 105")['count'], 1)
+        self.assertEqual(self.analytics.aggregates.counts(DIM_BRAND)["NOKIA"], 1)
+
+        # A full reload event rebuilds
+        self.inventory._emit_rows("RELOAD", None)
+        rebuild.assert_called_once()
+        self._assert_matches_frame()
+
+    def test_duplicate_uid_rows(self):
+        df = _make_df(4)
+        df.loc[1, 'unique_id'] = "0"  # Same item listed in two files
+        self.inventory.inventory_df = df
+        self.analytics.aggregates.rebuild()
+        self.inventory.update_item_status("0", "OUT")
+        self.assertEqual(self.analytics.aggregates.group(DIM_STATUS, 'OUT')['count'],
+                         int((self.inventory.inventory_df['status'].str.strip().str.upper() == 'OUT').sum()))
+        self._assert_matches_frame()
+
+    def test_simulation(self):
+        aggregates = InventoryAggregates()
+        aggregates.rebuild(pd.DataFrame({
+            'unique_id': ['1', '2', '3'], 'model': ['A x', 'A y', 'B'], 'supplier': ['S', 'S', 'T'],
+            'status': ['IN', 'IN', 'OUT'], 'price': [100.0, 200.0, 50.0], 'price_original': [80.0, np.nan, 40.0],
+        }))
+        plain = aggregates.summary()
+        self.assertEqual((plain['total_value'], plain['total_cost']), (300.0, 80.0))
+        sim = aggregates.summary({'enabled': True, 'target': 'cost', 'base': 'price', 'percent': -10, 'flat': 5})
+        self.assertAlmostEqual(sim['total_cost'], 300 * 0.9 + 10)
+        self.assertAlmostEqual(sim['realized_profit'], 50 - (50 * 0.9 + 5))
+        sim = aggregates.summary({'enabled': True, 'target': 'price', 'base': 'cost', 'percent': 50, 'flat': 0})
+        self.assertAlmostEqual(sim['total_value'], 120.0)  # NaN cost stays out of the sum
+        self.assertEqual(aggregates.counts(DIM_BRAND), {"A": 2, "B": 1})
+
+    def test_constant_time_summary(self):
+        self.inventory.inventory_df = _make_df(100000)
+        self.analytics.aggregates.rebuild()
+        start = time.perf_counter()
+        for _ in range(100):
+            self.analytics.get_summary()
+        per_call = (time.perf_counter() - start) / 100
+        print(f"\n[Benchmark] get_summary on 100k items: {per_call * 1000:.3f}ms")
+        self.assertLess(per_call, 0.01)
+
+class TestAnalyticsCache(unittest.TestCase):
+    setUp = TestInventoryAggregates.setUp
+
+    def test_memoized_until_change(self):
+        cache = self.analytics.cache
+        first = self.analytics.get_dashboard_metrics()
+        self.assertIs(self.analytics.get_dashboard_metrics(), first)
+        sim = {'enabled': True, 'target': 'cost', 'base': 'price', 'percent': 5}
+        self.assertIs(self.analytics.get_summary(sim), self.analytics.get_summary(dict(sim)))
+        self.assertIsNot(self.analytics.get_summary(sim), self.analytics.get_summary())
+        self.analytics.get_demand_forecast()
+        self.analytics.get_demand_forecast()
+        self.assertEqual(cache.stats()['hits'], 4)
+
+        generation = self.inventory.generation
+        self.inventory.update_item_status("7", "OUT")
+        self.assertEqual(self.inventory.generation, generation + 1)
+        self.assertEqual(cache.stats()['size'], 0)
+        updated = self.analytics.get_dashboard_metrics()
+        self.assertIsNot(updated, first)
+        buyers = self.analytics.get_buyer_stats()
+        self.assertIs(self.analytics.get_buyer_stats(), buyers)
+        sold = self.inventory.get_inventory().query("status == 'OUT'")
+        self.assertEqual(sum(items for _, items, _ in buyers), len(sold))
+        self.assertIn("Dealer A", [b for b, _, _ in buyers])
+
+    def test_dashboard_recomputed_next_day(self):
+        first = self.analytics.get_dashboard_metrics()
+        class Tomorrow(datetime.date):
+            @classmethod
+            def today(cls):
+                return datetime.date.today() + datetime.timedelta(days=1)
+        later = types.SimpleNamespace(date=Tomorrow, datetime=datetime.datetime, timedelta=datetime.timedelta)
+        with patch('core.analytics.datetime', later):
+            self.assertIsNot(self.analytics.get_dashboard_metrics(), first)  # Same generation, new day
+
+    def test_lru_bound(self):
+        cache = AnalyticsCache(max_entries=2)
+        calls = []
+        compute = lambda name: (lambda: calls.append(name) or name)
+        cache.get(1, "a", None, compute("a"))
+        cache.get(1, "b", None, compute("b"))
+        cache.get(1, "a", None, compute("a"))  # Hit; 'a' becomes most recent
+        cache.get(1, "c", None, compute("c"))  # Evicts 'b'
+        cache.get(1, "b", None, compute("b"))
+        cache.get(2, "a", None, compute("a"))  # New generation: miss
+        self.assertEqual(calls, ["a", "b", "c", "b", "a"])
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 5, "size": 2})
+
+class TestSimulationGrid(unittest.TestCase):
+    setUp = TestInventoryAggregates.setUp
+
+    def test_grid_matches_summary(self):
+        percents, flats = [-20, -8, 0, 12.5], [0, 150]
+        for target in ('cost', 'price'):
+            for base in ('cost', 'price'):
+                grid = self.analytics.get_simulation_grid(percents, flats, target, base)
+                self.assertEqual(grid.shape, (len(percents) * len(flats), len(SIM_METRICS)))
+                for (pct, flat), row in grid.iterrows():
+                    summary = self.analytics.aggregates.summary(
+                        {'enabled': True, 'target': target, 'base': base, 'percent': pct, 'flat': flat})
+                    for metric in SIM_METRICS:
+                        self.assertAlmostEqual(row[metric], summary[metric], places=4, msg=(target, base, metric))
+        # Computed directly: dialog keystrokes must not churn the shared cache
+        self.assertEqual(self.analytics.cache.stats()['size'], 0)
+
+    def test_large_grid(self):
+        stock, sold = [10, 1000.0, 10, 800.0, 9], [4, 500.0, 4, 300.0, 4]
+        percents, flats = np.linspace(-50, 50, 201), np.linspace(-500, 500, 101)
+        start = time.perf_counter()
+        grid = simulate_scenarios(stock, sold, percents, flats, target='price', base='cost')
+        elapsed = time.perf_counter() - start
+        print(f"\n[Benchmark] simulate_scenarios 201x101 grid: {elapsed * 1000:.2f}ms")
+        self.assertEqual(len(grid), 201 * 101)
+        self.assertAlmostEqual(grid.loc[(50.0, 500.0), 'total_value'], 800 * 1.5 + 500 * 9)
+        self.assertAlmostEqual(grid.loc[(0.0, 0.0), 'realized_profit'], 0.0)
+        self.assertTrue((grid['total_cost'] == 800.0).all())
+
+def _rowwise_dashboard(df, now):
+    """The original per-row dashboard logic, kept as the reference."""
+    def parse(d):
+        if isinstance(d, str):
+            d = datetime.datetime.fromisoformat(d)
+        return d if isinstance(d, datetime.datetime) else None
+    def safe(fn, default):
+        def wrapped(row):
+            try:
+                return fn(row)
+            except Exception:
+                return default
+        return wrapped
+    fam = lambda x: " ".join(str(x).split()[:2])
+    available = df[df['status'] == 'IN'].copy()
+    sold = df[df['status'].isin(['OUT', 'SOLD'])]
+    this_month = safe(lambda r: bool(parse(r['last_updated'])) and parse(r['last_updated']).month == now.month
+                      and parse(r['last_updated']).year == now.year, False)
+    age = safe(lambda r: (now - parse(r['last_updated'])).days, 0)
+    recent = safe(lambda r: (now - parse(r['last_updated'])).days <= 30, False)
+    available['age_days'] = available.apply(age, axis=1)
+    aging = available[available['age_days'] > 60]
+    fam_counts = available['model'].apply(fam).value_counts()
+    recent_sold = sold[sold.apply(recent, axis=1)]
+    return {
+        "sold_month": int(sold.apply(this_month, axis=1).sum()),
+        "aging": len(aging),
+        "max_age": int(aging['age_days'].max()) if len(aging) else None,
+        "low": dict(fam_counts[fam_counts < 2]),
+        "top": dict(recent_sold['model'].apply(fam).value_counts().head(10)),
+    }
+
+class TestDashboardMetrics(unittest.TestCase):
+    def _frame(self, n, now):
+        df = _make_df(n, seed=1)
+        df['model'] = df['model'] + np.where(np.arange(n) % 7 == 0, " Pro Max", "")
+        df.loc[n - 1, 'model'] = "Lonely Phone X"
+        offsets = np.random.default_rng(2).integers(0, 120, n)
+        stamps = [now - datetime.timedelta(days=int(d), hours=3) for d in offsets]
+        df['last_updated'] = [s.isoformat() if i % 3 else s for i, s in enumerate(stamps)]
+        df['status'] = np.array(["IN", "OUT", "SOLD", "RTN"])[np.arange(n) % 4]
+        df.loc[n - 1, 'status'] = "IN"
+        df.loc[5, 'last_updated'] = "not a date"
+        return df
+
+    def test_matches_rowwise(self):
+        now = datetime.datetime(2024, 6, 20, 12, 0)
+        df = self._frame(2000, now)
+        metrics = compute_dashboard_metrics(df, now=now)
+        expected = _rowwise_dashboard(df, now)
+        self.assertEqual(metrics.sold_this_month, expected["sold_month"])
+        self.assertEqual(metrics.aging_count, expected["aging"])
+        self.assertEqual(metrics.aging_rows[0][1], expected["max_age"])
+        self.assertEqual(len(metrics.aging_rows), 20)
+        self.assertEqual(dict(metrics.low_stock), expected["low"])
+        self.assertIn(("Lonely Phone", 1), metrics.low_stock)
+        self.assertEqual(dict(metrics.top_sellers), expected["top"])
+        self.assertEqual(metrics.stock_count, int((df['status'] == 'IN').sum()))
+
+    def test_families_and_empty(self):
+        fams = model_families(pd.Series(["Redmi Note 13 Pro", "iPhone", "  Vivo   V27 ", ""]))
+        self.assertEqual(fams.tolist(), ["Redmi Note", "iPhone", "Vivo V27", ""])
+        empty = compute_dashboard_metrics(pd.DataFrame())
+        self.assertEqual((empty.stock_count, empty.aging_rows, empty.top_sellers), (0, [], []))
+
+    def test_benchmark_100k(self):
+        now = datetime.datetime.now()
+        df = self._frame(100000, now)
+        start = time.perf_counter()
+        metrics = compute_dashboard_metrics(df, now=now)
+        elapsed = time.perf_counter() - start
+        print(f"\n[Benchmark] DashboardMetrics on 100k rows: {elapsed:.3f}s")
+        self.assertGreater(metrics.stock_count, 0)
+        self.assertLess(elapsed, 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import threading
+from core.analytics_worker import AnalyticsWorker
+
+class TestAnalyticsWorker(unittest.TestCase):
+    def setUp(self):
+        self.worker = AnalyticsWorker()
+        self.results = []
+        self.done = threading.Event()
+
+    def tearDown(self):
+        self.worker.shutdown(wait=True)
+
+    def _collect(self, result):
+        self.results.append(result)
+        if result.section == "last":
+            self.done.set()
+
+    def test_sections_arrive_in_order(self):
+        rid = self.worker.submit('analytics', [("kpis", lambda: 1), ("boom", lambda: 1 / 0), ("last", lambda: 3)],
+                                 self._collect)
+        self.assertTrue(self.done.wait(5))
+        self.assertEqual([r.section for r in self.results], ["kpis", "boom", "last"])
+        self.assertEqual({r.request_id for r in self.results}, {rid})
+        self.assertEqual(self.results[0].data, 1)
+        self.assertFalse(self.results[1].ok)
+        self.assertIsInstance(self.results[1].error, ZeroDivisionError)
+        self.assertTrue(self.worker.is_current('analytics', rid))
+
+    def test_superseded_and_cancelled_requests(self):
+        gate, started = threading.Event(), threading.Event()
+        def slow():
+            started.set()
+            gate.wait(5)
+            return "stale"
+        first = self.worker.submit('analytics', [("slow", slow), ("skipped", lambda: "never")], self._collect)
+        started.wait(5)
+        # Another channel is independent
+        self.worker.submit('dashboard', [("other", lambda: "ok")], self._collect)
+        second = self.worker.submit('analytics', [("last", lambda: "fresh")], self._collect)
+        gate.set()
+        self.assertTrue(self.done.wait(5))
+        self.assertFalse(self.worker.is_current('analytics', first))
+        self.assertEqual([(r.section, r.data) for r in self.results], [("other", "ok"), ("last", "fresh")])
+        self.assertEqual(self.results[-1].request_id, second)
+
+        self.worker.cancel('analytics')
+        self.assertFalse(self.worker.is_current('analytics', second))
+
+    def test_submit_after_shutdown(self):
+        self.worker.shutdown()
+        self.assertIsNone(self.worker.submit('analytics', [("kpis", lambda: 1)], self._collect))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import gzip
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from core.backup_manager import BackupManager
+
+class TestBackupManager(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.backup_dir = Path(self.test_dir) / "backups"
+        self.src = Path(self.test_dir) / "stock.xlsx"
+        self._bump = 0
+        self._write(b"version-1" * 1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, content):
+        self.src.write_bytes(content)
+        # Make the change visible even on coarse mtime filesystems
+        st = self.src.stat()
+        os.utime(self.src, (st.st_atime, st.st_mtime + self._bump))
+        self._bump += 1
+
+    def _objects(self):
+        return sorted((self.backup_dir / "objects").rglob("*.gz"))
+
+    def test_dedup_and_window(self):
+        mgr = BackupManager(self.backup_dir, window=60)
+        first = mgr.backup(self.src)
+        self.assertTrue(Path(first).exists())
+        with gzip.open(first, 'rb') as f:
+            self.assertEqual(f.read(), self.src.read_bytes())
+
+        # Inside the window: no new backup even if content changed
+        self._write(b"version-2" * 1000)
+        self.assertEqual(mgr.backup(self.src), first)
+        self.assertEqual(len(self._objects()), 1)
+
+        # Same content after the window: still one object
+        mgr.window = 0
+        self._write(b"version-1" * 1000)
+        self.assertEqual(mgr.backup(self.src), first)
+        self.assertEqual(len(self._objects()), 1)
+        self.assertEqual(len(mgr.list_backups(self.src)), 1)
+
+    def test_rotation_and_shared_objects(self):
+        mgr = BackupManager(self.backup_dir, window=0, max_backups=3)
+        other = Path(self.test_dir) / "copy.xlsx"
+        shutil.copy(self.src, other)
+        mgr.backup(other)
+        for i in range(6):
+            self._write(f"v{i}".encode() * 500)
+            mgr.backup(self.src)
+        versions = mgr.list_backups(self.src)
+        self.assertEqual(len(versions), 3)
+        self.assertEqual(versions[0]['size'], len(b"v5") * 500)
+        # copy.xlsx's object is still referenced, plus 3 current versions
+        self.assertEqual(len(self._objects()), 4)
+
+        # Index is persisted and reloaded without scanning
+        reloaded = BackupManager(self.backup_dir, window=0, max_backups=3)
+        self.assertEqual([v['hash'] for v in reloaded.list_backups(self.src)], [v['hash'] for v in versions])
+
+    def test_restore(self):
+        mgr = BackupManager(self.backup_dir, window=0)
+        mgr.backup(self.src)
+        original = self.src.read_bytes()
+        self._write(b"corrupted")
+        oldest = mgr.list_backups(self.src)[-1]['hash']
+
+        restored = mgr.restore(self.src, oldest)
+        self.assertEqual(Path(restored).read_bytes(), original)
+        # The overwritten content was backed up first
+        self.assertEqual(len(mgr.list_backups(self.src)), 2)
+
+        dest = Path(self.test_dir) / "restored.xlsx"
+        mgr.restore(self.src, dest=dest)
+        self.assertEqual(dest.read_bytes(), b"corrupted")
+        self.assertIsNone(mgr.restore(Path(self.test_dir) / "missing.xlsx"))
+
+    def test_busy_afternoon(self):
+        mgr = BackupManager(self.backup_dir)
+        start = time.perf_counter()
+        for i in range(300):
+            self.assertIsNotNone(mgr.backup(self.src))
+        elapsed = time.perf_counter() - start
+        print(f"\n[Benchmark] 300 backup calls: {elapsed:.3f}s, {len(self._objects())} object(s)")
+        self.assertEqual(len(self._objects()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
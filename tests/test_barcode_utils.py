@@ -0,0 +1,42 @@
+import unittest
+import time
+from unittest.mock import MagicMock
+from core.barcode_utils import BarcodeGenerator, load_font, render_code128, BARCODE_QUIET_MODULES
+from core.code128 import code128_modules
+
+class TestBarcodeUtils(unittest.TestCase):
+    def setUp(self):
+        config = MagicMock()
+        config.get.side_effect = lambda key, default=None: default
+        self.gen = BarcodeGenerator(config)
+
+    def test_font_cache(self):
+        self.assertIs(load_font("Arial", 20), load_font("Arial", 20))
+        self.assertIsNot(load_font("Arial", 20), load_font("Arial", 21))
+
+    def test_barcode_pattern_and_cache(self):
+        data = "MSM000123"
+        modules = code128_modules(data)
+        width = (len(modules) + 2 * BARCODE_QUIET_MODULES) * 3
+        img = self.gen.generate_barcode_image(data, (width, 40))
+        self.assertEqual(img.size, (width, 40))
+        self.assertIs(img, render_code128(data, width, 40))
+
+        # Integer module width: each module is exactly 3 pixels
+        row = [img.getpixel((x, 20)) for x in range(width)]
+        decoded = "".join('1' if row[x] == 0 else '0' for x in range(BARCODE_QUIET_MODULES * 3, width - BARCODE_QUIET_MODULES * 3, 3))
+        self.assertEqual(decoded, modules)
+        self.assertTrue(all(v == 255 for v in row[:BARCODE_QUIET_MODULES * 3]))
+
+    def test_label_preview_batch(self):
+        items = [{'unique_id': f"MSM{i:05d}", 'model': 'Redmi 14C', 'ram_rom': '4/128', 'price': 9999} for i in range(200)]
+        start = time.perf_counter()
+        for item in items:
+            img = self.gen.generate_label_preview(item, 50, 22, dpi=203)
+        elapsed = time.perf_counter() - start
+        self.assertEqual(img.size, (399, 175))
+        print(f"\n[Benchmark] 200 label previews: {elapsed:.3f}s")
+        self.assertLess(elapsed, 5.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+import tempfile
+import shutil
+import os
+import time
+import datetime
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from core.exporters import (
+    export_excel, export_csv, export_parquet, export_pdf, export_word, ExportCancelled, pa, Document, Table
+)
+from core.reporting import ReportGenerator
+
+def _frame(n):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'unique_id': np.arange(1, n + 1),
+        'model': np.array(["Redmi 14C", "Vivo V27", None], dtype=object)[np.arange(n) % 3],
+        'imei': [f"35{i:013d}" for i in range(n)],
+        'price': rng.integers(5000, 60000, n).astype(float),
+        'date_sold': pd.Timestamp("2024-06-30 10:30") - pd.to_timedelta(np.arange(n) % 90, unit='D'),
+    })
+
+class TestStreamingExport(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _path(self, name):
+        return os.path.join(self.test_dir, name)
+
+    def test_excel_roundtrip_and_formats(self):
+        df = _frame(120)
+        df.loc[5, 'price'] = np.nan
+        df.loc[7, 'date_sold'] = pd.NaT
+        calls = []
+        export_excel(df, self._path("out.xlsx"), progress=lambda d, t: calls.append((d, t)), chunk_rows=50)
+        self.assertEqual(calls, [(50, 120), (100, 120), (120, 120)])
+
+        ws = load_workbook(self._path("out.xlsx")).active
+        rows = list(ws.iter_rows(values_only=True))
+        self.assertEqual(rows[0], tuple(df.columns))
+        self.assertEqual(len(rows), 121)
+        self.assertEqual(rows[1][:3], (1, "Redmi 14C", "350000000000000"))
+        self.assertIsNone(rows[3][1])
+        self.assertIsNone(rows[6][3])
+        self.assertIsNone(rows[8][4])
+        self.assertEqual(rows[1][4], datetime.datetime(2024, 6, 30, 10, 30))
+        self.assertEqual(ws.cell(row=2, column=4).number_format, '#,##0.00')
+        self.assertEqual(ws.cell(row=2, column=5).number_format, 'yyyy-mm-dd hh:mm')
+        self.assertTrue(ws.cell(row=1, column=1).font.b)
+
+    def test_cancel_leaves_no_file(self):
+        df = _frame(100)
+        target = self._path("out.xlsx")
+        chunks = []
+        cancel = lambda: len(chunks) >= 2
+        with self.assertRaises(ExportCancelled):
+            export_excel(df, target, progress=lambda d, t: chunks.append(d), cancel=cancel, chunk_rows=10)
+        self.assertEqual(os.listdir(self.test_dir), [])
+
+        success, msg = ReportGenerator(df).export(df, list(df.columns), 'csv', target, cancel=lambda: True)
+        self.assertFalse(success)
+        self.assertEqual(msg, "Export cancelled")
+        self.assertEqual(os.listdir(self.test_dir), [])
+
+    def test_csv_roundtrip(self):
+        df = _frame(1000)
+        export_csv(df, self._path("out.csv"), chunk_rows=300)
+        back = pd.read_csv(self._path("out.csv"), encoding='utf-8-sig', dtype={'imei': str})
+        self.assertEqual(list(back.columns), list(df.columns))
+        self.assertEqual(back['imei'].tolist(), df['imei'].tolist())
+        self.assertEqual(back['price'].sum(), df['price'].sum())
+        self.assertEqual(back.loc[0, 'date_sold'], "2024-06-30 10:30:00")
+
+    @unittest.skipIf(pa is None, "pyarrow not installed")
+    def test_parquet_roundtrip(self):
+        df = _frame(1000)
+        df['mixed'] = [i if i % 2 else str(i) for i in range(1000)]
+        export_parquet(df, self._path("out.parquet"), chunk_rows=300)
+        back = pd.read_parquet(self._path("out.parquet"))
+        self.assertEqual(len(back), 1000)
+        self.assertEqual(back['mixed'].iloc[1], "1")
+
+    def test_report_export_selects_columns(self):
+        df = _frame(10)
+        path = self._path("report.xlsx")
+        success, _ = ReportGenerator(df).export(df, ['model', 'price', 'missing'], 'excel', path, include_serial=True)
+        self.assertTrue(success)
+        rows = list(load_workbook(path).active.iter_rows(values_only=True))
+        self.assertEqual(rows[0], ('S.No', 'model', 'price'))
+        self.assertEqual(rows[10][0], 10)
+        self.assertNotIn('S.No', df.columns)
+        self.assertEqual(ReportGenerator(df).export(df, ['model'], 'xml', path)[0], False)
+
+    def test_pdf_pages_and_progress(self):
+        df = _frame(200)
+        calls = []
+        split = Table.split
+        splits = []
+        Table.split = lambda t, *a, **k: splits.append(1) or split(t, *a, **k)
+        try:
+            export_pdf(df, self._path("out.pdf"), progress=lambda d, t: calls.append((d, t)), title="Sold History")
+        finally:
+            Table.split = split
+        self.assertEqual(calls[-1], (200, 200))
+        self.assertEqual([d for d, _ in calls], sorted(d for d, _ in calls))
+        self.assertEqual(splits, [])  # Every chunk fits its page
+        with open(self._path("out.pdf"), 'rb') as f:
+            data = f.read()
+        self.assertTrue(data.startswith(b"%PDF"))
+
+        with self.assertRaises(ExportCancelled):
+            export_pdf(df, self._path("cancelled.pdf"), cancel=lambda: len(calls) > 1,
+                       progress=lambda d, t: calls.append(d))
+        self.assertFalse(os.path.exists(self._path("cancelled.pdf")))
+
+    @unittest.skipIf(Document is None, "python-docx not installed")
+    def test_word_table(self):
+        import docx
+        df = _frame(50)
+        df['model'] = df['model'].astype(object)
+        df.loc[4, 'model'] = "A&B <Pro>\x07"
+        calls = []
+        export_word(df, self._path("out.docx"), progress=lambda d, t: calls.append(d), chunk_rows=20)
+        self.assertEqual(calls, [20, 40, 50])
+        table = docx.Document(self._path("out.docx")).tables[0]
+        self.assertEqual(len(table.rows), 51)
+        self.assertEqual([c.text for c in table.rows[0].cells], list(df.columns))
+        self.assertEqual([c.text for c in table.rows[1].cells][:3], ["1", "Redmi 14C", "350000000000000"])
+        self.assertEqual(table.rows[3].cells[1].text, "")
+        self.assertEqual(table.rows[5].cells[1].text, "A&B <Pro>")
+        self.assertEqual(table.style.name, "Table Grid")
+
+    def test_benchmark_pdf_word_3k(self):
+        df = _frame(3000)
+        for fmt, exporter in (("PDF", export_pdf), ("Word", export_word)):
+            if exporter is export_word and Document is None:
+                continue
+            start = time.perf_counter()
+            exporter(df, self._path(f"big.{fmt.lower()}"))
+            elapsed = time.perf_counter() - start
+            print(f"\n[Benchmark] {fmt} export of 3k rows: {elapsed:.2f}s")
+            self.assertLess(elapsed, 10)
+
+    def test_benchmark_excel_20k(self):
+        df = _frame(20000)
+        start = time.perf_counter()
+        export_excel(df, self._path("big.xlsx"))
+        elapsed = time.perf_counter() - start
+        print(f"\n[Benchmark] Streaming Excel export of 20k rows: {elapsed:.2f}s")
+        self.assertLess(elapsed, 15)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import base64
+import json
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+from core.scraper import PhoneScraper, FetchScheduler, HostRateLimiter
+from core.tac_cache import TACCache
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad
+
+def _encrypted_results(name):
+    """Search page in GSMArena's encrypted KEY/IV/DATA form with one phone link."""
+    key, iv = b"k" * 16, b"i" * 16
+    data = AES.new(key, AES.MODE_CBC, iv).encrypt(pad(f'<a href="#"><strong>{name}</strong></a>'.encode(), AES.block_size))
+    b64 = lambda raw: base64.b64encode(raw).decode()
+    return f'<script>const KEY = "{b64(key)}"; const IV = "{b64(iv)}"; const DATA = "{b64(data)}";</script>'
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the IMEI API and GSMArena search."""
+    def do_GET(self):
+        server = self.server
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        with server.lock:
+            server.hits[parsed.path] = server.hits.get(parsed.path, 0) + 1
+            throttle = server.throttle_remaining > 0
+            if throttle:
+                server.throttle_remaining -= 1
+        if throttle:
+            self.send_response(429)
+            self.end_headers()
+            return
+
+        time.sleep(server.delay)
+        if parsed.path == "/api":
+            imei = query.get("imei", [""])[0]
+            body = json.dumps({"status": "succes", "object": {"model": f"M{imei[:8]}"}})
+        else:
+            body = _encrypted_results(f"Phone {query.get('sSearch', [''])[0]}")
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+class TestFetchScheduler(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+        self.server.lock = threading.Lock()
+        self.server.hits = {}
+        self.server.delay = 0.05
+        self.server.throttle_remaining = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        cache = TACCache(file_path=Path(self.test_dir) / "tac_cache.json")
+        self.scraper = PhoneScraper(tac_cache=cache, rate_limiter=HostRateLimiter(min_interval=0.0))
+        self.scraper.imei_api_url = f"{base}/api"
+        self.scraper.gsm_search_url = f"{base}/gsm"
+        self.scheduler = FetchScheduler(self.scraper, max_workers=2)
+
+    def tearDown(self):
+        self.scheduler.shutdown(wait=True)
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.test_dir)
+
+    def test_duplicate_imeis_coalesce(self):
+        f1 = self.scheduler.submit("861234560000011")
+        f2 = self.scheduler.submit("861234560000011")
+        self.assertIs(f1, f2)
+        self.assertEqual(f1.result(timeout=5)["model_code"], "M86123456")
+        self.assertEqual(self.server.hits["/api"], 1)
+
+    def test_same_tac_batch_single_round_trip(self):
+        imeis = [f"8612345600000{i:02d}" for i in range(6)]
+        futures = [self.scheduler.submit(i) for i in imeis]
+        names = {f.result(timeout=5)["name"] for f in futures}
+        self.assertEqual(len(names), 1)
+        self.assertEqual(self.server.hits["/api"], 1)
+
+        # Now cached: resolves immediately with no request
+        self.assertTrue(self.scheduler.submit("861234569999999").done())
+        self.assertEqual(self.server.hits["/api"], 1)
+        self.assertEqual(self.scheduler.pending_count(), 0)
+
+    def test_subscribe_callback(self):
+        done = threading.Event()
+        received = {}
+
+        def on_result(imei, data):
+            received[imei] = data
+            done.set()
+
+        self.scheduler.subscribe("351111110000000", on_result)
+        self.assertTrue(done.wait(5))
+        self.assertIn("M35111111", received["351111110000000"]["name"])
+
+    def test_backoff_on_throttle(self):
+        self.server.throttle_remaining = 1
+        result = self.scheduler.submit("990000000000001").result(timeout=5)
+        self.assertEqual(result["model_code"], "M99000000")
+        self.assertEqual(self.server.hits["/api"], 2)
+
+    def test_rate_limiter_spacing(self):
+        limiter = HostRateLimiter(min_interval=0.05)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.wait("host")
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+        limiter.penalize("host")
+        self.assertGreater(limiter.get_backoff("host"), 0)
+        limiter.reset("host")
+        self.assertEqual(limiter.get_backoff("host"), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import datetime
+import time
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock
+from core.analytics import AnalyticsManager
+from core.inventory import InventoryManager
+from core.config import ConfigManager
+from core.forecasting import (
+    daily_sales_matrix, forecast_demand, demand_alerts, BY_FAMILY, BY_BRAND,
+    FORECAST_OK, FORECAST_LOW, FORECAST_OUT
+)
+
+NOW = datetime.datetime(2024, 6, 30, 18, 0)
+
+def _item(model, status, sold_days_ago=None):
+    sold = NOW - datetime.timedelta(days=sold_days_ago) if sold_days_ago is not None else None
+    # last_updated is the import time and must not be used as the sale date
+    return {'model': model, 'status': status, 'date_sold': sold, 'last_updated': NOW}
+
+class TestForecasting(unittest.TestCase):
+    def test_daily_matrix(self):
+        df = pd.DataFrame([
+            _item("Redmi 14C", "OUT", 0), _item("Redmi 14C", "OUT", 0), _item("Redmi 14C", "OUT", 2),
+            _item("Vivo V27", "OUT", 1), _item("Vivo V27", "OUT", 400), _item("Vivo V27", "IN"),
+        ])
+        df.loc[3, 'date_sold'] = df.loc[3, 'date_sold'].isoformat()  # Registry strings work too
+        matrix = daily_sales_matrix(df, days=30, now=NOW)
+        self.assertEqual(len(matrix), 30)
+        self.assertEqual(matrix.index[-1], pd.Timestamp("2024-06-30"))
+        self.assertEqual(matrix["Redmi 14C"].tolist()[-3:], [1, 0, 2])
+        self.assertEqual(int(matrix["Vivo V27"].sum()), 1)  # The 400-day-old sale is outside the window
+
+    def test_ewma_prefers_recent_sales(self):
+        rows = [_item("Recent", "OUT", d) for d in range(5)] + [_item("Old", "OUT", 60 + d) for d in range(5)]
+        rows += [_item("Recent", "IN"), _item("Old", "IN")]
+        forecast = forecast_demand(pd.DataFrame(rows), now=NOW)
+        self.assertGreater(forecast.loc["Recent", "velocity"], forecast.loc["Old", "velocity"] * 5)
+        self.assertEqual(forecast.loc["Recent", "status"], FORECAST_LOW)
+        self.assertEqual(forecast.loc["Recent", "reorder_qty"],
+                         forecast.loc["Recent", "reorder_point"] - 1)
+
+    def test_statuses_and_rollups(self):
+        rows = [_item("Redmi Note 13", "OUT", d) for d in range(0, 20, 2)]
+        rows += [_item("Redmi Note 12", "IN") for _ in range(2)]
+        rows += [_item("Vivo V27", "IN") for _ in range(50)] + [_item("Vivo V27", "OUT", 1)]
+        rows += [_item("Oppo A1", "IN")]
+        df = pd.DataFrame(rows)
+
+        by_model = forecast_demand(df, now=NOW)
+        self.assertEqual(by_model.loc["Redmi Note 13", "status"], FORECAST_OUT)
+        self.assertEqual(by_model.loc["Vivo V27", "status"], FORECAST_OK)
+        self.assertEqual(by_model.loc["Oppo A1", "status"], FORECAST_OK)
+        self.assertTrue(np.isinf(by_model.loc["Oppo A1", "days_of_cover"]))
+
+        by_family = forecast_demand(df, by=BY_FAMILY, now=NOW)
+        self.assertEqual(by_family.index.name, BY_FAMILY)
+        self.assertEqual(by_family.loc["Redmi Note", "stock"], 2)
+        self.assertEqual(by_family.loc["Redmi Note", "status"], FORECAST_LOW)
+        self.assertIn("VIVO", forecast_demand(df, by=BY_BRAND, now=NOW).index)
+
+        alerts = demand_alerts(by_model)
+        self.assertEqual([a['model'] for a in alerts], ["Redmi Note 13"])
+        self.assertEqual(alerts[0]['days_left'], 0)
+
+    def test_no_sales_history(self):
+        df = pd.DataFrame([_item("A", "IN"), _item("B", "OUT")])
+        forecast = forecast_demand(df, now=NOW)
+        self.assertTrue((forecast['status'] == FORECAST_OK).all())
+        self.assertEqual(demand_alerts(forecast), [])
+        self.assertTrue(forecast_demand(pd.DataFrame(), now=NOW).empty)
+
+    def test_analytics_manager_tracks_sales(self):
+        config = MagicMock(spec=ConfigManager)
+        config.mappings = {}
+        config.get.return_value = 0.0
+        inventory = InventoryManager(config)
+        registry = MagicMock()
+        registry.get_metadata.return_value = {}
+        inventory.id_registry = registry
+        now = datetime.datetime.now()
+        rows = [dict(_item("Redmi 14C", "IN"), unique_id=str(i)) for i in range(2)]
+        rows += [dict(_item("Redmi 14C", "OUT", d), unique_id=str(10 + d)) for d in range(6)]
+        for r in rows:
+            if r['date_sold'] is not None:
+                r['date_sold'] = now - (NOW - r['date_sold'])
+        inventory.inventory_df = pd.DataFrame(rows)
+        analytics = AnalyticsManager(inventory)
+
+        before = analytics.get_forecast()
+        self.assertIs(analytics.get_forecast(), before)
+        self.assertEqual(before.loc["Redmi 14C", "stock"], 2)
+
+        # Selling the last units records date_sold in memory and invalidates the forecast
+        inventory.update_item_status("0", "OUT")
+        inventory.update_item_status("1", "OUT")
+        inventory.write_queue.join()
+        self.assertTrue(inventory.inventory_df['date_sold'].notna().all())
+        after = analytics.get_forecast()
+        self.assertGreater(after.loc["Redmi 14C", "velocity"], before.loc["Redmi 14C", "velocity"])
+        self.assertEqual(analytics.get_demand_forecast()[0]['status'], FORECAST_OUT)
+
+    def test_benchmark_100k(self):
+        rng = np.random.default_rng(0)
+        n = 100000
+        models = np.array([f"Brand{i % 20} Model {i}" for i in range(500)])
+        sold = rng.random(n) < 0.6
+        df = pd.DataFrame({
+            'model': models[rng.integers(0, len(models), n)],
+            'status': np.where(sold, 'OUT', 'IN'),
+            'date_sold': np.where(sold, pd.Timestamp(NOW) - pd.to_timedelta(rng.integers(0, 200, n), unit='D'),
+                                  pd.NaT),
+        })
+        start = time.perf_counter()
+        forecast = forecast_demand(df, now=NOW)
+        elapsed = time.perf_counter() - start
+        print(f"\n[Benchmark] forecast_demand on 100k items / 500 models: {elapsed:.3f}s")
+        self.assertEqual(len(forecast), 500)
+        self.assertLess(elapsed, 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,6 +19,7 @@ class TestIDRegistryDates(unittest.TestCase):
         self.registry = IDRegistry()
 
     def tearDown(self):
+        self.registry.close()
         if os.path.exists(self.test_dir):
             shutil.rmtree(self.test_dir)
         id_registry.ID_REGISTRY_FILE = self.original_path
@@ -58,5 +59,45 @@ class TestIDRegistryDates(unittest.TestCase):
         self.registry.set_date_added_if_empty(item_id_3, new_date)
         self.assertEqual(self.registry.get_metadata(item_id_3).get('added_date'), new_date)
 
+    def test_history_kept_out_of_registry(self):
+        item_id = 4
+        self.registry.update_metadata(item_id, {'status': 'IN'})
+        self.registry.commit()
+        size_before = self.registry_file.stat().st_size
+        for i in range(50):
+            self.registry.add_history_log(item_id, "STATUS_CHANGE", f"Moved from IN to OUT #{i}")
+        self.registry.commit()
+
+        self.assertEqual(self.registry_file.stat().st_size, size_before)
+        self.assertNotIn('history', self.registry.get_metadata(item_id))
+        history = self.registry.get_history(item_id)
+        self.assertEqual(len(history), 50)
+        self.assertEqual(history[0]['details'], "Moved from IN to OUT #0")
+        self.assertEqual(len(self.registry.get_history(item_id, limit=1)), 1)
+
+    def test_legacy_history_migration(self):
+        self.registry.close()
+        legacy = {"next_id": 3, "items": {}, "metadata": {
+            "1": {"status": "OUT", "history": [
+                {"ts": "2024-01-02 10:00:00", "action": "DATA_UPDATE", "details": "price=10"},
+                {"ts": "2024-01-01 10:00:00", "action": "STATUS_CHANGE", "details": "Moved from IN to OUT"}]},
+            "2": {"status": "IN"}}}
+        with open(self.registry_file, 'w') as f:
+            json.dump(legacy, f)
+
+        self.registry = IDRegistry()
+        self.registry.commit()
+        with open(self.registry_file, 'r') as f:
+            saved = json.load(f)
+        self.assertNotIn('history', saved['metadata']['1'])
+        self.assertEqual(saved['metadata']['1']['status'], "OUT")
+        self.assertEqual([h['ts'] for h in self.registry.get_history(1)],
+                         ["2024-01-01 10:00:00", "2024-01-02 10:00:00"])
+
+        # Reopening does not import twice
+        self.registry.close()
+        self.registry = IDRegistry()
+        self.assertEqual(len(self.registry.get_history(1)), 2)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -312,5 +312,58 @@ class TestInventoryRefactor(unittest.TestCase):
             'merge_reason': 'Conflict Resolution'
         })
 
+    def test_add_items_upsert(self):
+        """Test that new items appear in memory without a full reload."""
+        path = self.create_dummy_excel("stock.xlsx", [{'IMEI': '111111111111111', 'Model': 'M1'}])
+        self.config_manager.mappings = {
+            path: {'file_path': path, 'mapping': {'IMEI': FIELD_IMEI, 'Model': 'model'}}
+        }
+        self.config_manager.get_file_mapping.return_value = self.config_manager.mappings[path]
+        self.inventory.reload_all()
+        
+        events = []
+        self.inventory.add_change_listener(lambda action, ids: events.append((action, ids)))
+        
+        rows = [
+            {FIELD_IMEI: '222222222222222', FIELD_MODEL: 'M2', 'price_original': 500.0, FIELD_STATUS: 'IN'},
+            {FIELD_IMEI: '111111111111111', FIELD_MODEL: 'M1 Dup', 'price_original': 100.0, FIELD_STATUS: 'IN'},
+        ]
+        with patch.object(self.inventory, 'reload_all') as mock_reload:
+            ids = self.inventory.add_items(rows, path)
+            mock_reload.assert_not_called()
+        
+        self.assertEqual(ids, ['ID_222222222222222', 'ID_111111111111111'])
+        df = self.inventory.inventory_df
+        new_row = df[df[FIELD_UNIQUE_ID] == 'ID_222222222222222'].iloc[0]
+        self.assertEqual(new_row[FIELD_MODEL], 'M2')
+        self.assertEqual(new_row['price'], 500.0)
+        self.assertEqual(new_row[FIELD_SOURCE_FILE], path)
+        
+        # Mock registry returns the same ID for the dup IMEI, so only one row is appended
+        self.assertEqual(len(df), 2)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0][1], ['ID_222222222222222'])
+
+    def test_add_items_conflict_scoped(self):
+        """Test that add_items only reports conflicts for the new IMEIs."""
+        self.mock_registry.get_or_create_id.side_effect = lambda row: f"ID_{row.get(FIELD_MODEL)}"
+        path = self.create_dummy_excel("stock.xlsx", [
+            {'IMEI': '333333333333333', 'Model': 'A'},
+            {'IMEI': '333333333333333', 'Model': 'B'},
+        ])
+        self.config_manager.mappings = {
+            path: {'file_path': path, 'mapping': {'IMEI': FIELD_IMEI, 'Model': 'model'}}
+        }
+        self.config_manager.get_file_mapping.return_value = self.config_manager.mappings[path]
+        self.inventory.reload_all()
+        self.assertEqual(len(self.inventory.conflicts), 1)
+        
+        self.inventory.add_items([{FIELD_IMEI: '444444444444444', FIELD_MODEL: 'C'}], path)
+        self.assertEqual(len(self.inventory.conflicts), 1)
+        
+        self.inventory.add_items([{FIELD_IMEI: '444444444444444', FIELD_MODEL: 'D'}], path)
+        imeis = sorted(c['imei'] for c in self.inventory.conflicts)
+        self.assertEqual(imeis, ['333333333333333', '444444444444444'])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,59 @@
+import unittest
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from core.billing import BillingManager, InvoiceService, _invoice_styles
+from core.invoice_store import InvoiceStore
+
+class TestInvoiceService(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        config = {'store_name': 'Test Shop', 'gst_default_percent': 18.0}
+        self.store = InvoiceStore(db_path=self.test_dir / "invoices.db")
+        self.service = InvoiceService(BillingManager(config), self.store)
+        self.items = [{'unique_id': 'MSM0001', 'model': 'Redmi 14C', 'price': 10000.0, 'imei': '861234560000011'}]
+        self.buyer = {'name': 'Ravi', 'contact': '', 'date': '2024-06-10', 'is_interstate': False, 'is_tax_inclusive': True}
+
+    def tearDown(self):
+        self.service.shutdown(wait=True)
+        self.store.close()
+        shutil.rmtree(self.test_dir)
+
+    def _job(self, i, folder=None):
+        return {
+            'items': self.items, 'buyer_details': dict(self.buyer, name=f"Buyer {i}"),
+            'invoice_number': f"INV-{i}", 'filename': (folder or self.test_dir) / f"Buyer_{i}.pdf",
+        }
+
+    def test_styles_cached(self):
+        self.assertIs(_invoice_styles(), _invoice_styles())
+
+    def test_submit_future_records_invoice(self):
+        path = self.test_dir / "Ravi_1.pdf"
+        future = self.service.submit(self.items, self.buyer, "INV-1", path)
+        success, verify_hash, total = future.result(timeout=30)
+        self.assertTrue(success)
+        self.assertAlmostEqual(total, 10000.0)
+        self.assertTrue(path.read_bytes().startswith(b"%PDF"))
+        row = self.store.get_by_hash(verify_hash)
+        self.assertEqual((row['inv_no'], row['buyer']), ("INV-1", "Ravi"))
+
+    def test_batch_progress_and_errors(self):
+        jobs = [self._job(i) for i in range(6)]
+        jobs.append(self._job(99, folder=self.test_dir / "missing"))  # Unwritable target
+        seen = []
+        start = time.perf_counter()
+        results = self.service.submit_batch(jobs, progress=lambda done, total, job, result: seen.append((done, total)),
+                                            workers=2).result(timeout=60)
+        print(f"\n[Benchmark] 7 invoices, 2 processes: {time.perf_counter() - start:.3f}s")
+
+        self.assertEqual(sorted(seen), [(n, 7) for n in range(1, 8)])
+        self.assertTrue(all(r[0] for r in results[:6]))
+        self.assertIsInstance(results[6], Exception)
+        self.assertEqual(self.store.count(), 6)
+        self.assertTrue(all(os.path.exists(j['filename']) for j in jobs[:6]))
+
+if __name__ == '__main__':
+    unittest.main()
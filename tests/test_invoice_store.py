@@ -0,0 +1,127 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from core.invoice_store import InvoiceStore
+
+class TestInvoiceStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.inv_dir = self.test_dir / "Invoices"
+        self.inv_dir.mkdir()
+        self.store = InvoiceStore(db_path=self.test_dir / "invoices.db", invoices_dir=self.inv_dir)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_record_verify_and_delete(self):
+        pdf = self.inv_dir / "Ravi Kumar_1718000000.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+        self.assertIsNotNone(self.store.record("ABCD1234EF567890", "INV-1718000000", "Ravi Kumar", "2024-06-10", 15999.0, pdf))
+        self.assertIsNone(self.store.record("ABCD1234EF567890", "INV-dup", "X", "2024-06-10", 1, None))
+
+        hit = self.store.get_by_hash("abcd 1234 ef56 7890")
+        self.assertEqual((hit['inv_no'], hit['amount'], hit['file_size']), ("INV-1718000000", 15999.0, 8))
+        self.assertEqual(self.store.get_by_number("INV-1718000000")['buyer'], "Ravi Kumar")
+
+        self.assertEqual(self.store.count(buyer="ravi"), 1)
+        self.assertTrue(self.store.mark_deleted(pdf))
+        self.assertEqual(self.store.count(), 0)
+        self.assertIsNotNone(self.store.get_by_hash("ABCD1234EF567890"))  # Still verifiable
+
+    def test_legacy_import_once(self):
+        registry = {
+            "AAAA000000000001": {"inv_no": "INV-1718000000", "date": "2024-06-10", "amount": "100.00", "buyer": "Ravi"},
+            "AAAA000000000002": {"inv_no": "INV-1718000999", "date": "2024-06-10", "amount": "50.00", "buyer": "Gone"},
+        }
+        reg_path = self.test_dir / "invoice_registry.json"
+        reg_path.write_text(json.dumps(registry))
+        (self.inv_dir / "Ravi_1718000000.pdf").write_bytes(b"%PDF")
+        (self.inv_dir / "Walkin_1718005000.pdf").write_bytes(b"%PDF")
+
+        self.assertEqual(self.store.import_legacy([reg_path]), 3)
+        self.assertEqual(self.store.import_legacy([reg_path]), 0)
+
+        rows = self.store.query()
+        self.assertEqual(sorted(r['buyer'] for r in rows), ["Ravi", "Walkin"])
+        ravi = self.store.get_by_hash("AAAA000000000001")
+        self.assertTrue(ravi['file_path'].endswith("Ravi_1718000000.pdf"))
+        self.assertEqual(ravi['amount'], 100.0)
+        # Registry-only entry (no PDF) verifies but is not listed
+        self.assertIsNotNone(self.store.get_by_hash("AAAA000000000002"))
+
+    def test_sync_dir_tracks_folder(self):
+        self.store.import_legacy([])
+        copied = self.inv_dir / "Anil_1718100000.pdf"
+        copied.write_bytes(b"%PDF")
+        self.assertEqual(self.store.sync_dir(), 1)
+        self.assertEqual(self.store.sync_dir(), 0)
+        self.assertEqual([r['buyer'] for r in self.store.query()], ["Anil"])
+
+        # Removed outside the app: hidden, and listed again once restored
+        data = copied.read_bytes()
+        copied.unlink()
+        self.store.sync_dir()
+        self.assertEqual(self.store.count(), 0)
+        copied.write_bytes(data)
+        self.store.sync_dir()
+        self.assertEqual(self.store.count(), 1)
+
+        # A render indexed by a sync before record() still gets its signature
+        fresh = self.inv_dir / "Sunil_1718200000.pdf"
+        fresh.write_bytes(b"%PDF-1.4")
+        self.store.sync_dir()
+        self.assertIsNotNone(self.store.record("BBBB000000000001", "INV-1718200000", "Sunil", "2024-06-12", 999.0, fresh))
+        self.assertEqual(self.store.get_by_hash("BBBB000000000001")['file_path'], str(fresh))
+        self.assertEqual(self.store.count(), 2)
+
+    def test_date_filter_is_substring(self):
+        pdf = self.inv_dir / "Ravi_1718000000.pdf"
+        pdf.write_bytes(b"%PDF")
+        self.store.record("CCCC000000000001", "INV-1718000000", "Ravi", None, 10.0, pdf)
+        today = time.strftime("%Y-%m-%d")
+        for needle in (today, today[:7], today[4:], today[-3:]):
+            self.assertEqual(self.store.count(date=needle), 1, msg=needle)
+        self.assertEqual(self.store.count(date="1999"), 0)
+
+        # Prefix forms are answered from the date index
+        for needle in (today[:4], today[:7], today):
+            where, params = self.store._where(date=needle)
+            plan = " ".join(r[3] for r in self.store._conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT COUNT(*) FROM invoices WHERE {where}", params))
+            self.assertIn("idx_invoices_date", plan, msg=needle)
+
+    def test_large_store_pagination(self):
+        base = time.time() - 50000 * 60
+        rows = [
+            (f"H{i:015d}", f"INV-{i}", f"Buyer {i % 500}", f"buyer {i % 500}", "2024-01-01",
+             float(i % 9000), str(self.inv_dir / f"b_{i}.pdf"), 1000, base + i * 60,
+             time.strftime("%Y-%m-%d", time.localtime(base + i * 60)))
+            for i in range(50000)
+        ]
+        with self.store._conn:
+            self.store._conn.executemany(
+                "INSERT INTO invoices (verify_hash, inv_no, buyer, buyer_lc, inv_date, amount, file_path, "
+                "file_size, created_ts, created_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+        start = time.perf_counter()
+        page = self.store.query(limit=200, offset=400)
+        hit = self.store.get_by_hash("H000000000049999")
+        filtered = self.store.count(buyer="buyer 42")
+        by_date = self.store.query(date=rows[-1][9], limit=10)
+        elapsed = time.perf_counter() - start
+        print(f"\n[Benchmark] 50k invoices, page + hash + filters: {elapsed:.3f}s")
+
+        self.assertEqual(len(page), 200)
+        self.assertEqual(page[0]['inv_no'], "INV-49599")
+        self.assertEqual(hit['inv_no'], "INV-49999")
+        self.assertEqual(filtered, 1100)  # buyer 42 and 420-429, 100 invoices each
+        self.assertEqual(by_date[0]['inv_no'], "INV-49999")
+        self.assertLess(elapsed, 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
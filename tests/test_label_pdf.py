@@ -0,0 +1,62 @@
+import unittest
+import os
+import re
+import shutil
+import tempfile
+import time
+from unittest.mock import MagicMock
+from core.printer import PrinterManager
+from core.barcode_utils import BarcodeGenerator
+
+class TestLabelPdfExport(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.test_dir)  # Old export dropped temp PNGs into the cwd
+        settings = {'label_width_mm': 50, 'label_height_mm': 22, 'store_name': 'Test Shop'}
+        self.config = MagicMock()
+        self.config.get.side_effect = lambda key, default=None: settings.get(key, default)
+        self.printer = PrinterManager(self.config, BarcodeGenerator(settings))
+        self.items = [
+            {'unique_id': f"MSM{i:04d}", 'model': 'Redmi 14C', 'ram_rom': '4/128', 'price': 9999}
+            for i in range(40)
+        ]
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.test_dir)
+
+    def _read(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.assertTrue(data.startswith(b"%PDF"))
+        pages = len(re.findall(rb"/Type /Page\b", data))
+        images = len(re.findall(rb"/Subtype /Image", data))
+        return pages, images
+
+    def test_raster_in_memory(self):
+        path = os.path.join(self.test_dir, "serial.pdf")
+        self.assertTrue(self.printer.export_labels_pdf(self.items, path, workers=0))
+        pages, images = self._read(path)
+        self.assertEqual(images, 40)
+        self.assertEqual(pages, 2)  # 3 x 12 labels per A4 sheet
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["serial.pdf"])
+
+    def test_parallel_matches_serial(self):
+        serial = os.path.join(self.test_dir, "serial.pdf")
+        parallel = os.path.join(self.test_dir, "parallel.pdf")
+        self.printer.export_labels_pdf(self.items, serial, workers=0)
+        start = time.perf_counter()
+        self.printer.export_labels_pdf(self.items, parallel, workers=2)
+        print(f"\n[Benchmark] 40 labels, 2 workers: {time.perf_counter() - start:.3f}s")
+        self.assertEqual(self._read(serial), self._read(parallel))
+
+    def test_vector_export(self):
+        path = os.path.join(self.test_dir, "vector.pdf")
+        self.assertTrue(self.printer.export_labels_pdf(self.items, path, vector=True))
+        pages, images = self._read(path)
+        self.assertEqual((pages, images), (2, 0))
+        self.assertLess(os.path.getsize(path), 60000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,7 @@ class TestAppLogic(unittest.TestCase):
         self.bm = BillingManager(self.cm)
 
     def tearDown(self):
+        self.cm.close()  # Commit deferred config/mappings writes before the folder goes
         if os.path.exists(self.test_dir):
             shutil.rmtree(self.test_dir)
 
@@ -0,0 +1,170 @@
+import unittest
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+import numpy as np
+from core.print_queue import (
+    PrintQueue, PrintJob, JOB_DONE, JOB_FAILED, JOB_CANCELLED, JOB_QUEUED, JOB_PRINTING, JOB_INTERRUPTED,
+    MODE_ZPL, MODE_AUTO, MODE_IMAGE
+)
+from core.utils import SafeJsonWriter
+from core.print_transport import PartialSendError
+
+class TestPrintQueue(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.queue_file = Path(self.test_dir) / "print_queue.json"
+        self.printer = MagicMock()
+        self.printer.print_batch_zpl.side_effect = lambda items, name=None: len(items)
+        self.queues = []
+
+    def tearDown(self):
+        for q in self.queues:
+            q.shutdown(wait=True)
+        shutil.rmtree(self.test_dir)
+
+    def _queue(self, **kwargs):
+        kwargs.setdefault('coalesce_window', 0.0)
+        kwargs.setdefault('backoff', 0.01)
+        q = PrintQueue(self.printer, file_path=self.queue_file, **kwargs)
+        self.queues.append(q)
+        return q
+
+    def test_submit_runs_in_background(self):
+        q = self._queue()
+        events = []
+        job_id = q.submit([{'unique_id': 'A1', 'price': np.int64(500)}], mode=MODE_ZPL,
+                          callback=lambda job: events.append(job.status))
+        self.assertTrue(q.wait_idle(5))
+        self.assertEqual(q.get_job(job_id).status, JOB_DONE)
+        self.assertEqual(events[-1], JOB_DONE)
+        self.assertEqual(self.printer.print_batch_zpl.call_args[0][0][0]['price'], 500)
+
+    def test_coalesces_single_labels(self):
+        q = self._queue(coalesce_window=0.3)
+        ids = [q.submit([{'unique_id': f"A{i}"}], printer_name="P1", mode=MODE_ZPL) for i in range(3)]
+        self.assertTrue(q.wait_idle(5))
+        self.assertEqual(self.printer.print_batch_zpl.call_count, 1)
+        batch = self.printer.print_batch_zpl.call_args[0][0]
+        self.assertEqual([i['unique_id'] for i in batch], ["A0", "A1", "A2"])
+        self.assertTrue(all(q.get_job(i).status == JOB_DONE for i in ids))
+
+    def test_retry_then_fail(self):
+        attempts = []
+        def flaky(items, name=None):
+            attempts.append(len(items))
+            if len(attempts) < 3:
+                raise OSError("offline")
+            return len(items)
+        self.printer.print_batch_zpl.side_effect = flaky
+        q = self._queue(max_retries=3)
+        job_id = q.submit([{'unique_id': 'A1'}], mode=MODE_ZPL)
+        self.assertTrue(q.wait_idle(5))
+        self.assertEqual(q.get_job(job_id).status, JOB_DONE)
+        self.assertEqual(q.get_job(job_id).attempts, 3)
+
+        self.printer.print_batch_zpl.side_effect = lambda items, name=None: 0
+        job_id = q.submit([{'unique_id': 'A2'}], mode=MODE_ZPL)
+        self.assertTrue(q.wait_idle(5))
+        self.assertEqual(q.get_job(job_id).status, JOB_FAILED)
+        self.assertEqual(q.get_job(job_id).attempts, 4)
+
+    def test_auto_falls_back_to_image(self):
+        self.printer.print_batch_zpl.side_effect = lambda items, name=None: 0
+        self.printer.print_label_windows.return_value = True
+        q = self._queue()
+        job_id = q.submit([{'unique_id': 'A1'}, {'unique_id': 'A2'}], mode=MODE_AUTO)
+        self.assertTrue(q.wait_idle(5))
+        self.assertEqual(q.get_job(job_id).labels_sent, 2)
+        self.assertEqual(self.printer.print_label_windows.call_count, 2)
+
+    def test_partial_image_send_retries_only_failed_labels(self):
+        printed = []
+        def flaky(item, name=None):
+            failed = item['unique_id'] == 'B2' and 'B2-failed' not in printed
+            printed.append(item['unique_id'] + ('-failed' if failed else ''))
+            return not failed
+        self.printer.print_label_windows.side_effect = flaky
+        q = self._queue(coalesce_window=0.2)
+        first = q.submit([{'unique_id': 'B1'}, {'unique_id': 'B2'}], mode=MODE_IMAGE)
+        second = q.submit([{'unique_id': 'B3'}], mode=MODE_IMAGE)
+        self.assertTrue(q.wait_idle(5))
+        self.assertEqual(printed, ['B1', 'B2-failed', 'B3', 'B2'])
+        self.assertEqual((q.get_job(first).status, q.get_job(first).labels_sent, q.get_job(first).attempts),
+                         (JOB_DONE, 2, 2))
+        self.assertEqual((q.get_job(second).labels_sent, q.get_job(second).attempts), (1, 1))
+
+        # Labels that never go through fail the job; the ones that did stay credited
+        self.printer.print_label_windows.side_effect = lambda item, name=None: item['unique_id'] != 'C2'
+        job_id = self._queue(max_retries=1).submit([{'unique_id': 'C1'}, {'unique_id': 'C2'}], mode=MODE_IMAGE)
+        self.assertTrue(self.queues[-1].wait_idle(5))
+        job = self.queues[-1].get_job(job_id)
+        self.assertEqual((job.status, job.labels_sent, [i['unique_id'] for i in job.items]), (JOB_FAILED, 1, ['C2']))
+
+    def test_interrupted_job_waits_for_confirmation(self):
+        SafeJsonWriter.write(self.queue_file, {"jobs": [
+            dict(PrintJob([{'unique_id': 'D1'}], mode=MODE_ZPL, job_id="printing").to_dict(), status=JOB_PRINTING),
+            dict(PrintJob([{'unique_id': 'D2'}], mode=MODE_ZPL, job_id="printed").to_dict(), status=JOB_PRINTING),
+        ]})
+        q = self._queue()
+        self.assertEqual([j.id for j in q.interrupted_jobs()], ["printing", "printed"])
+        self.assertFalse(q.wait_idle(0.2))
+        self.printer.print_batch_zpl.assert_not_called()  # Nothing reprints on its own
+
+        self.assertTrue(q.resolve_interrupted("printed", reprint=False))
+        self.assertTrue(q.resolve_interrupted("printing", reprint=True))
+        self.assertFalse(q.resolve_interrupted("printing", reprint=True))
+        self.assertTrue(q.wait_idle(5))
+        self.assertEqual(self.printer.print_batch_zpl.call_count, 1)
+        self.assertEqual(self.printer.print_batch_zpl.call_args[0][0], [{'unique_id': 'D1'}])
+        self.assertEqual(q.get_job("printed").status, JOB_DONE)
+
+    def test_part_sent_batch_is_interrupted_not_reprinted(self):
+        def cut(items, name=None):
+            raise PartialSendError(4096, OSError("connection reset"))
+        self.printer.print_batch_zpl.side_effect = cut
+        q = self._queue()
+        job_id = q.submit([{'unique_id': 'F1'}, {'unique_id': 'F2'}], mode=MODE_AUTO)
+        deadline = time.time() + 5
+        while q.get_job(job_id).status != JOB_INTERRUPTED and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(q.get_job(job_id).status, JOB_INTERRUPTED)
+        self.printer.print_label_windows.assert_not_called()  # No image fallback
+        time.sleep(0.1)
+        self.assertEqual(self.printer.print_batch_zpl.call_count, 1)  # No automatic retry
+        self.assertEqual([j.id for j in self._queue(autostart=False).interrupted_jobs()], [job_id])
+
+    def test_printing_state_is_persisted_before_send(self):
+        seen = []
+        def spy(items, name=None):
+            with open(self.queue_file) as f:
+                seen.append(f.read())
+            return len(items)
+        self.printer.print_batch_zpl.side_effect = spy
+        q = self._queue()
+        q.submit([{'unique_id': 'E1'}], mode=MODE_ZPL)
+        self.assertTrue(q.wait_idle(5))
+        self.assertIn(JOB_PRINTING, seen[0])
+        self.assertEqual(self._queue(autostart=False).get_jobs(), [])
+
+    def test_cancel_and_persistence(self):
+        q = self._queue(autostart=False)
+        keep = q.submit([{'unique_id': 'A1'}], mode=MODE_ZPL)
+        drop = q.submit([{'unique_id': 'A2'}], mode=MODE_ZPL)
+        self.assertTrue(q.cancel(drop))
+        self.assertFalse(q.cancel(drop))
+        self.assertEqual(q.get_job(drop).status, JOB_CANCELLED)
+
+        # Unprinted jobs survive a restart and then print
+        restored = self._queue(autostart=False)
+        jobs = restored.get_jobs()
+        self.assertEqual([(j['id'], j['status']) for j in jobs], [(keep, JOB_QUEUED)])
+        restored.start()
+        self.assertTrue(restored.wait_idle(5))
+        self.assertEqual(restored.get_job(keep).status, JOB_DONE)
+        self.assertEqual(self._queue(autostart=False).get_jobs(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+from core.print_transport import (
+    RawTransport, MemoryTransport, TcpTransport, FileTransport, PartialSendError, create_transport, iter_chunks
+)
+from core.printer import PrinterManager
+from core.print_transport import DEFAULT_CHUNK_SIZE
+
+class _JetDirectStandIn:
+    """Accepts raw 9100 connections and records each job's bytes."""
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(5)
+        self.port = self.sock.getsockname()[1]
+        self.jobs = []
+        self.done = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            chunks = []
+            with conn:
+                while True:
+                    data = conn.recv(65536)
+                    if not data:
+                        break
+                    chunks.append(data)
+            self.jobs.append(b"".join(chunks))
+            self.done.set()
+
+    def close(self):
+        self.sock.close()
+
+class TestPrintTransport(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.config = MagicMock()
+        self.config.get_config_dir.return_value = Path(self.test_dir)
+        self.config.get.side_effect = lambda key, default=None: {'store_name': 'Test Shop'}.get(key, default)
+        self.printer = PrinterManager(self.config, MagicMock())
+        self.items = [
+            {'unique_id': f"MSM{i:04d}", 'model': 'Redmi 14C', 'ram_rom': '4/128', 'price': 9999, 'grade': 'A'}
+            for i in range(300)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_batch_is_single_job(self):
+        transport = MemoryTransport()
+        count = self.printer.print_batch_zpl(self.items, transport=transport)
+        self.assertEqual(count, 300)
+        self.assertEqual(len(transport.jobs), 1)
+
+        name, data = transport.jobs[0]
+        self.assertEqual(name, "BatchLabel")
+        self.assertEqual(data.count(b"^XA"), 150)
+        self.assertEqual(data.decode("utf-8"), self.printer.generate_batch_zpl(self.items))
+
+    def test_iter_chunks_groups_writes(self):
+        parts = ["x" * 1000] * 10
+        chunks = list(iter_chunks(parts, chunk_size=3000))
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(b"".join(chunks), b"x" * 10000)
+
+    def test_tcp_9100_stand_in(self):
+        server = _JetDirectStandIn()
+        try:
+            transport = create_transport(f"tcp://127.0.0.1:{server.port}")
+            self.assertIsInstance(transport, TcpTransport)
+            count = self.printer.print_batch_zpl(self.items[:10], transport=transport)
+            self.assertEqual(count, 10)
+            self.assertTrue(server.done.wait(5))
+            self.assertEqual(len(server.jobs), 1)
+            self.assertEqual(server.jobs[0].decode("utf-8"), self.printer.generate_batch_zpl(self.items[:10]))
+        finally:
+            server.close()
+
+    def test_configured_target_and_failure(self):
+        out = os.path.join(self.test_dir, "labels.zpl")
+        self.config.get.side_effect = lambda key, default=None: {'label_printer_target': f"file://{out}"}.get(key, default)
+        self.assertIsInstance(self.printer.get_transport(), FileTransport)
+        self.assertTrue(self.printer.send_raw_zpl("^XA^XZ"))
+        with open(out, 'rb') as f:
+            self.assertEqual(f.read(), b"^XA^XZ")
+
+        # Nothing listening: reported as failure, not raised
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        self.assertEqual(self.printer.print_batch_zpl(self.items[:2], f"tcp://127.0.0.1:{port}"), 0)
+
+    def test_incomplete_transport_fails_on_creation(self):
+        class NoClose(RawTransport):
+            def open(self, job_name="RawZPL"):
+                pass
+
+            def write(self, data):
+                pass
+
+        with self.assertRaises(TypeError):
+            NoClose()
+        with self.assertRaises(TypeError):
+            RawTransport()
+
+    def test_failure_after_data_is_partial(self):
+        class Flaky(MemoryTransport):
+            def write(self, data):
+                if self.writes:
+                    raise OSError("connection reset")
+                super().write(data)
+
+        parts = ["^XA" + "x" * DEFAULT_CHUNK_SIZE + "^XZ"] * 3
+        with self.assertRaises(PartialSendError) as ctx:
+            Flaky().send(iter_chunks(parts))
+        self.assertGreater(ctx.exception.sent, 0)
+        with self.assertRaises(PartialSendError):
+            self.printer.print_batch_zpl(self.items, transport=Flaky())
+        self.assertFalse(self.printer._send_raw(parts, None, Flaky(), "RawZPL"))  # Bool API unchanged
+
+if __name__ == '__main__':
+    unittest.main()
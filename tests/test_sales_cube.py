@@ -0,0 +1,149 @@
+import unittest
+import tempfile
+import shutil
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+from core.sales_cube import SalesCube, SalesArchive, fact_frame
+
+def _make_df(n, seed=0):
+    rng = np.random.default_rng(seed)
+    models = np.array(["Redmi 14C", "Redmi Note 13", "Vivo V27", "Oppo A78", "iPhone 13"])
+    price = rng.integers(5000, 60000, n).astype(float)
+    status = np.array(["IN", "OUT", "OUT", "RTN"])[rng.integers(0, 4, n)]
+    days = pd.Timestamp("2024-06-30") - pd.to_timedelta(rng.integers(0, 90, n), unit='D')
+    return pd.DataFrame({
+        'unique_id': [str(i) for i in range(n)],
+        'model': models[rng.integers(0, len(models), n)],
+        'supplier': np.array(["S1", "S2", None])[rng.integers(0, 3, n)],
+        'buyer': np.where(status == "OUT", np.array(["Walk-in", "Dealer A ", "Dealer B"])[rng.integers(0, 3, n)], None),
+        'status': status,
+        'price': price,
+        'price_original': np.where(rng.random(n) < 0.1, np.nan, price * 0.8),
+        'date_sold': np.where(status == "OUT", days, pd.NaT),
+    })
+
+class TestSalesCube(unittest.TestCase):
+    def test_rollups_match_groupby(self):
+        df = _make_df(3000)
+        cube = SalesCube.build(df)
+        facts = fact_frame(df)
+
+        by_model = cube.rollup('model', sort=None).sort_index()
+        expected = facts.groupby('model').agg(count=('revenue', 'size'), revenue=('revenue', 'sum'),
+                                              cost=('cost', 'sum'))
+        self.assertEqual(by_model['count'].tolist(), expected['count'].tolist())
+        np.testing.assert_allclose(by_model['revenue'], expected['revenue'])
+        np.testing.assert_allclose(by_model['profit'], expected['revenue'] - expected['cost'])
+
+        sold = facts[facts['status'] == 'OUT']
+        buyers = cube.rollup('buyer', where={'status': 'OUT'})
+        self.assertEqual(buyers.loc["Dealer A", "count"], int((sold['buyer'] == "Dealer A").sum()))
+        self.assertEqual(buyers['revenue'].tolist(), sorted(buyers['revenue'], reverse=True))
+
+        two = cube.rollup(['brand', 'status'])
+        self.assertEqual(two.loc[("REDMI", "IN"), "count"],
+                         int(((facts['brand'] == "REDMI") & (facts['status'] == "IN")).sum()))
+        self.assertEqual(int(two['count'].sum()), len(df))
+
+    def test_slices(self):
+        df = _make_df(2000)
+        cube = SalesCube.build(df)
+        facts = fact_frame(df)
+        june = (facts['day'] >= "2024-06-01") & (facts['day'] <= "2024-06-30")
+        total = cube.total(where={'brand': ['REDMI', 'VIVO']}, days=("2024-06-01", "2024-06-30"))
+        expected = facts[june & facts['brand'].isin(['REDMI', 'VIVO'])]
+        self.assertEqual(total['count'], len(expected))
+        self.assertAlmostEqual(total['revenue'], expected['revenue'].sum())
+        self.assertEqual(cube.total(where={'supplier': ""})['count'], int(df['supplier'].isna().sum()))
+        self.assertEqual(cube.total(where={'model': "Nokia"})['count'], 0)
+        self.assertTrue(cube.rollup('model', where={'model': "Nokia"}).empty)
+        self.assertLessEqual(cube.rollup("day", days=(None, "2024-04-05")).index.max(), "2024-04-05")
+
+    def test_empty(self):
+        cube = SalesCube.build(pd.DataFrame())
+        self.assertEqual(len(cube), 0)
+        self.assertEqual(cube.total()['count'], 0)
+        self.assertTrue(cube.rollup('buyer').empty)
+
+    def test_benchmark_100k(self):
+        df = _make_df(100000, seed=3)
+        start = time.perf_counter()
+        cube = SalesCube.build(df)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(20):
+            cube.rollup('buyer', where={'status': 'OUT'}, limit=15)
+            cube.rollup(['brand', 'model'], days=("2024-06-01", None))
+        query = (time.perf_counter() - start) / 40
+        print(f"\n[Benchmark] SalesCube on 100k rows: build {build:.3f}s, {len(cube)} cells, "
+              f"rollup {query * 1000:.2f}ms")
+        self.assertLess(build, 2.0)
+        self.assertLess(query, 0.05)
+
+class TestSalesArchive(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.archive = SalesArchive(self.test_dir / "sales.db")
+
+    def tearDown(self):
+        self.archive.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_history_survives_row_removal(self):
+        df = _make_df(200)
+        sold = df[df['status'] == 'OUT']
+        before = SalesCube.build(df, self.archive).total(where={'status': 'OUT'})
+        self.assertEqual(len(self.archive), len(sold))
+
+        # Supplier sheet cleaned up: sold rows deleted
+        remaining = df[df['status'] != 'OUT']
+        after = SalesCube.build(remaining, self.archive).total(where={'status': 'OUT'})
+        self.assertEqual(after, before)
+
+        # Persisted across restarts
+        self.archive.close()
+        self.archive = SalesArchive(self.test_dir / "sales.db")
+        self.assertEqual(SalesCube.build(remaining, self.archive).total(where={'status': 'OUT'}), before)
+
+    def test_returned_items_and_incremental_writes(self):
+        df = _make_df(50)
+        SalesCube.build(df, self.archive)
+        uid = df.loc[df['status'] == 'OUT', 'unique_id'].iloc[0]
+
+        conn = self.archive._conn
+        self.archive._conn = MagicMock(wraps=conn)
+        SalesCube.build(df, self.archive)  # Nothing changed: nothing written
+        self.archive._conn.executemany.assert_not_called()
+        self.archive._conn = conn
+
+        df.loc[df['unique_id'] == uid, 'status'] = 'IN'
+        cube = SalesCube.build(df, self.archive)
+        self.assertEqual(cube.total(where={'status': 'OUT'})['count'], int((df['status'] == 'OUT').sum()))
+        self.assertNotIn(uid, self.archive._frame.index)
+
+class TestAnalyticsIntegration(unittest.TestCase):
+    def test_buyer_stats_include_archived_sales(self):
+        from core.analytics import AnalyticsManager
+        test_dir = Path(tempfile.mkdtemp())
+        archive = SalesArchive(test_dir / "sales.db")
+        try:
+            inventory = MagicMock()
+            inventory.generation = 1
+            inventory.get_inventory.return_value = _make_df(300)
+            analytics = AnalyticsManager(inventory, sales_archive=archive)
+            before = analytics.get_buyer_stats()
+            self.assertIs(analytics.get_cube(), analytics.get_cube())
+
+            df = inventory.get_inventory.return_value
+            inventory.get_inventory.return_value = df[df['status'] != 'OUT']
+            inventory.generation = 2
+            self.assertEqual(analytics.get_buyer_stats(), before)
+        finally:
+            archive.close()
+            shutil.rmtree(test_dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+import pandas as pd
+from core.tac_cache import TACCache
+from core.scraper import PhoneScraper
+
+class TestTACCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_file = Path(self.test_dir) / "tac_cache.json"
+        self.cache = TACCache(file_path=self.cache_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_put_get_and_persistence(self):
+        result = {"model_code": "24090RA29I", "name": "Xiaomi Redmi 14C"}
+        self.assertTrue(self.cache.put("861234560000011", result))
+
+        # Same TAC, different serial -> hit
+        hit = self.cache.get("861234569999999")
+        self.assertEqual(hit["name"], "Xiaomi Redmi 14C")
+        self.assertTrue(hit["cached"])
+        self.assertIsNone(self.cache.get("351111110000000"))
+
+        reloaded = TACCache(file_path=self.cache_file)
+        self.assertEqual(reloaded.get("861234561111111")["model_code"], "24090RA29I")
+
+        stats = self.cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 0.5)
+
+    def test_rejects_errors_and_non_imeis(self):
+        self.assertFalse(self.cache.put("861234560000011", {"error": "timeout"}))
+        self.assertFalse(self.cache.put("861234560000011", {"model_code": "X", "name": "X (Scrape Error)"}))
+        self.assertFalse(self.cache.put("861234560000011", {"model_code": "X", "name": "X (No GSMArena match)"}))
+        self.assertFalse(self.cache.put("861234560000011", {"model_code": "X", "name": "X (Unknown)"}))
+        self.assertFalse(self.cache.put("ABC123", {"model_code": "X", "name": "X"}))
+        self.assertEqual(len(self.cache.entries), 0)
+
+    def test_lru_bound_and_ttl(self):
+        cache = TACCache(file_path=self.cache_file, max_entries=2, ttl_days=1)
+        cache.put("111111110000000", {"name": "A"}, persist=False)
+        cache.put("222222220000000", {"name": "B"}, persist=False)
+        cache.get("111111110000000")  # A becomes most recent
+        cache.put("333333330000000", {"name": "C"}, persist=False)
+        self.assertIn("11111111", cache.entries)
+        self.assertNotIn("22222222", cache.entries)
+
+        cache.entries["11111111"]["ts"] = time.time() - 2 * 86400
+        self.assertIsNone(cache.get("111111110000000"))
+        self.assertNotIn("11111111", cache.entries)
+
+    def test_seed_from_inventory(self):
+        df = pd.DataFrame({
+            'imei': ['861234560000011 / 861234560000029', '861234560000037', '861234560000045', 'NOT ON'],
+            'model': ['Redmi 14C', 'Redmi 14C', 'Redmi Typo', 'Unknown'],
+        })
+        self.cache.put("861234560000011", {"model_code": "24090RA29I", "name": "Fetched"})
+        self.assertEqual(self.cache.seed_from_inventory(df), 0)  # Fetched entry wins
+
+        self.cache.clear()
+        self.assertEqual(self.cache.seed_from_inventory(df), 1)
+        self.assertEqual(self.cache.get("861234569999999")["name"], "Redmi 14C")
+
+    def test_scraper_uses_cache(self):
+        scraper = PhoneScraper(tac_cache=self.cache)
+        with patch.object(scraper, '_get_model_code_from_imei', return_value="24090RA29I") as mock_code, \
+             patch.object(scraper, '_search_gsmarena', return_value={"model_code": "24090RA29I", "name": "Redmi 14C"}):
+            first = scraper.fetch_details("861234560000011")
+            second = scraper.fetch_details("861234560000029")
+        self.assertEqual(first["name"], "Redmi 14C")
+        self.assertEqual(second["name"], "Redmi 14C")
+        self.assertEqual(mock_code.call_count, 1)
+
+    def test_bad_status_is_an_error_not_cached(self):
+        scraper = PhoneScraper(tac_cache=self.cache, max_retries=1)
+        throttled = MagicMock(ok=False, status_code=429, text="<html>Too many requests</html>")
+        with patch.object(scraper, '_get_model_code_from_imei', return_value="24090RA29I"), \
+             patch.object(scraper.session, 'get', return_value=throttled):
+            result = scraper.fetch_details("861234560000011")
+        self.assertIn("HTTP 429", result["error"])
+        self.assertEqual(len(self.cache.entries), 0)
+
+if __name__ == '__main__':
+    unittest.main()
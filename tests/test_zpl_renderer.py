@@ -0,0 +1,78 @@
+import unittest
+import os
+from pathlib import Path
+from PIL import Image, ImageChops
+from core.zpl_renderer import ZPLRenderer
+from core.code128 import code128_modules
+from generate_sample_zpl import build_sample_zpl, calculate_barcode_x
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+TEMPLATE_PATH = Path(__file__).parent.parent / "config" / "custom_template.zpl"
+
+# Set MSM_UPDATE_GOLDEN=1 to regenerate the golden images after an intended change
+UPDATE_GOLDEN = os.environ.get("MSM_UPDATE_GOLDEN") == "1"
+
+def custom_template_zpl():
+    zpl = TEMPLATE_PATH.read_text()
+    values = {"${ID}": "1234", "${GRADE}": "A1", "${MODEL}": "Redmi Note 13",
+              "${RAM/ROM}": "8/256", "${PRICE}": "Rs. 14,500"}
+    for k, v in values.items():
+        zpl = zpl.replace(k, v)
+    return zpl
+
+class TestZPLRenderer(unittest.TestCase):
+    def setUp(self):
+        # Built-in Pillow font keeps golden images independent of installed fonts
+        self.renderer = ZPLRenderer(font_paths=[])
+
+    def assertMatchesGolden(self, img, name, tolerance=0.01):
+        path = GOLDEN_DIR / name
+        if UPDATE_GOLDEN:
+            img.save(path)
+        golden = Image.open(path).convert('1')
+        self.assertEqual(img.size, golden.size)
+        diff = ImageChops.logical_xor(img.convert('1'), golden)
+        mismatched = diff.histogram()[255]
+        ratio = mismatched / (img.width * img.height)
+        self.assertLess(ratio, tolerance, f"{name}: {ratio:.2%} of pixels differ")
+
+    def test_golden_sample_2up(self):
+        img = self.renderer.render(build_sample_zpl())
+        self.assertEqual(img.size, (830, 176 * 2 + 8))
+        self.assertMatchesGolden(img, "sample_2up.png")
+
+    def test_golden_custom_template(self):
+        img = self.renderer.render(custom_template_zpl())
+        self.assertEqual(img.size, (400, 200))
+        self.assertMatchesGolden(img, "custom_template.png")
+
+    def test_barcode_modules_are_exact(self):
+        """Scanline through the first barcode decodes back to Code 128 modules."""
+        img = self.renderer.render(build_sample_zpl()).convert('L')
+        bc_x = calculate_barcode_x("101", 200)
+        expected = code128_modules("101")
+        row = [img.getpixel((x, 55)) for x in range(bc_x, bc_x + len(expected) * 2)]
+        modules = "".join('1' if row[i] == 0 else '0' for i in range(0, len(row), 2))
+        self.assertEqual(modules, expected)
+        # Quiet zone left of the barcode stays blank
+        self.assertEqual(img.getpixel((bc_x - 1, 55)), 255)
+
+    def test_field_reverse_and_box(self):
+        zpl = "^XA^PW100^LL50^FO0,0^GB40,40,40^FS^FO10,10^GB10,10,10^FR^FS^FO50,0^GB40,40,2^FS^XZ"
+        img = self.renderer.render(zpl).convert('L')
+        self.assertEqual(img.getpixel((5, 5)), 0)     # Filled box
+        self.assertEqual(img.getpixel((15, 15)), 255)  # Reversed over fill
+        self.assertEqual(img.getpixel((50, 20)), 0)    # Outline edge
+        self.assertEqual(img.getpixel((70, 20)), 255)  # Outline interior
+
+    def test_png_cache(self):
+        zpl = custom_template_zpl()
+        first = self.renderer.render_png(zpl)
+        second = self.renderer.render_png(zpl)
+        self.assertIs(first, second)
+        self.assertEqual((self.renderer.cache_hits, self.renderer.cache_misses), (1, 1))
+        self.renderer.render_png(zpl + " ")
+        self.assertEqual(self.renderer.cache_misses, 2)
+
+if __name__ == '__main__':
+    unittest.main()
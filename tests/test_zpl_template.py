@@ -0,0 +1,115 @@
+import unittest
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+from core.zpl_template import ZPLTemplate, ZPLTemplateLoader
+from core.printer import PrinterManager, FALLBACK_TEMPLATE_1UP
+
+TEMPLATE_2UP = "^XA^FO0,0^FD${model}^FS^FO416,0^FD${model_2}^FS^FO0,40^FD${price}^FS^FO416,40^FD${price_2}^FS^XZ"
+
+class TestZPLTemplate(unittest.TestCase):
+    def test_segments_and_render(self):
+        tpl = ZPLTemplate("^XA^FD${id}^FS^FD${RAM/ROM}^FS^FD${unknown}^FS^XZ")
+        self.assertEqual(len(tpl.literals), 4)
+        self.assertFalse(tpl.is_2up)
+        out = tpl.render({"id": "42", "ram_rom": "8/128"})
+        self.assertEqual(out, "^XA^FD42^FS^FD8/128^FS^FD${unknown}^FS^XZ")
+
+    def test_escapes_field_data(self):
+        tpl = ZPLTemplate("^XA^FO0,0^FD${model}^FS^FO0,30^FH^FD${model}^FS^FO0,60^FD${block}^FS^XZ",
+                          raw_vars=("block",))
+        out = tpl.render({"model": "A^B~C_D", "block": "^GB1,1,1^FS"})
+        self.assertIn("^FDA B C_D^FS", out)
+        self.assertIn("^FDA_5EB_7EC_5FD^FS", out)
+        self.assertIn("^FD^GB1,1,1^FS^FS", out)
+
+    def test_2up_pairs_and_odd_tail(self):
+        tpl = ZPLTemplate(TEMPLATE_2UP)
+        self.assertTrue(tpl.is_2up)
+        labels = [{"model": f"M{i}", "price": str(i)} for i in range(3)]
+        formats = tpl.render_batch(labels)
+        self.assertEqual([n for _, n in formats], [2, 1])
+        self.assertIn("^FDM1^FS", formats[0][0])
+        # Missing right label renders blank, not the raw placeholder
+        self.assertIn("^FO416,0^FD^FS", formats[1][0])
+
+    def test_1up_one_format_per_label(self):
+        formats = FALLBACK_TEMPLATE_1UP.render_batch([{"id": "1"}, {"id": "2"}, {"id": "3"}])
+        self.assertEqual(len(formats), 3)
+
+    def test_loader_recompiles_on_change(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            path = Path(test_dir) / "custom_template.zpl"
+            path.write_text("^XA^FD${id}^FS^XZ")
+            loader = ZPLTemplateLoader()
+            first = loader.load(path)
+            self.assertIs(loader.load(path), first)
+
+            path.write_text("^XA^FD${id}^FS^FD${id_2}^FS^XZ")
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+            second = loader.load(path)
+            self.assertIsNot(second, first)
+            self.assertTrue(second.is_2up)
+            self.assertIsNone(loader.load(Path(test_dir) / "missing.zpl"))
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_printer_batch_zpl(self):
+        config = MagicMock()
+        config.get_config_dir.return_value = Path(tempfile.gettempdir()) / "msm_no_template_dir"
+        config.get.side_effect = lambda key, default=None: "Shop" if key == 'store_name' else default
+        printer = PrinterManager(config, MagicMock())
+        items = [
+            {"unique_id": 1, "model": "Galaxy", "price": 1000, "grade": "a1"},
+            {"unique_id": 2, "model": "Pixel", "price": 2000, "grade": ""},
+            {"unique_id": 3, "model": "Moto", "price": 3000, "grade": "B"},
+        ]
+        zpl = printer.generate_batch_zpl(items)
+        self.assertEqual(zpl.count("^XA"), 2)
+        self.assertIn("^FO330,49^A0N,24,24^FR^FB50,1,0,C,0^FDA1^FS", zpl)
+        self.assertNotIn("^FO740,45", zpl)  # Right label has no grade
+        self.assertIn("^FDRs. 2,000^FS", zpl)
+
+    def test_custom_2up_template_grade_blocks(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            Path(test_dir, "custom_template.zpl").write_text(
+                "^XA^FO0,0^FD${model}^FS\n${grade_block}\n^FO416,0^FD${model_2}^FS\n${grade_block_2}\n^XZ")
+            config = MagicMock()
+            config.get_config_dir.return_value = Path(test_dir)
+            config.get.side_effect = lambda key, default=None: "Shop" if key == 'store_name' else default
+            printer = PrinterManager(config, MagicMock())
+            zpl = printer.generate_batch_zpl([
+                {"unique_id": 1, "model": "Galaxy^S", "grade": "A"},
+                {"unique_id": 2, "model": "Pixel", "grade": "B2"},
+            ])
+        finally:
+            shutil.rmtree(test_dir)
+        self.assertEqual(zpl, (
+            "^XA^FO0,0^FDGalaxy S^FS\n"
+            "^FO330,45^GB50,32,32^FS\n^FO330,49^A0N,24,24^FR^FB50,1,0,C,0^FDA^FS\n"
+            "^FO416,0^FDPixel^FS\n"
+            "^FO740,45^GB50,32,32^FS\n^FO740,49^A0N,24,24^FR^FB50,1,0,C,0^FDB2^FS\n"
+            "^XZ"))
+
+    def test_render_throughput(self):
+        """Benchmark: at least 10k labels per second with the 2-up fallback."""
+        config = MagicMock()
+        config.get_config_dir.return_value = Path(tempfile.gettempdir()) / "msm_no_template_dir"
+        config.get.return_value = "Shop"
+        printer = PrinterManager(config, MagicMock())
+        items = [{"unique_id": i, "model": f"Model {i}", "ram_rom": "8/128", "price": 1000 + i, "grade": "A1"}
+                 for i in range(10000)]
+        start = time.perf_counter()
+        formats = printer.render_label_formats(items)
+        duration = time.perf_counter() - start
+        print(f"Rendered {len(items)} labels in {duration:.4f} seconds")
+        self.assertEqual(sum(n for _, n in formats), 10000)
+        self.assertLess(duration, 1.0, "Label rendering below 10k labels/second")
+
+if __name__ == '__main__':
+    unittest.main()